@@ -1,70 +1,135 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.encoders import jsonable_encoder
 
 from datetime import timedelta
 from app.models.strategy import Strategy
 from app.models.user import User
 from uuid import UUID
-from app.services.backtest_service import create_backtest, get_backtest, get_backtests, get_tearsheet_html, get_trades_html, get_indicators_html
-from app.schemas.backtest import BacktestCreate, BacktestTask
-from app.dependencies.database import get_db
+from app.services.backtest_service import create_backtest, get_backtest, get_backtest_summaries, backtest_summary, get_backtest_trades, get_backtest_equity, get_tearsheet_html, get_trades_html, get_indicators_html, get_backtest_queue_position, add_celery_id_to_backtest, cancel_backtest
+from app.schemas.backtest import BacktestCreate, BacktestTask, BacktestSweepTask, BacktestTradeInfo, BacktestEquityPoint
+from typing import List, Optional
+from app.dependencies.database import get_db, get_async_db
 from app.core.security import create_access_token
 from app.core.config import settings
-from app.utils.backtest import backtest
+from app.utils.sweep import SWEEP_KEYS, SWEEP_METRICS, grid_size
+from app.utils import backtest_progress
+from app.utils.serializer import dumps_str
+from app.utils.trading_events import get_async_redis, read_stream
 from app.utils.parameter import convert_params
+from app.utils.execution_plan import PlanError
 import os
 from datetime import datetime, date
-from multiprocessing import Process
+from celery_app import celery_app
 from app.services.bot_service import create_bot, get_bots, get_bot, edit_bot, get_setting_history
 from app.services.strategy_service import create_strategy, get_all_strategies, get_strategy, edit_strategy
 # from app.utils.backtest import add
 router = APIRouter()
 
+def _enqueue(db: Session, task_name: str, args: list, backtest_id: UUID, priority: int):
+    # Redis serves priority 0 first; the API exposes 9 as most urgent
+    celery_task = celery_app.send_task(
+        task_name, args=args, queue=settings.BACKTEST_QUEUE, priority=9 - priority
+    )
+    return add_celery_id_to_backtest(db, backtest_id, celery_task.id)
+
+
+# Celery task names per engine: (single run, sweep)
+_ENGINE_TASKS = {
+    "lumibot": ("app.tasks.backtest.run_backtest", "app.tasks.backtest.run_backtest_sweep"),
+    "replay": ("app.tasks.backtest.run_replay_backtest", "app.tasks.backtest.run_replay_sweep"),
+}
+
+
+def _check_segments(backtest_task: BacktestTask, sweep: bool = False):
+    if backtest_task.segments == 1:
+        return
+    if sweep:
+        raise HTTPException(status_code=400, detail="Sweeps already run their grid points in parallel; segments must be 1")
+    if backtest_task.engine != "lumibot":
+        raise HTTPException(status_code=400, detail="Segmented runs are only supported by the lumibot engine")
+    if backtest_task.segments > settings.BACKTEST_MAX_SEGMENTS:
+        raise HTTPException(status_code=400, detail=f"segments must be at most {settings.BACKTEST_MAX_SEGMENTS}")
+
+
+def _strategy_parameters(bot, strategy):
+    try:
+        return convert_params(bot, strategy)
+    except PlanError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bot settings: {e}")
+
+
 @router.post("/start", status_code=status.HTTP_201_CREATED)
-async def start_backtest(backtest_task: BacktestTask, db: Session = Depends(get_db)):
-    user_id: UUID
-    print(backtest_task.user_id)
-    print(backtest_task.bot_id)
-    print(backtest_task.user_id)
-    print(backtest_task.strategy_id)
+async def start_backtest(backtest_task: BacktestTask, db: AsyncSession = Depends(get_async_db)):
+    _check_segments(backtest_task)
+    bot = await get_bot(db, backtest_task.bot_id)
+    strategy = await db.run_sync(get_strategy, backtest_task.strategy_id)
+    params = _strategy_parameters(bot, strategy)
     token = await create_backtest(db, backtest_task)
     id = token.id
-    bot = await get_bot(db, backtest_task.bot_id)
-    strategy = get_strategy(db, backtest_task.strategy_id)
-    params = convert_params(bot, strategy)
-    strategy_parameters  = {
-            "symbol": strategy.symbol,
-            "profit_target_type": "percent",      # Uses Percent Profit Target logic
-            "profit_target_value": 0.80,          # 80 % profit
-            "investment_pct": 0.10,
-            "days_before_exit": 5,
-            "legs": [
-                {
-                    "option_type": "call",
-                    "long_short": "long",
-                    "strike_price": None,      # pick via delta
-                    "target_delta": 0.25,
-                    "size_ratio": 1,
-                    "dte_type": "Target",
-                    "dte_value": 30,
-                    "dte_min": 25,
-                    "dte_max": 40
-                }
-            ]
-        }
-    # start_date = backtest_task.start_date  # Keep within last 2yrs for Polygon
-    # end_date = backtest_task.end_date
     start_date = datetime.combine(backtest_task.start_date, datetime.min.time())
     end_date = datetime.combine(backtest_task.end_date, datetime.min.time())
-    # end_date = datetime.strptime(backtest_task.end_date, "%Y-%m-%d").date()
-    print("ID: ", id)
-    p = Process(target=backtest, args=(params, start_date, end_date, id))
-    p.start()
-    # background_task.add_task(backtest)
-    return {"token": token}
+    task_name, args = _ENGINE_TASKS[backtest_task.engine][0], [params, start_date.isoformat(), end_date.isoformat(), str(id)]
+    if backtest_task.segments > 1:
+        task_name = "app.tasks.backtest.run_backtest_segmented"
+        args += [backtest_task.segments, backtest_task.warmup_days, backtest_task.priority]
+    token = await db.run_sync(_enqueue, task_name, args, id, backtest_task.priority)
+    return {"token": token, "queue_position": await db.run_sync(get_backtest_queue_position, token)}
+
+
+@router.post("/sweep", status_code=status.HTTP_201_CREATED)
+async def start_backtest_sweep(backtest_sweep_task: BacktestSweepTask, db: AsyncSession = Depends(get_async_db)):
+    unknown_keys = set(backtest_sweep_task.grid.keys()) - SWEEP_KEYS
+    if unknown_keys:
+        raise HTTPException(status_code=400, detail=f"Unsupported sweep parameters: {sorted(unknown_keys)}")
+    if backtest_sweep_task.rank_by not in SWEEP_METRICS:
+        raise HTTPException(status_code=400, detail=f"rank_by must be one of {list(SWEEP_METRICS)}")
+    points = grid_size(backtest_sweep_task.grid)
+    if points > settings.BACKTEST_MAX_SWEEP_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Grid expands to {points} points; at most {settings.BACKTEST_MAX_SWEEP_POINTS} are allowed",
+        )
+    _check_segments(backtest_sweep_task, sweep=True)
+    bot = await get_bot(db, backtest_sweep_task.bot_id)
+    strategy = await db.run_sync(get_strategy, backtest_sweep_task.strategy_id)
+    params = _strategy_parameters(bot, strategy)
+    token = await create_backtest(db, backtest_sweep_task)
+    start_date = datetime.combine(backtest_sweep_task.start_date, datetime.min.time())
+    end_date = datetime.combine(backtest_sweep_task.end_date, datetime.min.time())
+    token = await db.run_sync(
+        _enqueue,
+        _ENGINE_TASKS[backtest_sweep_task.engine][1],
+        [
+            params,
+            backtest_sweep_task.grid,
+            start_date.isoformat(),
+            end_date.isoformat(),
+            str(token.id),
+            backtest_sweep_task.rank_by,
+            backtest_sweep_task.priority,
+        ],
+        token.id,
+        backtest_sweep_task.priority,
+    )
+    return {"token": token, "queue_position": await db.run_sync(get_backtest_queue_position, token)}
+
+
+@router.post("/cancel/{token}")
+def cancel_Backtest(token: UUID, db: Session = Depends(get_db)):
+    result = get_backtest(token, db)
+    if not result:
+        return {"status": "not found"}
+    if result.status not in ("queued", "running"):
+        raise HTTPException(status_code=400, detail=f"Backtest is already {result.status}")
+    if result.celery_id:
+        celery_app.control.revoke(result.celery_id, terminate=True)
+    result = cancel_backtest(db, token)
+    backtest_progress.publish_state(token, "cancelled")
+    return result
 
 
 @router.get('/get-result/{token}')
@@ -72,16 +137,62 @@ def get_result(token: str, db: Session = Depends(get_db)):
     result = get_backtest(token, db)
     if not result:
         return {"status": "not found"}
-    return result
+    response = jsonable_encoder(backtest_summary(result))
+    # Metrics come from the summary columns; the JSON result holds the rest (e.g. sweep rankings)
+    response["result"] = {**(response["result"] or {}), **jsonable_encoder(result.result or {})}
+    response["queue_position"] = get_backtest_queue_position(db, result)
+    return response
+
+@router.get('/progress/{token}')
+async def stream_progress(
+    request: Request, token: UUID, last_event_id: Optional[str] = None, db: AsyncSession = Depends(get_async_db)
+):
+    """SSE stream of ``progress`` events, ending with the run's ``state`` event."""
+    backtest = await db.run_sync(lambda session: get_backtest(token, session))
+    if not backtest:
+        return {"status": "not found"}
+    # Browsers resend the last seen id on reconnect; default replays the retained history
+    last_id = request.headers.get("last-event-id") or last_event_id or "0-0"
+    client = get_async_redis()
+    key = backtest_progress.stream_key(token)
+    # Runs older than the stream TTL (or finished before this feature) have no events left
+    done = backtest.status not in ("queued", "running") and not await client.exists(key)
+
+    async def event_stream():
+        if done:
+            yield f"event: {backtest_progress.STATE}\ndata: {dumps_str({'status': backtest.status})}\n\n"
+            return
+        async for event in read_stream(client, key, last_id):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            event_id, event_type, data = event
+            yield f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+            if event_type == backtest_progress.STATE:
+                break
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @router.get('/get-all-results')
 def get_all_results(user_id: UUID, db: Session = Depends(get_db)):
-    result = get_backtests(user_id, db)
+    result = get_backtest_summaries(user_id, db)
     if not result:
         return {"status": "not found"}
     return result
 
 
+@router.get('/get-trades/{token}', response_model=List[BacktestTradeInfo])
+def get_Trades(token: UUID, offset: int = 0, limit: Optional[int] = None, db: Session = Depends(get_db)):
+    return get_backtest_trades(db, token, offset, limit)
+
+
+@router.get('/get-equity/{token}', response_model=List[BacktestEquityPoint])
+def get_Equity(token: UUID, db: Session = Depends(get_db)):
+    return get_backtest_equity(db, token)
+
+
 @router.get('/get-tearsheet-html')
 def get_Tearsheet_html(backtest_id: UUID):
     result = get_tearsheet_html(backtest_id)
@@ -13,7 +13,7 @@ from uuid import UUID
 from app.services.bot_service import create_bot, get_bots, get_bot, edit_bot, get_setting_history, get_bots_for_trading_dashboard
 from app.schemas.bot import BotCreate, BotInfo, BotFilter, BotEdit, BotChange, BotForTradingDashboard
 from app.schemas.bots_setting_history import BotSettingHistoryFilter, BotSettingHistoryResponse
-from app.dependencies.database import get_db
+from app.dependencies.database import get_db, get_async_db
 from app.core.security import create_access_token
 from app.core.config import settings
 
@@ -32,15 +32,15 @@ def edit_Bot(bot_edit: BotChange, db: Session = Depends(get_db)):
     return edit_bot(db, bot_edit)
 
 @router.post("/get_bots", status_code=status.HTTP_201_CREATED)
-async def get_Bots(bot_filters: BotFilter, db: Session = Depends(get_db)):
+async def get_Bots(bot_filters: BotFilter, db: AsyncSession = Depends(get_async_db)):
     return await get_bots(db, bot_filters)
 
 @router.get("/get_bot", status_code=status.HTTP_201_CREATED)
-async def get_Bot(id: UUID, db: Session = Depends(get_db)):
+async def get_Bot(id: UUID, db: AsyncSession = Depends(get_async_db)):
     return await get_bot(db, id)
 
 @router.post("/get_setting_history", status_code=status.HTTP_201_CREATED)
-async def get_Setting_history(filter: BotSettingHistoryFilter, db: Session = Depends(get_db)):
+async def get_Setting_history(filter: BotSettingHistoryFilter, db: AsyncSession = Depends(get_async_db)):
     history = await get_setting_history(db, filter)
     return [
         BotSettingHistoryResponse(
@@ -51,5 +51,5 @@ async def get_Setting_history(filter: BotSettingHistoryFilter, db: Session = Dep
     ]
 
 @router.get("/get_bots_for_trading_dashboard", status_code=status.HTTP_201_CREATED)
-async def get_Bots_for_trading_dashboard(user_id: UUID, db: Session = Depends(get_db)):
+async def get_Bots_for_trading_dashboard(user_id: UUID, db: AsyncSession = Depends(get_async_db)):
     return await get_bots_for_trading_dashboard(db, user_id)
\ No newline at end of file
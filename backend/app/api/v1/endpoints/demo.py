@@ -16,7 +16,7 @@ from app.services.demo_service import (
     create_demo,
     delete_demo,
 )
-from app.dependencies.database import get_db
+from app.dependencies.database import get_async_db
 from app.core.security import create_access_token
 from app.core.config import settings
 
@@ -24,8 +24,8 @@ router = APIRouter()
 
 
 @router.get("/create", status_code=status.HTTP_201_CREATED)
-async def create_demo_trades(user_id: UUID, db: Session = Depends(get_db)):
-    demo_status = change_to_demo(db, user_id)
+async def create_demo_trades(user_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    demo_status = await db.run_sync(change_to_demo, user_id)
     if not demo_status:
         raise HTTPException(status_code=400, detail="Your status is already Demo")
     response = await create_demo(db, user_id)
@@ -35,7 +35,7 @@ async def create_demo_trades(user_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.delete("/delete")
-async def delete_Demo(user_id: UUID, db: Session = Depends(get_db)):
+async def delete_Demo(user_id: UUID, db: AsyncSession = Depends(get_async_db)):
     # try:
     #     delete = await delete_demo(db, user_id)
     #     if not delete:
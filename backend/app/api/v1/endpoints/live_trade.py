@@ -2,15 +2,16 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.responses import StreamingResponse
 from datetime import datetime, date
 from typing import Optional
-import json, asyncio, datetime, random
+import json, asyncio, datetime, random, copy
 from uuid import UUID
 from typing import List
 from celery.result import AsyncResult
 from celery.contrib.abortable import AbortableAsyncResult
 from sqlalchemy.orm import Session
-from app.dependencies.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies.database import get_db, get_async_db
 from celery_app import celery_app
-from app.schemas.trading_log import TradingLogFilter
+from app.schemas.trading_log import TradingLogFilter, TradingLogCreateLowData
 from app.schemas.trading_account import (
     TradingAccountFilter,
     TradingAccountUpdate,
@@ -22,29 +23,54 @@ from app.services.trading_task_service import (
     create_trading_task,
     get_trading_task_status,
     stop_trading_task,
-    add_celery_id_to_trading_task,
     get_active_trading_tasks,
 )
-from app.services.trading_log_service import get_trading_logs
+from app.services.trading_log_service import (
+    get_trading_logs,
+    ingest_trading_logs,
+    get_pnl_rollups,
+    get_trading_logs_page,
+    export_trading_logs,
+    EXPORT_FORMATS,
+)
+from app.db.repositories.trading_log_rollup_repository import SCOPES, GRANULARITIES
 from app.services.trading_account_service import get_trading_accounts
-from app.api.v1.endpoints.schwab import SchwabAccountAPI, SchwabMarketAPI
+from app.api.v1.endpoints.schwab import SchwabAccountAPI, SchwabMarketAPI, AsyncSchwabMarketAPI
+from app.core.config import settings
+from app.utils.quote_hub import QuoteHub
+from app.utils.market_snapshot import PRICE_HISTORY, QUOTES, async_market_snapshots
+from app.utils import trading_events
+from app.utils.trading_events import get_async_redis, read_events
+from app.utils.bot_registry import is_registered, register_bot, unregister_bot
+from app.utils.execution_plan import PlanError, get_plan
 
 schwab_account = SchwabAccountAPI()
 schwab_market = SchwabMarketAPI()
+async_schwab_market = AsyncSchwabMarketAPI()
 router = APIRouter()
 
 
+def _stop_runner(trading_task):
+    # Tasks started before the scheduler still run as a Celery task per bot
+    if trading_task.celery_id:
+        celery_app.control.revoke(trading_task.celery_id, terminate=True, signal="SIGKILL")
+    unregister_bot(trading_task.id)
+
+
 @router.get("/start-trading/")
 def start_task(bot_id: str, db: Session = Depends(get_db)):
     try:
         task = create_trading_task(db, bot_id)
         if not task:
             raise HTTPException(status_code=400, detail="Bot is already running!")
-        trading_task = celery_app.send_task(
-            "app.tasks.live_trade.trading", args=[bot_id, task.id]
-        )
-        celery_id = trading_task.id
-        return add_celery_id_to_trading_task(db, task.id, celery_id)
+        # Compile (and cache) the plan up front so bad settings fail here, not every tick
+        get_plan(task.bot)
+        # The scheduler (python -m app.tasks.scheduler) picks the bot up on its next pass
+        register_bot(task)
+        return task
+    except PlanError as e:
+        stop_trading_task(db, task.id)
+        raise HTTPException(status_code=400, detail=f"Invalid bot settings: {e}")
     except:
         raise HTTPException(status_code=400, detail="Server can't find bot")
 
@@ -52,7 +78,12 @@ def start_task(bot_id: str, db: Session = Depends(get_db)):
 @router.get("/trading-status/{trading_task_id}")
 def get_status(trading_task_id: str, db: Session = Depends(get_db)):
     trading_task = get_trading_task_status(db, trading_task_id)
-    print(trading_task)
+    if not trading_task.celery_id:
+        return {
+            "task_id": str(trading_task.id),
+            "status": "RUNNING" if is_registered(trading_task.id) else "STOPPED",
+            "result": None,
+        }
     trading_task_result = AsyncResult(trading_task.celery_id, app=celery_app)
     return {
         "task_id": trading_task_result.id,
@@ -62,14 +93,14 @@ def get_status(trading_task_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/stop-trading-bot-id/")
-async def stop_task(bot_id: str, db: Session = Depends(get_db)):
+async def stop_task(bot_id: str, db: AsyncSession = Depends(get_async_db)):
     bot = await get_bot(db, bot_id)
     if not bot.is_active:
         raise HTTPException(status_code=400, detail="Bot was Stopped")
     trading_task_id = bot.current_trading_task_id
-    trading_task = get_trading_task_status(db, trading_task_id)
-    celery_app.control.revoke(trading_task.celery_id, terminate=True, signal="SIGKILL")
-    return stop_trading_task(db, trading_task_id)
+    trading_task = await db.run_sync(get_trading_task_status, trading_task_id)
+    _stop_runner(trading_task)
+    return await db.run_sync(stop_trading_task, trading_task_id)
 
 
 @router.get("/stop-trading-trading-task-id/")
@@ -77,7 +108,7 @@ def stop_task(trading_task_id: str, db: Session = Depends(get_db)):
     trading_task = get_trading_task_status(db, trading_task_id)
     # result = AbortableAsyncResult(trading_task.celery_id)
     # result.abort()
-    celery_app.control.revoke(trading_task.celery_id, terminate=True, signal="SIGKILL")
+    _stop_runner(trading_task)
     return stop_trading_task(db, trading_task_id)
 
 
@@ -87,71 +118,193 @@ def stop_all_tasks(user_id: UUID, db: Session = Depends(get_db)):
     # result = AbortableAsyncResult(trading_task.celery_id)
     # result.abort()
     for task in active_trading_tasks:
-        celery_app.control.revoke(task.celery_id, terminate=True, signal="SIGKILL")
+        _stop_runner(task)
         stop_trading_task(db, task.id)
     return "Success"
 
 
 @router.get("/stream/{trading_task_id}")
-async def stream_task(trading_task_id: str):
+async def stream_task(
+    request: Request, trading_task_id: str, last_event_id: Optional[str] = None
+):
+    # Browsers resend the last seen id on reconnect; default replays the retained history
+    last_id = request.headers.get("last-event-id") or last_event_id or "0-0"
+    client = get_async_redis()
+
     async def event_stream():
-        while True:
-            trading_task_result = AsyncResult(trading_task_id, app=celery_app)
-            if trading_task_result.state == "PROGRESS":
-                data = trading_task_result.info  # intermediate data
-                yield f"data: {json.dumps(data)}\n\n"
-            elif trading_task_result.state in ["SUCCESS", "FAILURE", "REVOKED"]:
-                yield f"data: {json.dumps({'state': trading_task_result.state, 'result': trading_task_result.result})}\n\n"
+        async for event in read_events(client, trading_task_id, last_id):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            event_id, event_type, data = event
+            yield f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+            if event_type == trading_events.STATE:
                 break
-            await asyncio.sleep(1)
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
+async def current_price_payload(symbol: str):
+    price_hist_resp, option_data = await asyncio.gather(
+        async_market_snapshots.get(
+            PRICE_HISTORY,
+            symbol,
+            lambda: async_schwab_market.get_pricehistory(
+                symbol, "day", 10, "daily", 1, None, None, None, None
+            ),
+        ),
+        async_market_snapshots.get(
+            QUOTES, symbol, lambda: async_schwab_market.get_quotes(symbol)
+        ),
+    )
+    # Snapshots are shared; the demo noise below must not leak into them
+    option_data = copy.deepcopy(option_data)
+    price_history = [candle["close"] for candle in price_hist_resp["candles"]]
+    current_price = price_history[-1]
+    current_price += random.random()
+    option_data = option_data["AAPL"]
+    option_data["reference"]["description"] = ""
+    option_data["symbol"] = symbol
+    option_data["quote"]["askPrice"] += random.random()
+    option_data["quote"]["bidPrice"] += random.random()
+    option_data["quote"]["totalVolume"] += int(1000 * random.random())
+    return {
+        "quote": option_data,
+        "price": current_price,
+    }
+
+
+# One upstream poll per symbol per second, shared by every connected client
+quote_hub = QuoteHub(
+    current_price_payload,
+    interval=settings.QUOTE_HUB_POLL_INTERVAL,
+    queue_size=settings.QUOTE_HUB_QUEUE_SIZE,
+)
+
+
 @router.get("/current-price/{symbol}")
 async def sse_endpoint(request: Request, symbol: str):
     async def event_generator(request: Request):
-        while True:
-            # If client disconnects, stop sending
-            if await request.is_disconnected():
-                break
-
-            # Here you generate or fetch your real-time data; example is current timestamp
-            price_hist_resp = schwab_market.get_pricehistory(
-                symbol, "day", 10, "daily", 1, None, None, None, None
-            )
-            price_history = [candle["close"] for candle in price_hist_resp["candles"]]
-            current_price = price_history[-1]
-            current_price += random.random()
-            option_data = schwab_market.get_quotes(symbol)
-            option_data = option_data["AAPL"]
-            option_data["reference"]["description"] = ""
-            option_data["symbol"] = symbol
-            option_data["quote"]["askPrice"] += random.random()
-            option_data["quote"]["bidPrice"] += random.random()
-            option_data["quote"]["totalVolume"] += int(1000 * random.random())
-            x = 100 * random.random()
-            payload = {
-                "quote": option_data,
-                "price": current_price,
-            }
-
-            # Send JSON-encoded data
-            yield f"data: {json.dumps(payload)}\n\n"
-            # SSE event format: data: <message>\n\n
-            # yield f"data: {current_price}\n\n"
-            # Wait before sending next event; adjust to your needs
-            await asyncio.sleep(1)
+        async with quote_hub.subscribe(symbol) as updates:
+            while True:
+                # If client disconnects, stop sending
+                if await request.is_disconnected():
+                    break
+                try:
+                    message = await asyncio.wait_for(updates.get(), timeout=5)
+                except asyncio.TimeoutError:
+                    continue
+                if message is None:
+                    # Dropped as a slow consumer; the client reconnects
+                    break
+                # SSE event format: data: <message>\n\n
+                yield f"data: {message}\n\n"
 
     return StreamingResponse(event_generator(request), media_type="text/event-stream")
 
 
+@router.get("/current-price-stats")
+def get_current_price_stats():
+    """Subscribers per symbol on this worker."""
+    return quote_hub.stats()
+
+
 @router.get("/trading-logs/")
 def get_Trading_logs(user_id: UUID, db: Session = Depends(get_db)):
     trading_log_filter = TradingLogFilter(user_id=user_id)
     return get_trading_logs(db, trading_log_filter)
 
 
+@router.post("/trading-logs/", status_code=status.HTTP_201_CREATED)
+def ingest_Trading_logs(fills: List[TradingLogCreateLowData], db: Session = Depends(get_db)):
+    """Record a batch of fills in one transaction."""
+    try:
+        return ingest_trading_logs(db, fills)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _trading_log_filter(
+    user_id: UUID,
+    bot_id: Optional[UUID] = None,
+    strategy_id: Optional[UUID] = None,
+    trading_account_id: Optional[UUID] = None,
+    trading_task_id: Optional[UUID] = None,
+    symbol: Optional[str] = None,
+    win_loss: Optional[bool] = None,
+    start_time: Optional[datetime.datetime] = None,
+    end_time: Optional[datetime.datetime] = None,
+) -> TradingLogFilter:
+    return TradingLogFilter(
+        user_id=user_id,
+        bot_id=bot_id,
+        strategy_id=strategy_id,
+        trading_account_id=trading_account_id,
+        trading_task_id=trading_task_id,
+        symbol=symbol,
+        win_loss=win_loss,
+        start_time=start_time,
+        end_time=end_time,
+    )
+
+
+@router.get("/trading-logs/page")
+def get_Trading_logs_page(
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    order: str = "desc",
+    trading_log_filter: TradingLogFilter = Depends(_trading_log_filter),
+    db: Session = Depends(get_db),
+):
+    """Keyset-paginated logs; pass ``next_cursor`` back as ``cursor`` for the next page."""
+    if not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    try:
+        return get_trading_logs_page(db, trading_log_filter, cursor, limit, order == "desc")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/trading-logs/export")
+def export_Trading_logs(
+    format: str = "ndjson",
+    trading_log_filter: TradingLogFilter = Depends(_trading_log_filter),
+):
+    """Stream every matching log, oldest first, without loading the history into memory."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(EXPORT_FORMATS)}")
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_trading_logs(trading_log_filter, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="trading_logs.{format}"'},
+    )
+
+
+@router.get("/trading-logs/pnl")
+def get_Trading_log_pnl(
+    user_id: UUID,
+    scope: str = "user",
+    scope_id: Optional[UUID] = None,
+    granularity: str = "day",
+    start_time: Optional[datetime.datetime] = None,
+    end_time: Optional[datetime.datetime] = None,
+    db: Session = Depends(get_db),
+):
+    """P&L buckets from the rollup table: one row per day/hour, not per trade."""
+    if scope not in SCOPES:
+        raise HTTPException(status_code=400, detail=f"scope must be one of {list(SCOPES)}")
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {list(GRANULARITIES)}")
+    if scope != "user" and scope_id is None:
+        raise HTTPException(status_code=400, detail="scope_id is required for this scope")
+    return get_pnl_rollups(db, user_id, scope, scope_id, granularity, start_time, end_time)
+
+
 @router.get("/trading-logs/bot")
 def get_Trading_logs(user_id: UUID, bot_id: UUID, db: Session = Depends(get_db)):
     trading_log_filter = TradingLogFilter(bot_id=bot_id, user_id=user_id)
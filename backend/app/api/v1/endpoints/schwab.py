@@ -1,6 +1,20 @@
+import asyncio
+import httpx
 import requests
+import time
 from app.core.config import settings
-import json
+from app.utils.schwab_http import (
+    RETRY_STATUSES,
+    backoff_delay,
+    encode_params,
+    get_async_http_client,
+    get_async_semaphore,
+    get_http_session,
+    parse_retry_after,
+    request_timeout,
+    schwab_metrics,
+    should_retry,
+)
 from datetime import datetime, date
 from typing import Optional
 from fastapi import HTTPException
@@ -11,8 +25,10 @@ SCHWAB_CLIENT_ID = settings.SCHWAB_CLIENT_ID
 SCHWAB_CLIENT_SECRET = settings.SCHWAB_CLIENT_SECRET
 SCHWAB_ACCESS_TOKEN = settings.SCHWAB_ACCESS_TOKEN
 
-class SchwabAccountAPI:
-    BASE_URL = SCHWAB_API_BASE_URL
+class SchwabAPIBase:
+    """Common transport for the Schwab clients: pooled session, retries, latency metrics."""
+    BASE_URL = ""
+
     def __init__(self):
         self.access_token = SCHWAB_ACCESS_TOKEN
 
@@ -22,71 +38,75 @@ class SchwabAccountAPI:
             'Content-Type': 'application/json'
         }
 
+    @staticmethod
+    def _parse_response(status_code: int, content: bytes, text: str, parse_json):
+        if status_code >= 400:
+            raise HTTPException(status_code=status_code, detail=f"Downstream API error: {text}")
+        if not content:
+            # No content to decode.
+            return None
+        try:
+            return parse_json()
+        except ValueError:  # includes simplejson.decoder.JSONDecodeError
+            raise ValueError(f"Response content is not valid JSON: {text}")
+
+    def _send(self, method: str, url: str, params: Optional[dict] = None, json: Optional[dict] = None, endpoint: Optional[str] = None):
+        endpoint = endpoint or f"{method} {url}"
+        session = get_http_session()
+        started = time.perf_counter()
+        attempt = 0
+        resp = None
+        try:
+            while True:
+                try:
+                    resp = session.request(
+                        method, url, headers=self.get_headers(), params=params, json=json, timeout=request_timeout()
+                    )
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    connect_failed = isinstance(e, requests.exceptions.ConnectTimeout)
+                    if attempt < settings.SCHWAB_HTTP_MAX_RETRIES and should_retry(method, connect_failed=connect_failed):
+                        time.sleep(backoff_delay(attempt))
+                        attempt += 1
+                        continue
+                    status_code = 504 if isinstance(e, requests.exceptions.Timeout) else 502
+                    raise HTTPException(status_code=status_code, detail=f"Downstream API error: {e}")
+                if (
+                    resp.status_code in RETRY_STATUSES
+                    and attempt < settings.SCHWAB_HTTP_MAX_RETRIES
+                    and should_retry(method, resp.status_code)
+                ):
+                    time.sleep(backoff_delay(attempt, parse_retry_after(resp.headers.get("Retry-After"))))
+                    attempt += 1
+                    continue
+                return self._parse_response(resp.status_code, resp.content, resp.text, resp.json)
+        finally:
+            ok = resp is not None and resp.status_code < 400
+            schwab_metrics.record(endpoint, (time.perf_counter() - started) * 1000, ok, attempt)
+
+
+class SchwabAccountAPI(SchwabAPIBase):
+    BASE_URL = SCHWAB_API_BASE_URL
     def get_account_info(self):
         url = f'{self.BASE_URL}/accounts'
-        resp = requests.get(url, headers=self.get_headers())
-        resp.raise_for_status()
-        return resp.json()
+        return self._send("GET", url, endpoint="get_account_info")
     
     def get_accounts_accountnumbers(self):
         url = f'{self.BASE_URL}/accounts/accountNumbers'
-        try:
-            resp = requests.get(url, headers=self.get_headers())
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, endpoint="get_accounts_accountnumbers")
     def get_accounts(self, fields: Optional[str] = None):
         url = f'{self.BASE_URL}/accounts'
         parameter = {}
         if fields:
             parameter['fields'] = fields
         
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=parameter)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=parameter, endpoint="get_accounts")
     
     def get_accounts_from_accountnumber(self, account_number : str, fields: Optional[str] = None):
         url = f'{self.BASE_URL}/accounts/{account_number}'
         parameter = {}
         if fields:
             parameter['fields'] = fields
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=parameter)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=parameter, endpoint="get_accounts_from_accountnumber")
     
     def get_accounts_accountnumber_orders(self, account_number : str, from_entered_time: datetime, to_entered_time : datetime, max_results: Optional[int] = None):
         url = f'{self.BASE_URL}/accounts/{account_number}/orders'
@@ -96,89 +116,23 @@ class SchwabAccountAPI:
         }
         if max_results:
             parameter['maxResults'] = max_results
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=parameter)
-            resp.raise_for_status()
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=parameter, endpoint="get_accounts_accountnumber_orders")
     
     def post_accounts_accountnumber_orders(self, account_number: str, order: dict):
         url = f'{self.BASE_URL}/accounts/{account_number}/orders'
-        try:
-            resp = requests.post(url, headers=self.get_headers(), json=order)
-            resp.raise_for_status()
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("POST", url, json=order, endpoint="post_accounts_accountnumber_orders")
     
     def get_accounts_accountnumber_orders_orderid(self, account_number : str, order_id: int):
         url = f'{self.BASE_URL}/accounts/{account_number}/orders/{order_id}'
-        try:
-            resp = requests.get(url, headers=self.get_headers())
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, endpoint="get_accounts_accountnumber_orders_orderid")
     
     def delete_accounts_accountnumber_orders_orderid(self, account_number : str, order_id: int):
         url = f'{self.BASE_URL}/accounts/{account_number}/orders/{order_id}'
-        resp = requests.delete(url, headers=self.get_headers())
-        try:
-            resp.raise_for_status()
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("DELETE", url, endpoint="delete_accounts_accountnumber_orders_orderid")
     
     def put_accounts_accountnumber_orders_orderid(self, account_number : str, order_id: int, order: dict):
         url = f'{self.BASE_URL}/accounts/{account_number}/orders/{order_id}'
-        try:
-            resp = requests.put(url, headers=self.get_headers(), json=order)
-            resp.raise_for_status()
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("PUT", url, json=order, endpoint="put_accounts_accountnumber_orders_orderid")
     
     def get_orders(self, from_entered_time: datetime, to_entered_time : datetime, max_results: Optional[int] = None):
         url = f'{self.BASE_URL}/orders'
@@ -188,38 +142,11 @@ class SchwabAccountAPI:
         }
         if max_results:
             parameter['maxResults'] = max_results
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=parameter)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=parameter, endpoint="get_orders")
     
     def post_accounts_accountnumber_previeworder(self, account_number: str, order: dict):
         url = f'{self.BASE_URL}/accounts/{account_number}/previewOrder'
-        try:
-            resp = requests.post(url, headers=self.get_headers(), json=order)
-            resp.raise_for_status()
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("POST", url, json=order, endpoint="post_accounts_accountnumber_previeworder")
             
     def get_accounts_accountnumber_transactions(self, account_number: str, start_date: datetime, end_date : datetime, types: TransactionTypeEnum, symbol: Optional[str] = None):
         url = f'{self.BASE_URL}/accounts/{account_number}/transactions'
@@ -231,76 +158,23 @@ class SchwabAccountAPI:
         }
         if symbol:
             parameter['symbol'] = symbol
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=parameter)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=parameter, endpoint="get_accounts_accountnumber_transactions")
     
     def get_accounts_accountnumber_transactions_transactionid(self, account_number: str, transaction_id: int):
         url = f'{self.BASE_URL}/accounts/{account_number}/transactions/{transaction_id}'
-        try:
-            resp = requests.get(url, headers=self.get_headers())
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, endpoint="get_accounts_accountnumber_transactions_transactionid")
     
     def get_userpreference(self):
         url = f'{self.BASE_URL}/userPreference'
-        try:
-            resp = requests.get(url, headers=self.get_headers())
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, endpoint="get_userpreference")
     
     
     
-class SchwabMarketAPI:
+class SchwabMarketAPI(SchwabAPIBase):
     BASE_URL = SCHWAB_API_MARKET_URL
-    def __init__(self):
-        self.access_token = SCHWAB_ACCESS_TOKEN
-
-    def get_headers(self):
-        return {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
-
     def get_account_info(self):
         url = f'{self.BASE_URL}/accounts'
-        resp = requests.get(url, headers=self.get_headers())
-        resp.raise_for_status()
-        return resp.json()
+        return self._send("GET", url, endpoint="get_account_info")
     
     def get_quotes(self, symbols = None, fields = None, indicative = None):
         url = f'{self.BASE_URL}/quotes'
@@ -313,21 +187,7 @@ class SchwabMarketAPI:
         if indicative:
             params["indicative"] = str(indicative).lower()
             
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=params)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=params, endpoint="get_quotes")
         
     def get_symbolid_quotes(self, symbol_id : SymbolIdEnum, fields : Optional[str] = None):
         url = f'{self.BASE_URL}/{symbol_id}/quotes'
@@ -336,21 +196,7 @@ class SchwabMarketAPI:
         if fields:
             params['fields'] = fields
             
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=params)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=params, endpoint="get_symbolid_quotes")
         
     def get_chains(
         self, 
@@ -410,42 +256,14 @@ class SchwabMarketAPI:
         if entitlement:
             params['entitlement'] = entitlement
             
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=params)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=params, endpoint="get_chains")
     
     def get_expirationchain(self, symbol : str):
         url = f'{self.BASE_URL}/expirationchain'
         params = {
             'symbol' : symbol
         }
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=params)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=params, endpoint="get_expirationchain")
         
     def get_pricehistory(
         self,
@@ -481,21 +299,7 @@ class SchwabMarketAPI:
             params['needExtendedHoursData'] = str(need_extended_hours_data).lower()
         if need_previous_close:
             params['needPreviousClose'] = str(need_previous_close).lower()
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=params)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=params, endpoint="get_pricehistory")
         
     def get_movers_symbolid(
         self,
@@ -510,21 +314,7 @@ class SchwabMarketAPI:
         if frequency:
             params['frequency'] = frequency
         
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=params)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=params, endpoint="get_movers_symbolid")
     
     def get_markets(
         self,
@@ -538,21 +328,7 @@ class SchwabMarketAPI:
         if date:
             params['date'] = date
         
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=params)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=params, endpoint="get_markets")
         
     def get_markets_marketid(
         self,
@@ -565,21 +341,7 @@ class SchwabMarketAPI:
         if date:
             params['date'] = date
         
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=params)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=params, endpoint="get_markets_marketid")
     
     def get_instruments(
         self,
@@ -592,39 +354,60 @@ class SchwabMarketAPI:
             'projection' : projection
         }
                 
-        try:
-            resp = requests.get(url, headers=self.get_headers(), params=params)
-            resp.raise_for_status()
-            
-            if resp.content:
-                try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
+        return self._send("GET", url, params=params, endpoint="get_instruments")
         
     def get_instruments_cusipid(
         self,
         cusip_id : str,
     ):
         url = f'{self.BASE_URL}/instruments/{cusip_id}'  
+        return self._send("GET", url, endpoint="get_instruments_cusipid")
+
+
+class AsyncSchwabAPIBase(SchwabAPIBase):
+    """
+    Async transport: every client method keeps its signature but returns a
+    coroutine, so ``await client.get_quotes(...)`` never blocks the event loop.
+    """
+
+    async def _send(self, method: str, url: str, params: Optional[dict] = None, json: Optional[dict] = None, endpoint: Optional[str] = None):
+        endpoint = endpoint or f"{method} {url}"
+        client = get_async_http_client()
+        started = time.perf_counter()
+        attempt = 0
+        resp = None
         try:
-            resp = requests.get(url, headers=self.get_headers())
-            resp.raise_for_status()
-            
-            if resp.content:
+            while True:
                 try:
-                    return resp.json()
-                except ValueError:  # includes simplejson.decoder.JSONDecodeError
-                    # Log error, raise custom error, or return raw text
-                    raise ValueError(f"Response content is not valid JSON: {resp.text}")
-            else:
-                # No content to decode.
-                return None  # or {}
-        except requests.exceptions.HTTPError as e:
-            raise HTTPException(status_code=resp.status_code, detail=f"Downstream API error: {resp.text}")
\ No newline at end of file
+                    async with get_async_semaphore():
+                        resp = await client.request(
+                            method, url, headers=self.get_headers(), params=encode_params(params), json=json
+                        )
+                except httpx.TransportError as e:
+                    connect_failed = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                    if attempt < settings.SCHWAB_HTTP_MAX_RETRIES and should_retry(method, connect_failed=connect_failed):
+                        await asyncio.sleep(backoff_delay(attempt))
+                        attempt += 1
+                        continue
+                    status_code = 504 if isinstance(e, httpx.TimeoutException) else 502
+                    raise HTTPException(status_code=status_code, detail=f"Downstream API error: {e}")
+                if (
+                    resp.status_code in RETRY_STATUSES
+                    and attempt < settings.SCHWAB_HTTP_MAX_RETRIES
+                    and should_retry(method, resp.status_code)
+                ):
+                    await asyncio.sleep(backoff_delay(attempt, parse_retry_after(resp.headers.get("Retry-After"))))
+                    attempt += 1
+                    continue
+                return self._parse_response(resp.status_code, resp.content, resp.text, resp.json)
+        finally:
+            ok = resp is not None and resp.status_code < 400
+            schwab_metrics.record(f"async:{endpoint}", (time.perf_counter() - started) * 1000, ok, attempt)
+
+
+class AsyncSchwabAccountAPI(AsyncSchwabAPIBase, SchwabAccountAPI):
+    pass
+
+
+class AsyncSchwabMarketAPI(AsyncSchwabAPIBase, SchwabMarketAPI):
+    pass
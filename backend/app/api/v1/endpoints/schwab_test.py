@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from datetime import datetime, date
 from typing import Optional
 from app.api.v1.endpoints.schwab import SchwabAccountAPI, SchwabMarketAPI
+from app.utils.schwab_http import schwab_metrics
 from app.models.enums import TransactionTypeEnum, OptionStrategyEnum, SortEnum, SymbolIdEnum, ContractTypeEnum, EntitlementEnum, PeriodTypeEnum, FrequencyTypeEnum, FrequencyEnum, MarketsEnum, MarketIDEnum, ProjectionEnum, ExpMonthEnum
 
 router = APIRouter()
@@ -139,4 +140,9 @@ def get_instruments(symbol : str, projection : ProjectionEnum):
 
 @router.get("/instruments/cusip_id", status_code=status.HTTP_201_CREATED)
 def get_instruments_cusipid(cusip_id : str):
-    return schwab_market.get_instruments_cusipid(cusip_id)
\ No newline at end of file
+    return schwab_market.get_instruments_cusipid(cusip_id)
+
+@router.get("/metrics")
+def get_metrics():
+    """Per-endpoint latency of calls made by this process to the Schwab API."""
+    return schwab_metrics.snapshot()
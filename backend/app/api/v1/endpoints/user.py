@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 from app.schemas.user import (
@@ -34,7 +35,7 @@ from app.services.user_service import (
     update_password,
     get_account_insights,
 )
-from app.dependencies.database import get_db
+from app.dependencies.database import get_db, get_async_db
 from app.core.config import settings
 
 router = APIRouter()
@@ -46,7 +47,7 @@ def get_User_info(user_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/account-insights", status_code=status.HTTP_201_CREATED)
-async def get_Account_insights(user_id: str, db: Session = Depends(get_db)):
+async def get_Account_insights(user_id: str, db: AsyncSession = Depends(get_async_db)):
     return await get_account_insights(db, user_id)
 
 
@@ -6,6 +6,23 @@ class Settings(BaseSettings):
     # Database connection URL
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
     
+    # Connection pool of the API process (sync and asyncpg engines each get one)
+    DB_POOL_SIZE : int = Field(10, env="DB_POOL_SIZE")
+    
+    DB_MAX_OVERFLOW : int = Field(20, env="DB_MAX_OVERFLOW")
+    
+    # Seconds before a pooled connection is replaced; keep below the server/proxy idle timeout
+    DB_POOL_RECYCLE : int = Field(1800, env="DB_POOL_RECYCLE")
+    
+    DB_POOL_TIMEOUT : float = Field(30.0, env="DB_POOL_TIMEOUT")
+    
+    DB_POOL_PRE_PING : bool = Field(True, env="DB_POOL_PRE_PING")
+    
+    # Separate, smaller pool for Celery workers and the trading scheduler
+    DB_WORKER_POOL_SIZE : int = Field(5, env="DB_WORKER_POOL_SIZE")
+    
+    DB_WORKER_MAX_OVERFLOW : int = Field(5, env="DB_WORKER_MAX_OVERFLOW")
+    
     # Secret key for JWT signing
     SECRET_KEY: str = Field(..., env="SECRET_KEY")
     
@@ -43,6 +60,80 @@ class Settings(BaseSettings):
     
     GOOGLE_CLIENT_ID : str = Field(env="GOOGLE_CLIENT_ID")
     
+    # Celery queue served by the dedicated backtest worker(s)
+    BACKTEST_QUEUE : str = Field("backtest", env="BACKTEST_QUEUE")
+    
+    # Max queued + running backtests per user
+    BACKTEST_MAX_PER_USER : int = Field(3, env="BACKTEST_MAX_PER_USER")
+    
+    # Max grid points per sweep; each point is a task on the shared backtest queue
+    BACKTEST_MAX_SWEEP_POINTS : int = Field(50, env="BACKTEST_MAX_SWEEP_POINTS")
+    
+    # Per-run scratch space for lumibot logs/reports (one sub-folder per backtest)
+    BACKTEST_SCRATCH_DIR : str = Field("backtest_runs", env="BACKTEST_SCRATCH_DIR")
+    
+    # Upper bound on walk-forward segments per run (one backtest worker slot each)
+    BACKTEST_MAX_SEGMENTS : int = Field(8, env="BACKTEST_MAX_SEGMENTS")
+    
+    # Shared Parquet cache of Polygon bars/chains, evicted LRU above the byte budget
+    MARKET_DATA_CACHE_DIR : str = Field("market_data_cache", env="MARKET_DATA_CACHE_DIR")
+    
+    MARKET_DATA_CACHE_MAX_BYTES : int = Field(20 * 1024 ** 3, env="MARKET_DATA_CACHE_MAX_BYTES")
+    
+    # Contracts kept in a replay backtester chain history: expiries up to this many days out...
+    REPLAY_MAX_DTE : int = Field(60, env="REPLAY_MAX_DTE")
+    
+    # ...and strikes within this fraction of spot on the day they are first seen
+    REPLAY_STRIKE_BAND : float = Field(0.2, env="REPLAY_STRIKE_BAND")
+    
+    # Schwab REST transport: pooled keep-alive connections, timeouts (seconds), retries with backoff
+    SCHWAB_HTTP_POOL_SIZE : int = Field(20, env="SCHWAB_HTTP_POOL_SIZE")
+    
+    # Max in-flight Schwab calls per event loop for the async clients
+    SCHWAB_HTTP_MAX_CONCURRENCY : int = Field(10, env="SCHWAB_HTTP_MAX_CONCURRENCY")
+    
+    SCHWAB_HTTP_CONNECT_TIMEOUT : float = Field(3.05, env="SCHWAB_HTTP_CONNECT_TIMEOUT")
+    
+    SCHWAB_HTTP_READ_TIMEOUT : float = Field(10.0, env="SCHWAB_HTTP_READ_TIMEOUT")
+    
+    SCHWAB_HTTP_MAX_RETRIES : int = Field(3, env="SCHWAB_HTTP_MAX_RETRIES")
+    
+    SCHWAB_HTTP_BACKOFF_BASE : float = Field(0.25, env="SCHWAB_HTTP_BACKOFF_BASE")
+    
+    SCHWAB_HTTP_BACKOFF_MAX : float = Field(8.0, env="SCHWAB_HTTP_BACKOFF_MAX")
+    
+    # Live quote fan-out: seconds between upstream polls per symbol, and per-subscriber backlog before it is dropped
+    QUOTE_HUB_POLL_INTERVAL : float = Field(1.0, env="QUOTE_HUB_POLL_INTERVAL")
+    
+    QUOTE_HUB_QUEUE_SIZE : int = Field(10, env="QUOTE_HUB_QUEUE_SIZE")
+    
+    # Per-trading-task Redis event stream: max retained events and idle expiry in seconds
+    TRADING_EVENTS_MAXLEN : int = Field(1000, env="TRADING_EVENTS_MAXLEN")
+    
+    TRADING_EVENTS_TTL : int = Field(24 * 3600, env="TRADING_EVENTS_TTL")
+    
+    # Per-backtest Redis progress stream: seconds between progress events, max retained events, idle expiry in seconds
+    BACKTEST_PROGRESS_INTERVAL : float = Field(1.0, env="BACKTEST_PROGRESS_INTERVAL")
+    
+    BACKTEST_PROGRESS_MAXLEN : int = Field(500, env="BACKTEST_PROGRESS_MAXLEN")
+    
+    BACKTEST_PROGRESS_TTL : int = Field(24 * 3600, env="BACKTEST_PROGRESS_TTL")
+    
+    # Live-trading scheduler: default seconds between ticks per bot, registry re-read period, threads for per-bot work
+    TRADING_TICK_INTERVAL : float = Field(10.0, env="TRADING_TICK_INTERVAL")
+    
+    TRADING_SCHEDULER_REFRESH : float = Field(1.0, env="TRADING_SCHEDULER_REFRESH")
+    
+    TRADING_SCHEDULER_WORKERS : int = Field(16, env="TRADING_SCHEDULER_WORKERS")
+    
+    # Shared per-symbol market snapshots (price history, chains, quotes): lifetime and fetch-lock timeout in seconds
+    MARKET_SNAPSHOT_TTL : float = Field(5.0, env="MARKET_SNAPSHOT_TTL")
+    
+    MARKET_SNAPSHOT_LOCK_TIMEOUT : float = Field(5.0, env="MARKET_SNAPSHOT_LOCK_TIMEOUT")
+    
+    # Symbol whose history feeds the volatility_index_entry_filters of live bots
+    VOLATILITY_INDEX_SYMBOL : str = Field("$VIX", env="VOLATILITY_INDEX_SYMBOL")
+    
     class Config:
         # Path to the .env file (relative to project root)
         env_file = ".env"
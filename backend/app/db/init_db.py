@@ -0,0 +1,20 @@
+"""
+Create any missing tables from the ORM models.
+
+Run once per deployment (or after adding a model), not on every API boot:
+
+    python -m app.db.init_db
+
+Changes to existing tables go through script/migrations/*.sql.
+"""
+from app.db.session import Base, engine
+import app.models  # noqa: F401  registers every model on Base.metadata
+
+
+def init_db(bind=engine):
+    Base.metadata.create_all(bind=bind)
+
+
+if __name__ == "__main__":
+    init_db()
+    print("Database tables are up to date.")
@@ -5,6 +5,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 from app.models.backtest import Backtest
+from app.models.backtest_trade import BacktestTrade, BacktestEquity
+from app.models.user import User
 from app.schemas.backtest import BacktestCreate, BacktestResult, BacktestTask
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
@@ -14,34 +16,38 @@ from datetime import timedelta
 from uuid import UUID
 from app.dependencies.database import get_db
 from app.core.config import settings
-from sqlalchemy import cast, JSON
+from app.utils.serializer import to_jsonable
+from sqlalchemy import cast, insert, JSON
 import json
 from typing import Optional, Dict, Any, List
-import numpy as np
 import datetime
-import pandas as pd
+import math
 from fastapi.responses import FileResponse
 from pathlib import Path
 
-def make_json_serializable(obj):
-    if isinstance(obj, (datetime.datetime, datetime.date, pd.Timestamp)):
-        return obj.isoformat()
-    if isinstance(obj, datetime.timedelta):
-        return obj.total_seconds()
-    if isinstance(obj, np.generic):
-        return obj.item()
-    if isinstance(obj, dict):
-        return {k: make_json_serializable(v) for k, v in obj.items()}
-    if isinstance(obj, (list, tuple, set)):
-        return [make_json_serializable(v) for v in obj]
-    return obj
 def safe_uuid(val):
     if not val or str(val).strip() == "":
         return None
     return val
 
-async def user_create_backtest(db: Session, backtest_task: BacktestTask):
-    print("+++++++++++++++++++++++++++++")
+ACTIVE_BACKTEST_STATUSES = ("queued", "running")
+
+async def user_create_backtest(db: AsyncSession, backtest_task: BacktestTask, max_active: Optional[int] = None):
+    """Insert a queued run; with ``max_active`` refuse (429) once the user has that many queued or running."""
+    if max_active is not None:
+        # Lock the user's row so concurrent starts of one user count and insert one at a time
+        await db.execute(select(User.id).where(User.id == backtest_task.user_id).with_for_update())
+        active = await db.scalar(
+            select(func.count(Backtest.id))
+            .where(Backtest.user_id == backtest_task.user_id)
+            .where(Backtest.status.in_(ACTIVE_BACKTEST_STATUSES))
+        )
+        if active >= max_active:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"You already have {max_active} backtests queued or running",
+            )
     db_backtest = Backtest(
         user_id = backtest_task.user_id,
         is_active = True,
@@ -50,10 +56,13 @@ async def user_create_backtest(db: Session, backtest_task: BacktestTask):
         bot_id = backtest_task.bot_id,
         start_date = backtest_task.start_date,
         end_date = backtest_task.end_date,
+        status = "queued",
+        priority = backtest_task.priority,
+        engine = backtest_task.engine,
     )
     db.add(db_backtest)
-    db.commit()
-    db.refresh(db_backtest)
+    await db.commit()
+    await db.refresh(db_backtest)
     return db_backtest
 
 def user_get_backtest(token: UUID, db: Session):
@@ -61,18 +70,184 @@ def user_get_backtest(token: UUID, db: Session):
     return db_backtest
 
 def user_get_backtests(user_id: UUID, db: Session):
-    db_backtests = db.query(Backtest).filter(Backtest.user_id == user_id).all()
+    # Backtest.result is deferred, so a listing reads only the narrow columns
+    db_backtests = (
+        db.query(Backtest)
+        .filter(Backtest.user_id == user_id)
+        .order_by(Backtest.created_at.desc())
+        .all()
+    )
     return db_backtests
 
+def user_get_backtest_trades(db: Session, backtest_id: UUID, offset: int = 0, limit: Optional[int] = None) -> List[BacktestTrade]:
+    query = (
+        db.query(BacktestTrade)
+        .filter(BacktestTrade.backtest_id == backtest_id)
+        .order_by(BacktestTrade.seq)
+        .offset(offset)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+def user_get_backtest_equity(db: Session, backtest_id: UUID) -> List[BacktestEquity]:
+    return (
+        db.query(BacktestEquity)
+        .filter(BacktestEquity.backtest_id == backtest_id)
+        .order_by(BacktestEquity.time)
+        .all()
+    )
+
+def user_count_active_backtests(db: Session, user_id: UUID) -> int:
+    return (
+        db.query(func.count(Backtest.id))
+        .filter(Backtest.user_id == user_id)
+        .filter(Backtest.status.in_(ACTIVE_BACKTEST_STATUSES))
+        .scalar()
+    )
+
+def user_get_backtest_queue_position(db: Session, db_backtest: Backtest) -> Optional[int]:
+    """1-based position among queued runs (higher priority first, then FIFO)."""
+    if db_backtest is None or db_backtest.status != "queued":
+        return None
+    ahead = (
+        db.query(func.count(Backtest.id))
+        .filter(Backtest.status == "queued")
+        .filter(
+            (Backtest.priority > db_backtest.priority)
+            | ((Backtest.priority == db_backtest.priority) & (Backtest.created_at < db_backtest.created_at))
+        )
+        .scalar()
+    )
+    return ahead + 1
+
+def user_add_celery_id_to_backtest(db: Session, id: UUID, celery_id: str):
+    db_backtest = db.query(Backtest).filter(Backtest.id == id).first()
+    db_backtest.celery_id = celery_id
+    db.commit()
+    db.refresh(db_backtest)
+    return db_backtest
+
+def user_start_backtest_run(session: Session, id: UUID) -> bool:
+    """Flip a queued run to running; False if it was cancelled while waiting."""
+    db_backtest = session.query(Backtest).filter(Backtest.id == id).first()
+    if db_backtest is None or db_backtest.status not in ACTIVE_BACKTEST_STATUSES:
+        return False
+    db_backtest.status = "running"
+    session.commit()
+    return True
+
+def user_get_backtest_status(session: Session, id: UUID) -> Optional[str]:
+    return session.query(Backtest.status).filter(Backtest.id == id).scalar()
+
+def user_set_backtest_status(session: Session, id: UUID, status: str):
+    db_backtest = session.query(Backtest).filter(Backtest.id == id).first()
+    db_backtest.status = status
+    if status not in ACTIVE_BACKTEST_STATUSES:
+        db_backtest.is_active = False
+        db_backtest.finished_at = func.now()
+    session.commit()
+    session.refresh(db_backtest)
+    return db_backtest
+
+SUMMARY_METRICS = ("total_return", "cagr", "volatility", "sharpe", "romad")
+
+def _number(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+def _timestamp(value) -> Optional[datetime.datetime]:
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time.min)
+    try:
+        return datetime.datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+def _date(value) -> Optional[datetime.date]:
+    value = _timestamp(value)
+    return value.date() if value is not None else None
+
+def _summary_columns(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Pop lumibot's summary metrics out of ``result`` into Backtest column values."""
+    columns = {key: _number(result.pop(key, None)) for key in SUMMARY_METRICS}
+    drawdown = result.pop("max_drawdown", None)
+    if isinstance(drawdown, dict):  # {"drawdown": .., "date": ..}
+        columns["max_drawdown"] = _number(drawdown.get("drawdown"))
+        columns["max_drawdown_date"] = _timestamp(drawdown.get("date"))
+    else:
+        columns["max_drawdown"] = _number(drawdown)
+        columns["max_drawdown_date"] = None
+    return columns
+
+def _records(value) -> List[Dict[str, Any]]:
+    """Row dicts from a list or, in one bulk conversion, a DataFrame."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else to_jsonable(value)
+
+def _trade_rows(backtest_id: UUID, trades: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        dict(
+            backtest_id=backtest_id,
+            seq=seq,
+            time=_timestamp(trade.get("time")),
+            symbol=str(trade.get("symbol") or ""),
+            right=str(trade["right"]).upper() if trade.get("right") else None,
+            expiration=_date(trade.get("expiration")),
+            strike=_number(trade.get("strike")),
+            side=str(trade.get("side") or ""),
+            quantity=_number(trade.get("quantity")) or 0.0,
+            price=_number(trade.get("price")),
+            trade_cost=_number(trade.get("trade_cost")),
+            reason=trade.get("reason"),
+        )
+        for seq, trade in enumerate(trades)
+        if _timestamp(trade.get("time")) is not None
+    ]
+
+def _equity_rows(backtest_id: UUID, equity: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Keyed by time: the last point of a step wins if the engine reports it twice
+    rows = {}
+    for point in equity:
+        time = _timestamp(point.get("time"))
+        value = _number(point.get("portfolio_value"))
+        if time is None or value is None:
+            continue
+        rows[time] = dict(backtest_id=backtest_id, time=time, portfolio_value=value, cash=_number(point.get("cash")))
+    return list(rows.values())
+
 def user_finish_backtest(session: Session, id: UUID, result: Dict[str, Any]):
+    """Store a finished run: summary metrics in columns, ``result["trades"]`` and
+    ``result["equity"]`` as rows, and only what is left as the JSON result."""
+    result = dict(result or {})
+    trades = _records(result.pop("trades", None))
+    equity = _records(result.pop("equity", None))
     db_backtest = session.query(Backtest).filter(Backtest.id == id).first()
     db_backtest.is_active = False
-    db_backtest.result = make_json_serializable(result)
-    db_backtest.finised_at = func.now()
+    db_backtest.status = "finished"
+    for key, value in _summary_columns(result).items():
+        setattr(db_backtest, key, value)
+    db_backtest.result = to_jsonable(result)
+    db_backtest.finished_at = func.now()
+    # A retried task replaces the previous attempt's rows
+    session.query(BacktestTrade).filter(BacktestTrade.backtest_id == id).delete(synchronize_session=False)
+    session.query(BacktestEquity).filter(BacktestEquity.backtest_id == id).delete(synchronize_session=False)
+    trade_rows = _trade_rows(id, trades)
+    # Count the rows stored, not the fills _trade_rows drops
+    db_backtest.trade_count = len(trade_rows)
+    if trade_rows:
+        session.execute(insert(BacktestTrade), trade_rows)
+    equity_rows = _equity_rows(id, equity)
+    if equity_rows:
+        session.execute(insert(BacktestEquity), equity_rows)
     session.commit()
     session.refresh(db_backtest)
-    db_backtest = session.query(Backtest).filter(Backtest.id == id).first()
-    print("is_Active: ", db_backtest.is_active)
     return db_backtest
 
 def user_get_tearsheet_html(backtest_id: UUID):
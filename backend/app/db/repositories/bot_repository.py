@@ -20,7 +20,7 @@ from datetime import timedelta
 from uuid import UUID
 from app.schemas.bot import BotCreate, BotInfo, BotFilter, BotEdit, BotChange
 from app.schemas.trading_log import TradingLogCreateLowData
-from app.db.repositories.trading_account_repository import user_get_trading_account
+from app.models.trading_account import TradingAccount
 from app.dependencies.database import get_db
 from app.core.security import create_access_token
 from app.core.config import settings
@@ -138,7 +138,7 @@ def user_edit_bot(db: Session, bot_edit: BotChange):
     return db_bots
 
 
-async def user_get_bots(db: Session, bot_filters: BotFilter):
+async def user_get_bots(db: AsyncSession, bot_filters: BotFilter):
     # Start building the query
     query = (
         select(Bot)
@@ -189,19 +189,20 @@ async def user_get_bots(db: Session, bot_filters: BotFilter):
             Bot.trade_entry["days_of_week_to_enter"][5].as_boolean() == True
         )
 
-    result = db.execute(query)
+    result = await db.execute(query)
     bots = result.scalars().all()
     print(bots)
     return bots
 
 
-async def user_get_bot(db: Session, id: UUID):
-    db_bot = db.query(Bot).filter(Bot.id == id).first()
-    return db_bot
+async def user_get_bot(db: AsyncSession, id: UUID):
+    result = await db.execute(select(Bot).filter(Bot.id == id))
+    return result.scalars().first()
 
 
-async def user_get_setting_history(db: Session, filter: BotSettingHistoryFilter):
-    query = select(BotsSettingHistory).filter(
+async def user_get_setting_history(db: AsyncSession, filter: BotSettingHistoryFilter):
+    # The endpoint reads entry.bot.name; lazy loads are not available on an AsyncSession
+    query = select(BotsSettingHistory).options(joinedload(BotsSettingHistory.bot)).filter(
         BotsSettingHistory.user_id == UUID(filter.user_id)
     )
 
@@ -216,22 +217,24 @@ async def user_get_setting_history(db: Session, filter: BotSettingHistoryFilter)
             BotsSettingHistory.changed_at <= filter.to_time,
         )
 
-    result = db.execute(query)
+    result = await db.execute(query)
     history = result.scalars().all()
     return history
 
 
-async def user_get_bots_for_trading_dashboard(db: Session, user_id: UUID):
-    db_bots = (
-        db.query(Bot)
+async def user_get_bots_for_trading_dashboard(db: AsyncSession, user_id: UUID):
+    # One round trip: strategy and account names come from the joins
+    result = await db.execute(
+        select(Bot, Strategy.name, TradingAccount.name)
+        .join(Strategy, Strategy.id == Bot.strategy_id)
+        .outerjoin(TradingAccount, TradingAccount.id == Bot.trading_account_id)
         .filter(Bot.user_id == user_id)
         .order_by(Bot.name)  # ascending alphabetical
-        .all()
     )
+    rows = result.all()
 
     bots_for_trading_dashboard = []
-    for db_bot in db_bots:
-        strategy = db.query(Strategy).filter(Strategy.id == db_bot.strategy_id).first()
+    for db_bot, strategy_name, account_name in rows:
         bot = {}
         bot["id"] = db_bot.id
         bot["name"] = db_bot.name
@@ -239,13 +242,12 @@ async def user_get_bots_for_trading_dashboard(db: Session, user_id: UUID):
             bot["status"] = "active"
         else:
             bot["status"] = "stopped"
-        bot["strategy"] = strategy.name
+        bot["strategy"] = strategy_name
         bot["pnl"] = db_bot.total_profit + db_bot.total_loss
         bot["pnlPercent"] = round(db_bot.win_rate * 100, 2)
         bot["trades"] = db_bot.win_trades_count + db_bot.loss_trades_count
         if db_bot.trading_account_id:
-            trading_account = user_get_trading_account(db, db_bot.trading_account_id)
-            bot["account"] = trading_account.name
+            bot["account"] = account_name
         else:
             bot["account"] = "None"
         bots_for_trading_dashboard.append(bot)
@@ -253,9 +255,9 @@ async def user_get_bots_for_trading_dashboard(db: Session, user_id: UUID):
 
 
 async def user_update_bot_balance(
-    db: Session, trading_log_create_low_data: TradingLogCreateLowData
+    db: AsyncSession, trading_log_create_low_data: TradingLogCreateLowData
 ) -> Bot:
-    db_bot = db.query(Bot).filter(Bot.id == trading_log_create_low_data.bot_id).first()
+    db_bot = await user_get_bot(db, trading_log_create_low_data.bot_id)
     if trading_log_create_low_data.profit >= 0:
         db_bot.total_profit = db_bot.total_profit + trading_log_create_low_data.profit
         db_bot.win_trades_count += 1
@@ -265,6 +267,6 @@ async def user_update_bot_balance(
     db_bot.win_rate = db_bot.win_trades_count / (
         db_bot.win_trades_count + db_bot.loss_trades_count
     )
-    db.commit()
-    db.refresh(db_bot)
+    await db.commit()
+    await db.refresh(db_bot)
     return db_bot
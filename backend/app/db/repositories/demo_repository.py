@@ -55,8 +55,9 @@ def user_add_demo_trading_account_to_bot(
     return db_bot
 
 
-async def user_delete_demo_at_bot(db: Session, user_id: UUID):
-    db_bots = db.query(Bot).filter(Bot.user_id == user_id).all()
+async def user_delete_demo_at_bot(db: AsyncSession, user_id: UUID):
+    result = await db.execute(select(Bot).filter(Bot.user_id == user_id))
+    db_bots = result.scalars().all()
     if not db_bots:
         return False
     for bot in db_bots:
@@ -66,13 +67,13 @@ async def user_delete_demo_at_bot(db: Session, user_id: UUID):
         bot.win_rate = 0.0
         bot.win_trades_count = 0
         bot.loss_trades_count = 0
-        db.commit()
-        db.refresh(bot)
+    await db.commit()
     return db_bots
 
 
-async def user_delete_demo_at_user(db: Session, user_id: UUID):
-    db_user = db.query(User).filter(User.id == user_id).first()
+async def user_delete_demo_at_user(db: AsyncSession, user_id: UUID):
+    result = await db.execute(select(User).filter(User.id == user_id))
+    db_user = result.scalars().first()
     db_user.total_balance = 0.0
     db_user.total_profit = 0.0
     db_user.total_loss = 0.0
@@ -80,13 +81,13 @@ async def user_delete_demo_at_user(db: Session, user_id: UUID):
     db_user.total_losses = 0
     db_user.win_rate = 0.0
     db_user.demo_status = False
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     return db_user
 
 
-async def user_delete_demo_at_strategy(db: Session, user_id: UUID):
-    db_stratgies = db.query(Strategy).filter(Strategy.user_id == user_id).all()
+async def user_delete_demo_at_strategy(db: AsyncSession, user_id: UUID):
+    result = await db.execute(select(Strategy).filter(Strategy.user_id == user_id))
+    db_stratgies = result.scalars().all()
     if not db_stratgies:
         return False
     for strategy in db_stratgies:
@@ -94,6 +95,5 @@ async def user_delete_demo_at_strategy(db: Session, user_id: UUID):
         strategy.total_loss = 0.0
         strategy.total_wins = 0
         strategy.total_losses = 0
-        db.commit()
-        db.refresh(strategy)
+    await db.commit()
     return db_stratgies
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, func, select
 from uuid import UUID
 
 from app.models.trading_account import TradingAccount
@@ -82,13 +83,12 @@ def user_update_trading_account(
 
 
 async def user_update_balance(
-    db: Session, update_balance: BalanceUpdate
+    db: AsyncSession, update_balance: BalanceUpdate
 ) -> TradingAccount | None:
-    db_trading_account = (
-        db.query(TradingAccount)
-        .filter(TradingAccount.id == update_balance.trading_account_id)
-        .first()
+    result = await db.execute(
+        select(TradingAccount).filter(TradingAccount.id == update_balance.trading_account_id)
     )
+    db_trading_account = result.scalars().first()
     if not db_trading_account:
         return None
 
@@ -102,15 +102,15 @@ async def user_update_balance(
     db_trading_account.win_rate = db_trading_account.total_wins / (
         db_trading_account.total_wins + db_trading_account.total_losses
     )
-    db.commit()
-    db.refresh(db_trading_account)
+    await db.commit()
+    await db.refresh(db_trading_account)
     return db_trading_account
 
 
 async def user_delete_trading_account(
-    db: Session, trading_account_filter: TradingAccountFilter
+    db: AsyncSession, trading_account_filter: TradingAccountFilter
 ):
-    query = db.query(TradingAccount).filter(
+    query = delete(TradingAccount).filter(
         TradingAccount.user_id == trading_account_filter.user_id
     )
 
@@ -121,6 +121,6 @@ async def user_delete_trading_account(
 
     if trading_account_filter.type:
         query = query.filter(TradingAccount.type == trading_account_filter.type)
-    query.delete(synchronize_session=False)
-    db.commit()
+    await db.execute(query.execution_options(synchronize_session=False))
+    await db.commit()
     return True
@@ -5,11 +5,18 @@ from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 from sqlalchemy import cast, JSON
 from sqlalchemy.future import select
-from sqlalchemy import asc, desc
+from sqlalchemy import asc, desc, bindparam, delete, insert, update, tuple_
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import datetime
 from uuid import UUID
 
+from app.models.bot import Bot
+from app.models.strategy import Strategy
+from app.models.trading_account import TradingAccount
 from app.models.trading_log import TradingLog
-from app.schemas.trading_log import TradingLogFilter, TradingLogCreate
+from app.models.user import User
+from app.db.repositories.trading_log_rollup_repository import user_add_to_rollups, user_rebuild_rollups
+from app.schemas.trading_log import TradingLogFilter, TradingLogCreate, TradingLogCreateLowData
 
 
 def safe_uuid(val):
@@ -58,10 +65,199 @@ def user_create_trading_log(db: Session, trading_log_create: TradingLogCreate):
     return db_trading_log
 
 
-def user_get_trading_logs(
-    db: Session, trading_log_filter: TradingLogFilter
-) -> list[TradingLog]:
-    query = db.query(TradingLog).filter(
+class _Counters:
+    """Running profit/loss/win counters of one bot, strategy, account or user."""
+
+    def __init__(self, total_profit, total_loss, wins, losses):
+        self.total_profit = total_profit or 0.0
+        self.total_loss = total_loss or 0.0
+        self.wins = wins or 0
+        self.losses = losses or 0
+        self.delta_profit = 0.0
+        self.delta_loss = 0.0
+        self.delta_wins = 0
+        self.delta_losses = 0
+
+    def add(self, profit: float):
+        if profit >= 0:
+            self.total_profit += profit
+            self.delta_profit += profit
+            self.wins += 1
+            self.delta_wins += 1
+        else:
+            self.total_loss += profit
+            self.delta_loss += profit
+            self.losses += 1
+            self.delta_losses += 1
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / (self.wins + self.losses)
+
+
+def _locked(db: Session, model, ids) -> dict:
+    # Lock in id order so concurrent batches cannot deadlock each other
+    rows = (
+        db.query(model)
+        .filter(model.id.in_(ids))
+        .order_by(model.id)
+        .with_for_update()
+        .all()
+    )
+    return {row.id: row for row in rows}
+
+
+def _increment(db: Session, model, profit_col, loss_col, wins_col, losses_col, counters: Dict[UUID, _Counters], **assign):
+    """One executemany UPDATE adding each row's deltas; ``assign`` maps column -> {id: value}."""
+    table = model.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("row_id"))
+        .values(
+            {
+                profit_col: func.coalesce(table.c[profit_col], 0.0) + bindparam("d_profit"),
+                loss_col: func.coalesce(table.c[loss_col], 0.0) + bindparam("d_loss"),
+                wins_col: func.coalesce(table.c[wins_col], 0) + bindparam("d_wins"),
+                losses_col: func.coalesce(table.c[losses_col], 0) + bindparam("d_losses"),
+                **{column: bindparam(f"set_{column}") for column in assign},
+            }
+        )
+    )
+    params = [
+        {
+            "row_id": row_id,
+            "d_profit": c.delta_profit,
+            "d_loss": c.delta_loss,
+            "d_wins": c.delta_wins,
+            "d_losses": c.delta_losses,
+            **{f"set_{column}": values[row_id] for column, values in assign.items()},
+        }
+        for row_id, c in counters.items()
+    ]
+    if params:
+        db.execute(stmt, params)
+
+
+def user_ingest_trading_logs(db: Session, fills: List[TradingLogCreateLowData]) -> List[TradingLog]:
+    """Apply a batch of fills in one transaction.
+
+    The bots, strategies, accounts and users touched by the batch are read
+    once (row-locked), every fill's ``current_*`` snapshot is computed in
+    memory, the counters are bumped with one UPDATE per table, the logs are
+    bulk-inserted and folded into the P&L rollups.
+    """
+    if not fills:
+        return []
+    bots = _locked(db, Bot, {fill.bot_id for fill in fills})
+    missing = {fill.bot_id for fill in fills} - bots.keys()
+    if missing:
+        raise ValueError(f"Unknown bot ids: {sorted(map(str, missing))}")
+    strategies = _locked(db, Strategy, {bot.strategy_id for bot in bots.values()})
+    accounts = _locked(db, TradingAccount, {bot.trading_account_id for bot in bots.values() if bot.trading_account_id})
+    users = _locked(db, User, {bot.user_id for bot in bots.values()})
+    user_balances = dict(
+        db.query(TradingAccount.user_id, func.coalesce(func.sum(TradingAccount.current_balance), 0.0))
+        .filter(TradingAccount.user_id.in_(users.keys()))
+        .group_by(TradingAccount.user_id)
+        .all()
+    )
+
+    bot_counters = {
+        id: _Counters(b.total_profit, b.total_loss, b.win_trades_count, b.loss_trades_count) for id, b in bots.items()
+    }
+    strategy_counters = {
+        id: _Counters(s.total_profit, s.total_loss, s.total_wins, s.total_losses) for id, s in strategies.items()
+    }
+    account_counters = {
+        id: _Counters(a.total_profit, a.total_loss, a.total_wins, a.total_losses) for id, a in accounts.items()
+    }
+    user_counters = {
+        id: _Counters(u.total_profit, u.total_loss, u.total_wins, u.total_losses) for id, u in users.items()
+    }
+    account_balances = {id: a.current_balance or 0.0 for id, a in accounts.items()}
+    user_total_balances = {id: u.total_balance for id, u in users.items()}
+
+    rows = []
+    for fill in fills:
+        bot = bots[fill.bot_id]
+        profit = fill.profit
+        bot_c = bot_counters[bot.id]
+        strategy_c = strategy_counters[bot.strategy_id]
+        bot_c.add(profit)
+        strategy_c.add(profit)
+        account_c = account_counters.get(bot.trading_account_id)
+        if account_c is not None:
+            account_c.add(profit)
+            account_balances[bot.trading_account_id] += profit
+            user_balances[bot.user_id] = user_balances.get(bot.user_id, 0.0) + profit
+        total_balance = user_balances.get(bot.user_id, 0.0)
+        user_c = user_counters[bot.user_id]
+        user_c.add(profit)
+        # Matches the per-fill path, which adds the profit on top of the fresh account sum
+        user_total_balances[bot.user_id] = total_balance + profit
+        rows.append(
+            {
+                "user_id": bot.user_id,
+                "bot_id": bot.id,
+                "strategy_id": bot.strategy_id,
+                "trading_account_id": bot.trading_account_id,
+                "trading_task_id": fill.trading_task_id,
+                "symbol": strategies[bot.strategy_id].symbol,
+                "profit": profit,
+                "win_loss": profit >= 0,
+                "current_account_balance": account_balances.get(bot.trading_account_id),
+                "current_total_balance": total_balance,
+                "current_win_rate": bot_c.win_rate,
+                "current_total_profit": bot_c.total_profit,
+                "current_total_loss": bot_c.total_loss,
+                "current_total_wins": bot_c.wins,
+                "current_total_losses": bot_c.losses,
+                "current_win_rate_for_user": user_c.win_rate,
+                "current_total_profit_for_user": user_c.total_profit,
+                "current_total_loss_for_user": user_c.total_loss,
+                "current_total_wins_for_user": user_c.wins,
+                "current_total_losses_for_user": user_c.losses,
+                "current_win_rate_for_account": account_c.win_rate if account_c else None,
+                "current_total_profit_for_account": account_c.total_profit if account_c else None,
+                "current_total_loss_for_account": account_c.total_loss if account_c else None,
+                "current_total_wins_for_account": account_c.wins if account_c else None,
+                "current_total_losses_for_account": account_c.losses if account_c else None,
+                "current_win_rate_for_strategy": strategy_c.win_rate,
+                "current_total_profit_for_strategy": strategy_c.total_profit,
+                "current_total_loss_for_strategy": strategy_c.total_loss,
+                "current_total_wins_for_strategy": strategy_c.wins,
+                "current_total_losses_for_strategy": strategy_c.losses,
+            }
+        )
+
+    _increment(
+        db, Bot, "total_profit", "total_loss", "win_trades_count", "loss_trades_count", bot_counters,
+        win_rate={id: c.win_rate for id, c in bot_counters.items()},
+    )
+    _increment(db, Strategy, "total_profit", "total_loss", "total_wins", "total_losses", strategy_counters)
+    _increment(
+        db, TradingAccount, "total_profit", "total_loss", "total_wins", "total_losses", account_counters,
+        win_rate={id: c.win_rate for id, c in account_counters.items()},
+        current_balance=account_balances,
+    )
+    _increment(
+        db, User, "total_profit", "total_loss", "total_wins", "total_losses", user_counters,
+        win_rate={id: c.win_rate for id, c in user_counters.items()},
+        total_balance=user_total_balances,
+    )
+    # clock_timestamp() rather than now(): logs of one batch keep their order
+    trading_logs = db.scalars(
+        insert(TradingLog).values(time=func.clock_timestamp()).returning(TradingLog),
+        rows,
+    ).all()
+    user_add_to_rollups(db, trading_logs)
+    db.commit()
+    return trading_logs
+
+
+def _filter_trading_logs(query, trading_log_filter: TradingLogFilter):
+    """Apply a TradingLogFilter to an ORM query or a select()."""
+    query = query.filter(
         TradingLog.user_id == trading_log_filter.user_id
     )
 
@@ -92,6 +288,13 @@ def user_get_trading_logs(
 
     if trading_log_filter.end_time:
         query = query.filter(TradingLog.time <= trading_log_filter.end_time)
+    return query
+
+
+def user_get_trading_logs(
+    db: Session, trading_log_filter: TradingLogFilter
+) -> list[TradingLog]:
+    query = _filter_trading_logs(db.query(TradingLog), trading_log_filter)
     if trading_log_filter.limit != None:
         query = query.order_by(desc(TradingLog.time))
         query = query.limit(trading_log_filter.limit)
@@ -101,38 +304,65 @@ def user_get_trading_logs(
     return results
 
 
-def user_get_trading_log(db: Session, trading_log_id: UUID):
-    db_trading_log = (
-        db.query(TradingLog).filter(TradingLog.id == trading_log_id).first()
+def user_get_trading_logs_page(
+    db: Session,
+    trading_log_filter: TradingLogFilter,
+    after: Optional[Tuple[datetime, UUID]] = None,
+    limit: int = 100,
+    descending: bool = True,
+) -> list[TradingLog]:
+    """One keyset page ordered by (time, id); ``after`` is the last row of the previous page."""
+    query = _filter_trading_logs(db.query(TradingLog), trading_log_filter).filter(
+        TradingLog.time.isnot(None)
     )
-    return db_trading_log
+    key = tuple_(TradingLog.time, TradingLog.id)
+    if after is not None:
+        query = query.filter(key < after if descending else key > after)
+    if descending:
+        query = query.order_by(desc(TradingLog.time), desc(TradingLog.id))
+    else:
+        query = query.order_by(asc(TradingLog.time), asc(TradingLog.id))
+    return query.limit(limit).all()
 
 
-async def user_delete_trading_logs(db: Session, trading_log_filter: TradingLogFilter):
-    query = db.query(TradingLog).filter(
-        TradingLog.user_id == trading_log_filter.user_id
+def user_iter_trading_log_rows(
+    db: Session, trading_log_filter: TradingLogFilter, batch_size: int = 1000
+) -> Iterator[dict]:
+    """Stream matching rows as plain dicts through a server-side cursor."""
+    stmt = (
+        _filter_trading_logs(select(*TradingLog.__table__.c), trading_log_filter)
+        .order_by(asc(TradingLog.time), asc(TradingLog.id))
+        .execution_options(yield_per=batch_size)
     )
+    for row in db.execute(stmt).mappings():
+        yield dict(row)
 
-    if trading_log_filter.bot_id:
-        query = query.filter(TradingLog.bot_id == trading_log_filter.bot_id)
 
-    if trading_log_filter.trading_account_id:
-        query = query.filter(
-            TradingLog.trading_account_id == trading_log_filter.trading_account_id
-        )
+def user_get_recent_trades(db: Session, user_id: UUID, limit: int):
+    """Latest logs with their bot and strategy names, in a single joined query."""
+    return (
+        db.query(TradingLog, Bot.name, Strategy.name)
+        .join(Bot, Bot.id == TradingLog.bot_id)
+        .join(Strategy, Strategy.id == TradingLog.strategy_id)
+        .filter(TradingLog.user_id == user_id)
+        .order_by(desc(TradingLog.time))
+        .limit(limit)
+        .all()
+    )
 
-    if trading_log_filter.trading_task_id:
-        query = query.filter(
-            TradingLog.trading_task_id == trading_log_filter.trading_task_id
-        )
 
-    if trading_log_filter.symbol:
-        query = query.filter(TradingLog.symbol == trading_log_filter.symbol)
+def user_get_trading_log(db: Session, trading_log_id: UUID):
+    db_trading_log = (
+        db.query(TradingLog).filter(TradingLog.id == trading_log_id).first()
+    )
+    return db_trading_log
 
-    if trading_log_filter.win_loss is not None:
-        query = query.filter(TradingLog.win_loss == trading_log_filter.win_loss)
 
+async def user_delete_trading_logs(db: AsyncSession, trading_log_filter: TradingLogFilter):
     # Bulk delete
-    query.delete(synchronize_session=False)
-    db.commit()
+    query = _filter_trading_logs(delete(TradingLog), trading_log_filter)
+    await db.execute(query.execution_options(synchronize_session=False))
+    # The filter can cut across buckets, so recount the user's rollups from what is left
+    await db.run_sync(user_rebuild_rollups, trading_log_filter.user_id)
+    await db.commit()
     return True
@@ -0,0 +1,152 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from sqlalchemy import case, asc
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Iterable, Optional
+from datetime import datetime
+from uuid import UUID
+
+from app.models.trading_log import TradingLog
+from app.models.trading_log_rollup import TradingLogRollup
+
+# Rollup scope -> TradingLog column it groups by
+SCOPES = {
+    "user": TradingLog.user_id,
+    "bot": TradingLog.bot_id,
+    "strategy": TradingLog.strategy_id,
+    "account": TradingLog.trading_account_id,
+}
+GRANULARITIES = ("day", "hour")
+
+_COUNTERS = ("trades", "wins", "losses", "profit", "total_profit", "total_loss")
+
+
+def rollup_bucket(time: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return time.replace(minute=0, second=0, microsecond=0)
+    return time.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _upsert(db: Session, rows: list):
+    if not rows:
+        return
+    table = TradingLogRollup.__table__
+    stmt = pg_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_trading_log_rollups_bucket",
+        set_={name: table.c[name] + stmt.excluded[name] for name in _COUNTERS},
+    )
+    db.execute(stmt, rows)
+
+
+def user_add_to_rollups(db: Session, trading_logs: Iterable[TradingLog]):
+    """Fold freshly inserted logs into their rollup buckets; the caller commits."""
+    totals = {}
+    for log in trading_logs:
+        profit = log.profit or 0.0
+        for scope, column in SCOPES.items():
+            scope_id = getattr(log, column.key)
+            if scope_id is None:
+                continue
+            for granularity in GRANULARITIES:
+                key = (scope, scope_id, granularity, rollup_bucket(log.time, granularity))
+                row = totals.get(key)
+                if row is None:
+                    row = totals[key] = dict(
+                        user_id=log.user_id,
+                        scope=scope,
+                        scope_id=scope_id,
+                        granularity=granularity,
+                        bucket=key[3],
+                        **{name: 0 for name in _COUNTERS},
+                    )
+                row["trades"] += 1
+                row["profit"] += profit
+                if profit >= 0:
+                    row["wins"] += 1
+                    row["total_profit"] += profit
+                else:
+                    row["losses"] += 1
+                    row["total_loss"] += profit
+    # Sorted so concurrent batches take the bucket row locks in the same order
+    _upsert(db, [totals[key] for key in sorted(totals, key=lambda k: (k[0], str(k[1]), k[2], k[3]))])
+
+
+def user_rebuild_rollups(db: Session, user_id: Optional[UUID] = None):
+    """Recompute rollups from trading_logs (all users when ``user_id`` is None); the caller commits."""
+    delete_query = db.query(TradingLogRollup)
+    if user_id is not None:
+        delete_query = delete_query.filter(TradingLogRollup.user_id == user_id)
+    delete_query.delete(synchronize_session=False)
+    for scope, column in SCOPES.items():
+        for granularity in GRANULARITIES:
+            bucket = func.date_trunc(granularity, TradingLog.time)
+            query = db.query(
+                TradingLog.user_id,
+                column,
+                bucket,
+                func.count(TradingLog.id),
+                func.sum(case((TradingLog.profit >= 0, 1), else_=0)),
+                func.sum(case((TradingLog.profit < 0, 1), else_=0)),
+                func.coalesce(func.sum(TradingLog.profit), 0.0),
+                func.coalesce(func.sum(case((TradingLog.profit >= 0, TradingLog.profit), else_=0.0)), 0.0),
+                func.coalesce(func.sum(case((TradingLog.profit < 0, TradingLog.profit), else_=0.0)), 0.0),
+            ).filter(column.isnot(None), TradingLog.time.isnot(None))
+            if user_id is not None:
+                query = query.filter(TradingLog.user_id == user_id)
+            rows = [
+                dict(
+                    user_id=row[0],
+                    scope=scope,
+                    scope_id=row[1],
+                    granularity=granularity,
+                    bucket=row[2],
+                    **dict(zip(_COUNTERS, row[3:])),
+                )
+                for row in query.group_by(TradingLog.user_id, column, bucket).all()
+            ]
+            _upsert(db, rows)
+
+
+def _scoped(db: Session, query, user_id: UUID, scope: str, scope_id: Optional[UUID], granularity: str, start_time, end_time):
+    query = query.filter(
+        TradingLogRollup.user_id == user_id,
+        TradingLogRollup.scope == scope,
+        TradingLogRollup.scope_id == (scope_id or user_id),
+        TradingLogRollup.granularity == granularity,
+    )
+    if start_time:
+        query = query.filter(TradingLogRollup.bucket >= rollup_bucket(start_time, granularity))
+    if end_time:
+        query = query.filter(TradingLogRollup.bucket <= end_time)
+    return query
+
+
+def user_get_rollups(
+    db: Session,
+    user_id: UUID,
+    scope: str = "user",
+    scope_id: Optional[UUID] = None,
+    granularity: str = "day",
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> list[TradingLogRollup]:
+    """Buckets in time order; with ``limit`` the most recent ``limit`` buckets."""
+    query = _scoped(db, db.query(TradingLogRollup), user_id, scope, scope_id, granularity, start_time, end_time)
+    if limit is not None:
+        return list(reversed(query.order_by(TradingLogRollup.bucket.desc()).limit(limit).all()))
+    return query.order_by(asc(TradingLogRollup.bucket)).all()
+
+
+def user_get_rollup_profit(
+    db: Session,
+    user_id: UUID,
+    scope: str = "user",
+    scope_id: Optional[UUID] = None,
+    granularity: str = "day",
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> float:
+    query = db.query(func.coalesce(func.sum(TradingLogRollup.profit), 0.0))
+    return _scoped(db, query, user_id, scope, scope_id, granularity, start_time, end_time).scalar()
@@ -1,8 +1,49 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.utils.serializer import dumps_str
 
-engine = create_engine(settings.DATABASE_URL)
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with the asyncpg driver, e.g. postgresql+asyncpg://..."""
+    scheme, rest = url.split("://", 1)
+    return f"{scheme.split('+', 1)[0]}+asyncpg://{rest}"
+
+
+def _engine_options(pool_size: int, max_overflow: int) -> dict:
+    return dict(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        # JSON columns (backtest results) are encoded with orjson
+        json_serializer=dumps_str,
+    )
+
+
+# API process: sync engine for the sync endpoints, asyncpg for the async ones
+engine = create_engine(
+    settings.DATABASE_URL, **_engine_options(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **_engine_options(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW),
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Background workers (Celery, trading scheduler) get their own pool so a
+# busy worker cannot starve API requests of connections
+worker_engine = create_engine(
+    settings.DATABASE_URL,
+    **_engine_options(settings.DB_WORKER_POOL_SIZE, settings.DB_WORKER_MAX_OVERFLOW),
+)
+WorkerSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=worker_engine)
+
 Base = declarative_base()
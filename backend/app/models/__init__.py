@@ -7,4 +7,6 @@ from .group import Group
 from .trading_log import TradingLog
 from .trading_task import TradingTask
 from .backtest import Backtest
+from .backtest_trade import BacktestTrade, BacktestEquity
 from .trading_account import TradingAccount
+from .trading_log_rollup import TradingLogRollup
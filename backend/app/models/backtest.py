@@ -1,13 +1,16 @@
-from sqlalchemy import Column, Integer, String, Boolean, JSON, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Boolean, JSON, DateTime, ForeignKey, Float, Index
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.session import Base
 import uuid
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 
 class Backtest(Base):
     __tablename__ = "backtests"
     # __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_backtests_status_priority_created_at", "status", "priority", "created_at"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -18,7 +21,23 @@ class Backtest(Base):
     end_date = Column(DateTime, nullable=False)
     strategy_id = Column(UUID(as_uuid=True), ForeignKey("strategies.id"), nullable=False)
     bot_id = Column(UUID(as_uuid=True), ForeignKey("bots.id"), nullable=False)
-    result = Column(JSON, nullable=True)
+    # Whatever the summary columns and the trade/equity tables do not hold
+    # (sweep rankings, engine extras); deferred so listings never load it
+    result = deferred(Column(JSON, nullable=True))
+    # queued -> running -> finished / failed / cancelled
+    status = Column(String, nullable=False, default="queued")
+    priority = Column(Integer, nullable=False, default=0)
+    celery_id = Column(String, nullable=True)
+    engine = Column(String, nullable=True)  # lumibot / replay
+    # Summary metrics of a finished single run
+    total_return = Column(Float, nullable=True)
+    cagr = Column(Float, nullable=True)
+    volatility = Column(Float, nullable=True)
+    sharpe = Column(Float, nullable=True)
+    max_drawdown = Column(Float, nullable=True)
+    max_drawdown_date = Column(DateTime, nullable=True)
+    romad = Column(Float, nullable=True)
+    trade_count = Column(Integer, nullable=True)
     
     user = relationship("User", back_populates="backtests")
     strategy = relationship('Strategy', back_populates='backtests')
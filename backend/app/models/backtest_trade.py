@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Float
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.session import Base
+
+
+class BacktestTrade(Base):
+    """One fill of a finished backtest run, in execution order."""
+
+    __tablename__ = "backtest_trades"
+
+    backtest_id = Column(UUID(as_uuid=True), ForeignKey("backtests.id", ondelete="CASCADE"), primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    time = Column(DateTime, nullable=False)
+    symbol = Column(String, nullable=False)
+    right = Column(String, nullable=True)  # CALL / PUT, None for the underlying
+    expiration = Column(Date, nullable=True)
+    strike = Column(Float, nullable=True)
+    side = Column(String, nullable=False)  # buy, sell, sell_to_open, buy_to_close
+    quantity = Column(Float, nullable=False)
+    price = Column(Float, nullable=True)
+    trade_cost = Column(Float, nullable=True)
+    reason = Column(String, nullable=True)  # entry, profit_target, stop, time_exit (replay engine)
+
+
+class BacktestEquity(Base):
+    """Portfolio value of a finished backtest run at each simulation step."""
+
+    __tablename__ = "backtest_equity"
+
+    backtest_id = Column(UUID(as_uuid=True), ForeignKey("backtests.id", ondelete="CASCADE"), primary_key=True)
+    time = Column(DateTime, primary_key=True)
+    portfolio_value = Column(Float, nullable=False)
+    cash = Column(Float, nullable=True)
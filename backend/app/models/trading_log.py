@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Float,
+    Index,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.session import Base
@@ -18,6 +19,15 @@ from sqlalchemy.orm import relationship
 class TradingLog(Base):
     __tablename__ = "trading_logs"
     # __table_args__ = {'extend_existing': True}
+    # One per filter shape of user_get_trading_logs; (time, id) is the keyset order
+    __table_args__ = (
+        Index("ix_trading_logs_user_id_time", "user_id", "time", "id"),
+        Index("ix_trading_logs_bot_id_time", "bot_id", "time", "id"),
+        Index("ix_trading_logs_strategy_id_time", "strategy_id", "time", "id"),
+        Index("ix_trading_logs_trading_account_id_time", "trading_account_id", "time", "id"),
+        Index("ix_trading_logs_trading_task_id_time", "trading_task_id", "time", "id"),
+        Index("ix_trading_logs_user_id_symbol_time", "user_id", "symbol", "time", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
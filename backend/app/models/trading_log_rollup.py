@@ -0,0 +1,36 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    ForeignKey,
+    Float,
+    Index,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.session import Base
+import uuid
+
+
+class TradingLogRollup(Base):
+    """P&L of one user/bot/strategy/account per day or hour, kept up to date on trade insert."""
+
+    __tablename__ = "trading_log_rollups"
+    __table_args__ = (
+        UniqueConstraint("scope", "scope_id", "granularity", "bucket", name="uq_trading_log_rollups_bucket"),
+        Index("ix_trading_log_rollups_user_scope_bucket", "user_id", "scope", "granularity", "bucket"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    scope = Column(String, nullable=False)  # user, bot, strategy or account
+    scope_id = Column(UUID(as_uuid=True), nullable=False)
+    granularity = Column(String, nullable=False)  # day or hour
+    bucket = Column(DateTime, nullable=False)  # start of the day/hour, same clock as TradingLog.time
+    trades = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    profit = Column(Float, nullable=False, default=0.0)
+    total_profit = Column(Float, nullable=False, default=0.0)
+    total_loss = Column(Float, nullable=False, default=0.0)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime, date
 from uuid import UUID
 import json
@@ -23,5 +23,80 @@ class BacktestTask(BaseModel):
     strategy_id: UUID
     start_date: date
     end_date: date
-    
-    
+    # 0 (default) .. 9 (most urgent)
+    priority: int = Field(0, ge=0, le=9)
+    # "lumibot": full event-driven simulation with reports;
+    # "replay": fast close-to-close replay over cached chains; metrics, trades
+    # and equity curve but no HTML reports
+    engine: Literal["lumibot", "replay"] = "lumibot"
+    # lumibot only: >1 splits the window into walk-forward segments run in
+    # parallel, each starting warmup_days early (default: longest leg DTE + 7)
+    segments: int = Field(1, ge=1)
+    warmup_days: Optional[int] = Field(None, ge=0)
+
+
+class BacktestSweepTask(BacktestTask):
+    # e.g. {"target_delta": [0.2, 0.3], "dte_value": [30, 45]}
+    grid: Dict[str, List[float]]
+    rank_by: Optional[str] = "total_return"
+
+
+class BacktestDrawdown(BaseModel):
+    drawdown: Optional[float] = None
+    date: Optional[datetime] = None
+
+
+class BacktestMetrics(BaseModel):
+    # Same keys lumibot reports, so clients read them as before
+    total_return: Optional[float] = None
+    cagr: Optional[float] = None
+    volatility: Optional[float] = None
+    sharpe: Optional[float] = None
+    romad: Optional[float] = None
+    max_drawdown: Optional[BacktestDrawdown] = None
+
+
+class BacktestSummary(BaseModel):
+    id: UUID
+    user_id: UUID
+    strategy_id: Optional[UUID] = None
+    bot_id: Optional[UUID] = None
+    is_active: Optional[bool] = None
+    status: Optional[str] = None
+    priority: Optional[int] = None
+    engine: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    trade_count: Optional[int] = None
+    result: Optional[BacktestMetrics] = None
+
+    class Config:
+        from_attributes = True
+
+
+class BacktestTradeInfo(BaseModel):
+    seq: int
+    time: datetime
+    symbol: str
+    right: Optional[str] = None
+    expiration: Optional[date] = None
+    strike: Optional[float] = None
+    side: str
+    quantity: float
+    price: Optional[float] = None
+    trade_cost: Optional[float] = None
+    reason: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class BacktestEquityPoint(BaseModel):
+    time: datetime
+    portfolio_value: float
+    cash: Optional[float] = None
+
+    class Config:
+        from_attributes = True
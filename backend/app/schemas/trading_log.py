@@ -47,6 +47,7 @@ class TradingLogCreate(TradingLogFilter):
 class TradingLogCreateLowData(BaseModel):
     bot_id: UUID
     profit: float
+    trading_task_id: Optional[UUID] = None
 
 
 class LogSimple(BaseModel):
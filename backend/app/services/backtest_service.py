@@ -1,13 +1,16 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from app.db.repositories.backtest_repository import user_create_backtest, user_finish_backtest, user_get_backtest, user_get_backtests, user_get_tearsheet_html, user_get_trades_html, user_get_indicators_html
+from app.db.repositories.backtest_repository import user_create_backtest, user_finish_backtest, user_get_backtest, user_get_backtests, user_get_tearsheet_html, user_get_trades_html, user_get_indicators_html, user_count_active_backtests, user_get_backtest_queue_position, user_add_celery_id_to_backtest, user_set_backtest_status, user_get_backtest_trades, user_get_backtest_equity, SUMMARY_METRICS
 from app.schemas.bots_setting_history import BotSettingHistoryFilter
-from app.schemas.backtest import BacktestCreate, BacktestTask
+from app.schemas.backtest import BacktestCreate, BacktestTask, BacktestMetrics, BacktestDrawdown, BacktestSummary
 import json
 from uuid import UUID
+from typing import Optional
+from app.core.config import settings
 
-async def create_backtest(db: Session, backtest_task: BacktestTask):
-    return await user_create_backtest(db, backtest_task)
+async def create_backtest(db: AsyncSession, backtest_task: BacktestTask):
+    return await user_create_backtest(db, backtest_task, settings.BACKTEST_MAX_PER_USER)
 
 def finish_backtest(db: Session, id: UUID, result: json):
     return user_finish_backtest(db, id, result)
@@ -18,6 +21,41 @@ def get_backtest(token: UUID, db: Session):
 def get_backtests(user_id: UUID, db: Session):
     return user_get_backtests(user_id, db)
 
+def backtest_metrics(backtest) -> Optional[BacktestMetrics]:
+    """Summary metrics of a finished single run, rebuilt from the narrow columns."""
+    if backtest.total_return is None and backtest.max_drawdown is None:
+        return None
+    return BacktestMetrics(
+        **{key: getattr(backtest, key) for key in SUMMARY_METRICS},
+        max_drawdown=BacktestDrawdown(drawdown=backtest.max_drawdown, date=backtest.max_drawdown_date),
+    )
+
+def backtest_summary(backtest) -> BacktestSummary:
+    # Read the columns by name: touching Backtest.result would load the deferred JSON
+    fields = {name: getattr(backtest, name) for name in BacktestSummary.model_fields if name != "result"}
+    return BacktestSummary(**fields, result=backtest_metrics(backtest))
+
+def get_backtest_summaries(user_id: UUID, db: Session):
+    return [backtest_summary(backtest) for backtest in user_get_backtests(user_id, db)]
+
+def get_backtest_trades(db: Session, backtest_id: UUID, offset: int = 0, limit: Optional[int] = None):
+    return user_get_backtest_trades(db, backtest_id, offset, limit)
+
+def get_backtest_equity(db: Session, backtest_id: UUID):
+    return user_get_backtest_equity(db, backtest_id)
+
+def count_active_backtests(db: Session, user_id: UUID) -> int:
+    return user_count_active_backtests(db, user_id)
+
+def get_backtest_queue_position(db: Session, backtest):
+    return user_get_backtest_queue_position(db, backtest)
+
+def add_celery_id_to_backtest(db: Session, id: UUID, celery_id: str):
+    return user_add_celery_id_to_backtest(db, id, celery_id)
+
+def cancel_backtest(db: Session, id: UUID):
+    return user_set_backtest_status(db, id, "cancelled")
+
 def get_tearsheet_html(backtest_id: UUID):
     return user_get_tearsheet_html(backtest_id)
 
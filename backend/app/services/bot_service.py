@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.db.repositories.bot_repository import (
     user_create_bot,
@@ -25,23 +26,23 @@ def edit_bot(db: Session, bot_edit: BotChange) -> Bot:
     return user_edit_bot(db, bot_edit)
 
 
-async def get_bots(db: Session, bot_filters: BotFilter):
+async def get_bots(db: AsyncSession, bot_filters: BotFilter):
     return await user_get_bots(db, bot_filters)
 
 
-async def get_bot(db: Session, id: UUID) -> Bot:
+async def get_bot(db: AsyncSession, id: UUID) -> Bot:
     return await user_get_bot(db, id)
 
 
-async def get_setting_history(db: Session, filter: BotSettingHistoryFilter):
+async def get_setting_history(db: AsyncSession, filter: BotSettingHistoryFilter):
     return await user_get_setting_history(db, filter)
 
 
-async def get_bots_for_trading_dashboard(db: Session, user_id: UUID):
+async def get_bots_for_trading_dashboard(db: AsyncSession, user_id: UUID):
     return await user_get_bots_for_trading_dashboard(db, user_id)
 
 
 async def update_bot_balance(
-    db: Session, trading_log_create_low_data: TradingLogCreateLowData
+    db: AsyncSession, trading_log_create_low_data: TradingLogCreateLowData
 ) -> Bot:
     return await user_update_bot_balance(db, trading_log_create_low_data)
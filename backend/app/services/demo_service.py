@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.models.trading_account import TradingAccount
 from app.models.enums import TradingAccountTypeEnum
@@ -30,7 +31,7 @@ from app.services.trading_account_service import (
     delete_trading_accounts,
 )
 from app.services.trading_log_service import (
-    create_trading_log,
+    ingest_trading_logs,
     get_trading_log,
     get_trading_logs,
     delete_trading_logs,
@@ -59,20 +60,22 @@ def create_demo_accounts(db: Session, user_id: UUID):
     return user_get_trading_accounts(db, trading_account_filter)
 
 
-async def create_demo_trading_logs_for_bot(db: Session, bot_id: UUID):
+def _demo_fills(bot_id: UUID, count: int = 30):
+    return [
+        TradingLogCreateLowData(bot_id=bot_id, profit=random.uniform(-1000.0, 1000.0))
+        for i in range(0, count)
+    ]
+
+
+async def create_demo_trading_logs_for_bot(db: AsyncSession, bot_id: UUID):
     bot = await get_bot(db, bot_id)
-    for i in range(0, 30):
-        profit = random.uniform(-1000.0, 1000.0)
-        trading_log_create_low_data = TradingLogCreateLowData(
-            bot_id=bot_id, profit=profit
-        )
-        await create_trading_log(db, trading_log_create_low_data)
+    await db.run_sync(ingest_trading_logs, _demo_fills(bot_id))
 
     trading_log_filter = TradingLogFilter(user_id=bot.user_id, bot_id=bot_id)
-    return get_trading_logs(db, trading_log_filter)
+    return await db.run_sync(get_trading_logs, trading_log_filter)
 
 
-async def create_demo_trading_logs(db: Session, user_id: UUID):
+async def create_demo_trading_logs(db: AsyncSession, user_id: UUID):
     bot_filters = BotFilter(
         user_id=user_id,
         entryDay="Any",
@@ -84,14 +87,13 @@ async def create_demo_trading_logs(db: Session, user_id: UUID):
         webhookPartial="No",
     )
     bots = await get_bots(db, bot_filters)
-    for bot in bots:
-        await create_demo_trading_logs_for_bot(db, bot.id)
+    await db.run_sync(ingest_trading_logs, [fill for bot in bots for fill in _demo_fills(bot.id)])
 
     trading_log_filter = TradingLogFilter(user_id=user_id)
-    return get_trading_logs(db, trading_log_filter)
+    return await db.run_sync(get_trading_logs, trading_log_filter)
 
 
-async def add_demo_trading_account_to_bots(db: Session, user_id: UUID):
+async def add_demo_trading_account_to_bots(db: AsyncSession, user_id: UUID):
     bot_filters = BotFilter(
         user_id=user_id,
         entryDay="Any",
@@ -107,26 +109,26 @@ async def add_demo_trading_account_to_bots(db: Session, user_id: UUID):
         return None
 
     trading_account_filter = TradingAccountFilter(user_id=user_id)
-    trading_accounts = get_trading_accounts(db, trading_account_filter)
+    trading_accounts = await db.run_sync(get_trading_accounts, trading_account_filter)
 
     if not trading_accounts:
-        trading_accounts = create_demo_accounts(db, user_id)
+        trading_accounts = await db.run_sync(create_demo_accounts, user_id)
 
     for bot in bots:
         assigned_account = random.choice(trading_accounts)
-        user_add_demo_trading_account_to_bot(db, bot.id, assigned_account.id)
+        await db.run_sync(user_add_demo_trading_account_to_bot, bot.id, assigned_account.id)
 
-    return get_bots(db, bot_filters)
+    return await get_bots(db, bot_filters)
 
 
-async def create_demo(db: Session, user_id: UUID):
+async def create_demo(db: AsyncSession, user_id: UUID):
     bots = await add_demo_trading_account_to_bots(db, user_id)
     if not bots:
         return None
     return await create_demo_trading_logs(db, user_id)
 
 
-async def delete_demo(db: Session, user_id: UUID):
+async def delete_demo(db: AsyncSession, user_id: UUID):
     trading_log_filter = TradingLogFilter(user_id=user_id)
     await delete_trading_logs(db, trading_log_filter)
     trading_account_filter = TradingAccountFilter(user_id=user_id)
@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.db.repositories.trading_account_repository import (
     user_get_trading_accounts,
@@ -39,7 +40,7 @@ def update_trading_account(db: Session, update: TradingAccountUpdate):
     return user_update_trading_account(db, update)
 
 
-async def update_balance(db: Session, update_balance: BalanceUpdate):
+async def update_balance(db: AsyncSession, update_balance: BalanceUpdate):
     return await user_update_balance(db, update_balance)
 
 
@@ -50,6 +51,6 @@ def get_trading_accounts(
 
 
 async def delete_trading_accounts(
-    db: Session, trading_account_filter: TradingAccountFilter
+    db: AsyncSession, trading_account_filter: TradingAccountFilter
 ):
     return await user_delete_trading_account(db, trading_account_filter)
@@ -1,85 +1,33 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.repositories.trading_log_repository import (
-    user_create_trading_log,
+    user_ingest_trading_logs,
     user_get_trading_log,
     user_get_trading_logs,
+    user_get_trading_logs_page,
+    user_iter_trading_log_rows,
+    user_get_recent_trades,
     user_delete_trading_logs,
 )
-from app.services.bot_service import get_bots, get_bot, update_bot_balance
-from app.services.strategy_service import get_strategy
-from app.services.trading_account_service import (
-    get_trading_account,
-    get_total_balance,
-    update_balance,
+from app.db.repositories.trading_log_rollup_repository import (
+    user_get_rollups,
+    user_get_rollup_profit,
 )
 from app.schemas.trading_log import (
     TradingLogFilter,
-    TradingLogCreate,
     TradingLogCreateLowData,
 )
-from app.services.strategy_service import update_balance_of_strategy
-from app.schemas.trading_account import BalanceUpdate
-from app.schemas.user import UpdateTrades
+from app.db.session import SessionLocal
+from typing import Iterator, List, Optional
+from datetime import datetime
 from uuid import UUID
+import base64, csv, io, json
 
+EXPORT_FORMATS = ("ndjson", "csv")
 
-async def create_trading_log(
-    db: Session, trading_log_create_low_data: TradingLogCreateLowData
-):
-    from app.services.user_service import update_trades
-
-    bot = await update_bot_balance(db, trading_log_create_low_data)
-    trading_account = get_trading_account(db, bot.trading_account_id)
-    strategy_performance = update_balance_of_strategy(
-        db, bot.strategy_id, trading_log_create_low_data.profit
-    )
-    update_balance_data = BalanceUpdate(
-        trading_account_id=trading_account.id, profit=trading_log_create_low_data.profit
-    )
-    updated_trading_account = await update_balance(db, update_balance_data)
-    total_balance = get_total_balance(db, bot.user_id)
-    update_trades_data = UpdateTrades(
-        user_id=bot.user_id,
-        profit=trading_log_create_low_data.profit,
-        total_balance=total_balance,
-    )
-    user = update_trades(db, update_trades_data)
-
-    trading_log_create = TradingLogCreate(
-        user_id=bot.user_id,
-        bot_id=bot.id,
-        strategy_id=bot.strategy_id,
-        trading_account_id=bot.trading_account_id,
-        symbol=strategy_performance.symbol,
-        profit=trading_log_create_low_data.profit,
-        win_loss=trading_log_create_low_data.profit >= 0,
-        current_account_balance=updated_trading_account.current_balance,
-        current_total_balance=total_balance,
-        current_win_rate=bot.win_rate,
-        current_total_profit=bot.total_profit,
-        current_total_loss=bot.total_loss,
-        current_total_wins=bot.win_trades_count,
-        current_total_losses=bot.loss_trades_count,
-        current_win_rate_for_user=user.win_rate,
-        current_total_profit_for_user=user.total_profit,
-        current_total_loss_for_user=user.total_loss,
-        current_total_wins_for_user=user.total_wins,
-        current_total_losses_for_user=user.total_losses,
-        current_win_rate_for_account=updated_trading_account.win_rate,
-        current_total_profit_for_account=updated_trading_account.total_profit,
-        current_total_loss_for_account=updated_trading_account.total_loss,
-        current_total_wins_for_account=updated_trading_account.total_wins,
-        current_total_losses_for_account=updated_trading_account.total_losses,
-        current_win_rate_for_strategy=(
-            strategy_performance.total_wins
-            / (strategy_performance.total_wins + strategy_performance.total_losses)
-        ),
-        current_total_profit_for_strategy=strategy_performance.total_profit,
-        current_total_loss_for_strategy=strategy_performance.total_loss,
-        current_total_wins_for_strategy=strategy_performance.total_wins,
-        current_total_losses_for_strategy=strategy_performance.total_losses,
-    )
-    return user_create_trading_log(db, trading_log_create)
+
+def ingest_trading_logs(db: Session, fills: List[TradingLogCreateLowData]):
+    return user_ingest_trading_logs(db, fills)
 
 
 def get_trading_log(db: Session, trading_log_id: UUID):
@@ -90,5 +38,78 @@ def get_trading_logs(db: Session, trading_log_filter: TradingLogFilter):
     return user_get_trading_logs(db, trading_log_filter)
 
 
-async def delete_trading_logs(db: Session, trading_log_filter: TradingLogFilter):
+def encode_cursor(trading_log) -> str:
+    raw = json.dumps([trading_log.time.isoformat(), str(trading_log.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """``(time, id)`` of the last row of the previous page; ValueError if malformed."""
+    try:
+        time, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(time), UUID(id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def get_trading_logs_page(
+    db: Session,
+    trading_log_filter: TradingLogFilter,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = True,
+):
+    after = decode_cursor(cursor) if cursor else None
+    # One extra row tells us whether there is a next page
+    rows = user_get_trading_logs_page(db, trading_log_filter, after, limit + 1, descending)
+    items = rows[:limit]
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(items[-1]) if len(rows) > limit else None,
+    }
+
+
+def export_trading_logs(trading_log_filter: TradingLogFilter, format: str = "ndjson") -> Iterator[str]:
+    """Yield the matching logs as NDJSON lines or CSV chunks, oldest first.
+
+    Uses its own session: the request's session is closed before a streaming
+    response starts sending.
+    """
+    db = SessionLocal()
+    try:
+        rows = user_iter_trading_log_rows(db, trading_log_filter)
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = None
+            for row in rows:
+                if writer is None:
+                    writer = csv.DictWriter(buffer, fieldnames=list(row.keys()))
+                    writer.writeheader()
+                writer.writerow(row)
+                if buffer.tell() > 64 * 1024:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for row in rows:
+                yield json.dumps(row, default=str) + "\n"
+    finally:
+        db.close()
+
+
+def get_profit_sum(db: Session, user_id: UUID, start_time, end_time, scope: str = "user", scope_id=None, granularity: str = "day") -> float:
+    return user_get_rollup_profit(db, user_id, scope, scope_id, granularity, start_time, end_time)
+
+
+def get_pnl_rollups(db: Session, user_id: UUID, scope: str = "user", scope_id=None, granularity: str = "day", start_time=None, end_time=None, limit=None):
+    return user_get_rollups(db, user_id, scope, scope_id, granularity, start_time, end_time, limit)
+
+
+def get_recent_trades(db: Session, user_id: UUID, limit: int):
+    return user_get_recent_trades(db, user_id, limit)
+
+
+async def delete_trading_logs(db: AsyncSession, trading_log_filter: TradingLogFilter):
     return await user_delete_trading_logs(db, trading_log_filter)
@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.db.repositories.user_repository import (
     user_update_preferences,
@@ -19,13 +20,13 @@ from app.db.repositories.user_repository import (
     user_update_trades,
     user_change_to_demo,
 )
-from app.services.trading_log_service import get_trading_logs
-from app.services.strategy_service import get_strategy, get_all_strategies
-from app.services.bot_service import get_bot, get_bots
+from app.services.trading_log_service import get_profit_sum, get_pnl_rollups, get_recent_trades
+from app.services.strategy_service import get_all_strategies
+from app.services.bot_service import get_bots
 from app.core.security import verify_password
 from app.core.security import hash_password
 from app.schemas.user import UserCreate, UpdateTrades, AccountInsights
-from app.schemas.trading_log import TradingLogFilter, LogSimple, RecenTrade
+from app.schemas.trading_log import LogSimple, RecenTrade
 from app.schemas.strategy import StrategyPerformance, StrategySimplePerformance
 from app.schemas.bot import BotFilter
 from app.models.user import User
@@ -34,8 +35,8 @@ from uuid import UUID
 from datetime import datetime, date, time
 
 
-async def get_account_insights(db: Session, user_id: UUID) -> AccountInsights:
-    user = get_user_by_id(db, user_id)
+async def get_account_insights(db: AsyncSession, user_id: UUID) -> AccountInsights:
+    user = await db.run_sync(get_user_by_id, user_id)
     # Get today's date
     today = date.today()
 
@@ -44,43 +45,34 @@ async def get_account_insights(db: Session, user_id: UUID) -> AccountInsights:
 
     # End of today (just before midnight tomorrow)
     end_of_day = datetime.combine(today, time.max)
-    trading_log_filter_for_today = TradingLogFilter(
-        user_id=user_id, start_time=start_of_day, end_time=end_of_day
-    )
-
-    today_trades = get_trading_logs(db, trading_log_filter_for_today)
-    today_pnl = 0
-    for trade in today_trades:
-        today_pnl += trade.profit
-    trading_log_filter_for_recent = TradingLogFilter(user_id=user_id, limit=5)
-    recent_trades = get_trading_logs(db, trading_log_filter_for_recent)
+    today_pnl = await db.run_sync(get_profit_sum, user_id, start_of_day, end_of_day)
     changed_recent_trades: list[RecenTrade] = []
-    for trade in recent_trades:
+    for trade, bot_name, strategy_name in await db.run_sync(get_recent_trades, user_id, 5):
         changed_recent_trade: RecenTrade = {}
         changed_recent_trade["id"] = str(trade.id)
         changed_recent_trade["symbol"] = trade.symbol
         changed_recent_trade["time"] = trade.time
         changed_recent_trade["pnl"] = trade.profit
-        bot = await get_bot(db, trade.bot_id)
-        changed_recent_trade["bot"] = bot.name
-        strategy = get_strategy(db, trade.strategy_id)
-        changed_recent_trade["strategy"] = strategy.name
+        changed_recent_trade["bot"] = bot_name
+        changed_recent_trade["strategy"] = strategy_name
         changed_recent_trades.append(changed_recent_trade)
 
-    trading_log_filter_for_user_pnl_logs = TradingLogFilter(user_id=user_id, limit=30)
-    user_pnl_logs = get_trading_logs(db, trading_log_filter_for_user_pnl_logs)
+    # Daily cumulative P&L for the chart, anchored so the last point equals total P&L
+    daily_rollups = await db.run_sync(
+        lambda session: get_pnl_rollups(session, user_id, granularity="day", limit=30)
+    )
+    running_pnl = user.total_profit + user.total_loss - sum(r.profit for r in daily_rollups)
     changed_user_pnl_logs: list[LogSimple] = []
-    for log in user_pnl_logs:
+    for rollup in daily_rollups:
+        running_pnl += rollup.profit
         changed_user_pnl_log: LogSimple = {}
-        changed_user_pnl_log["id"] = str(log.id)
-        changed_user_pnl_log["value"] = (
-            log.current_total_profit + log.current_total_loss
-        )
-        changed_user_pnl_log["time"] = log.time
+        changed_user_pnl_log["id"] = str(rollup.id)
+        changed_user_pnl_log["value"] = running_pnl
+        changed_user_pnl_log["time"] = rollup.bucket
         changed_user_pnl_logs.append(changed_user_pnl_log)
     active_bots_filter = BotFilter(user_id=user_id, is_actuve="Enabled")
     active_bots = await get_bots(db, active_bots_filter)
-    strategies = get_all_strategies(db, user_id)
+    strategies = await db.run_sync(get_all_strategies, user_id)
     changed_strategies: list[StrategySimplePerformance] = []
     for strategy in strategies:
         changed_strategy: StrategySimplePerformance = {}
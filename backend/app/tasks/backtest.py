@@ -0,0 +1,353 @@
+from datetime import datetime
+from uuid import UUID
+from celery import chord
+from celery_app import celery_app
+from app.core.config import settings
+from app.db.repositories.backtest_repository import (
+    user_start_backtest_run,
+    user_get_backtest_status,
+    user_set_backtest_status,
+    user_finish_backtest,
+)
+from app.db.session import WorkerSessionLocal as SessionLocal
+from app.utils.sweep import expand_grid, summarize_results, sweep_result, sweep_row
+from app.utils.backtest_progress import ProgressReporter, publish_state
+
+# app.utils.backtest (lumibot) and app.utils.replay (NumPy/pandas/pyarrow) are
+# imported inside the tasks: only a worker that actually runs a backtest pays
+# for them, not every Celery worker that registers these task names.
+
+
+def _queue_options(priority: int) -> dict:
+    # Same mapping as the API's _enqueue: Redis serves 0 first, the API's 9 is most urgent
+    return {"queue": settings.BACKTEST_QUEUE, "priority": 9 - priority}
+
+
+def _start_run(backtest_id: str) -> bool:
+    session = SessionLocal()
+    try:
+        return user_start_backtest_run(session, UUID(backtest_id))
+    finally:
+        session.close()
+
+
+def _mark_failed(backtest_id: str):
+    session = SessionLocal()
+    try:
+        user_set_backtest_status(session, UUID(backtest_id), "failed")
+    finally:
+        session.close()
+    publish_state(backtest_id, "failed")
+
+
+@celery_app.task(bind=True, acks_late=True)
+def run_backtest(
+    self, strategy_parameters: dict, start_date: str, end_date: str, backtest_id: str
+):
+    """
+    Run one lumibot backtest on the dedicated backtest queue.
+
+    Args:
+        strategy_parameters: output of convert_params
+        start_date / end_date: ISO datetimes of the simulation window
+        backtest_id: str UUID of the Backtest row
+    """
+    if not _start_run(backtest_id):
+        print(f"Backtest {backtest_id} was cancelled before it started.")
+        return backtest_id
+    from app.utils.backtest import backtest
+
+    try:
+        backtest(
+            strategy_parameters,
+            datetime.fromisoformat(start_date),
+            datetime.fromisoformat(end_date),
+            UUID(backtest_id),
+        )
+    except Exception:
+        _mark_failed(backtest_id)
+        raise
+    publish_state(backtest_id, "finished")
+    return backtest_id
+
+
+@celery_app.task(bind=True, acks_late=True)
+def run_backtest_sweep(
+    self,
+    strategy_parameters: dict,
+    grid: dict,
+    start_date: str,
+    end_date: str,
+    backtest_id: str,
+    rank_by: str,
+    priority: int = 0,
+):
+    """
+    Run the first grid point inline (warming the shared market data cache), then fan
+    the rest out as individual tasks on the backtest queue and rank them in a
+    chord callback. Concurrency is whatever the backtest workers allow; the
+    point tasks keep the sweep's own queue priority.
+    """
+    if not _start_run(backtest_id):
+        print(f"Sweep {backtest_id} was cancelled before it started.")
+        return backtest_id
+    try:
+        points = expand_grid(strategy_parameters, grid)
+        rows = []
+        if points:
+            from app.utils.backtest import run_sweep_point
+
+            first = points[0]
+            rows.append(
+                sweep_row(
+                    first,
+                    lambda: run_sweep_point(
+                        first["parameters"],
+                        datetime.fromisoformat(start_date),
+                        datetime.fromisoformat(end_date),
+                    ),
+                )
+            )
+        options = _queue_options(priority)
+        callback = finish_backtest_sweep.s(
+            rows, strategy_parameters, grid, backtest_id, rank_by
+        ).set(**options)
+        header = [
+            backtest_sweep_point.s(point, start_date, end_date, backtest_id).set(**options)
+            for point in points[1:]
+        ]
+        if header:
+            chord(header)(callback)
+        else:
+            callback.delay([])
+    except Exception:
+        _mark_failed(backtest_id)
+        raise
+    return backtest_id
+
+
+@celery_app.task(bind=True, acks_late=True)
+def backtest_sweep_point(
+    self, point: dict, start_date: str, end_date: str, backtest_id: str
+):
+    session = SessionLocal()
+    try:
+        status = user_get_backtest_status(session, UUID(backtest_id))
+    finally:
+        session.close()
+    if status == "cancelled":
+        return {"overrides": point["overrides"], "metrics": {}, "error": "cancelled"}
+    from app.utils.backtest import run_sweep_point
+
+    return sweep_row(
+        point,
+        lambda: run_sweep_point(
+            point["parameters"],
+            datetime.fromisoformat(start_date),
+            datetime.fromisoformat(end_date),
+        ),
+    )
+
+
+@celery_app.task(bind=True, acks_late=True)
+def finish_backtest_sweep(
+    self,
+    point_rows: list,
+    first_rows: list,
+    strategy_parameters: dict,
+    grid: dict,
+    backtest_id: str,
+    rank_by: str,
+):
+    session = SessionLocal()
+    try:
+        status = user_get_backtest_status(session, UUID(backtest_id))
+    finally:
+        session.close()
+    if status == "cancelled":
+        return backtest_id
+    from app.utils.backtest import finish_sweep
+
+    try:
+        finish_sweep(
+            strategy_parameters,
+            grid,
+            list(first_rows) + list(point_rows),
+            UUID(backtest_id),
+            rank_by,
+        )
+    except Exception:
+        _mark_failed(backtest_id)
+        raise
+    publish_state(backtest_id, "finished")
+    return backtest_id
+
+
+def _finish(backtest_id: str, result: dict):
+    session = SessionLocal()
+    try:
+        user_finish_backtest(session, UUID(backtest_id), result)
+    finally:
+        session.close()
+    publish_state(backtest_id, "finished")
+
+
+@celery_app.task(bind=True, acks_late=True)
+def run_replay_backtest(
+    self, strategy_parameters: dict, start_date: str, end_date: str, backtest_id: str
+):
+    """Same contract as ``run_backtest`` on the replay engine: metrics, trades
+    and the daily equity curve, no lumibot reports."""
+    if not _start_run(backtest_id):
+        print(f"Backtest {backtest_id} was cancelled before it started.")
+        return backtest_id
+    from app.utils.replay import get_chain_history, replay_backtest
+
+    try:
+        start, end = datetime.fromisoformat(start_date).date(), datetime.fromisoformat(end_date).date()
+        progress = ProgressReporter(backtest_id, start, end)
+        history = get_chain_history(strategy_parameters["symbol"], start, end)
+        result = replay_backtest(strategy_parameters, history, start, end)
+        # A replay takes milliseconds, so one final event carries its throughput
+        equity = result.get("equity") or [{}]
+        progress.finish(equity[-1].get("portfolio_value"), len(result.get("trades") or []))
+        _finish(backtest_id, result)
+    except Exception:
+        _mark_failed(backtest_id)
+        raise
+    return backtest_id
+
+
+@celery_app.task(bind=True, acks_late=True)
+def run_replay_sweep(
+    self,
+    strategy_parameters: dict,
+    grid: dict,
+    start_date: str,
+    end_date: str,
+    backtest_id: str,
+    rank_by: str,
+    priority: int = 0,
+):
+    """
+    Screen every grid point in this task against one loaded chain history;
+    a replay point takes milliseconds, so fanning out would cost more than it saves.
+    Takes the same arguments as ``run_backtest_sweep``; ``priority`` is unused
+    since nothing is fanned out.
+    """
+    if not _start_run(backtest_id):
+        print(f"Sweep {backtest_id} was cancelled before it started.")
+        return backtest_id
+    from app.utils.replay import get_chain_history, replay_backtest
+
+    try:
+        start, end = datetime.fromisoformat(start_date).date(), datetime.fromisoformat(end_date).date()
+        history = get_chain_history(strategy_parameters["symbol"], start, end)
+        rows = [
+            sweep_row(
+                point,
+                lambda: summarize_results(replay_backtest(point["parameters"], history, start, end)),
+            )
+            for point in expand_grid(strategy_parameters, grid)
+        ]
+        _finish(backtest_id, sweep_result(strategy_parameters, grid, rows, rank_by))
+    except Exception:
+        _mark_failed(backtest_id)
+        raise
+    return backtest_id
+
+
+@celery_app.task(bind=True, acks_late=True)
+def run_backtest_segmented(
+    self,
+    strategy_parameters: dict,
+    start_date: str,
+    end_date: str,
+    backtest_id: str,
+    segments: int,
+    warmup_days: int = None,
+    priority: int = 0,
+):
+    """
+    Walk-forward mode of ``run_backtest``: split the window into ``segments``
+    pieces, simulate each (with its warm-up) as its own task on the backtest
+    queue and stitch trades and equity in a chord callback. The segment tasks
+    keep the run's own queue priority.
+    """
+    if not _start_run(backtest_id):
+        print(f"Backtest {backtest_id} was cancelled before it started.")
+        return backtest_id
+    try:
+        from app.utils.walk_forward import default_warmup_days, split_window
+
+        if warmup_days is None:
+            warmup_days = default_warmup_days(strategy_parameters)
+        windows = split_window(
+            datetime.fromisoformat(start_date), datetime.fromisoformat(end_date), segments, warmup_days
+        )
+        options = _queue_options(priority)
+        callback = finish_backtest_segments.s(windows, backtest_id).set(**options)
+        chord(
+            [
+                backtest_segment.s(strategy_parameters, window, backtest_id, i, len(windows)).set(**options)
+                for i, window in enumerate(windows)
+            ]
+        )(callback)
+    except Exception:
+        _mark_failed(backtest_id)
+        raise
+    return backtest_id
+
+
+@celery_app.task(bind=True, acks_late=True)
+def backtest_segment(
+    self, strategy_parameters: dict, window: dict, backtest_id: str, segment: int = 0, segments: int = 1
+):
+    session = SessionLocal()
+    try:
+        status = user_get_backtest_status(session, UUID(backtest_id))
+    finally:
+        session.close()
+    if status == "cancelled":
+        return {"error": "cancelled"}
+    from app.utils.backtest import run_segment
+
+    try:
+        return run_segment(
+            strategy_parameters,
+            datetime.fromisoformat(window["warmup_start"]),
+            datetime.fromisoformat(window["end"]),
+            ProgressReporter(backtest_id, window["warmup_start"], window["end"], segment, segments).context(),
+        )
+    except Exception as exc:
+        # Reported by the callback: a raising header task would skip it and leave
+        # the run marked running
+        return {"error": str(exc)}
+
+
+@celery_app.task(bind=True, acks_late=True)
+def finish_backtest_segments(self, segment_results: list, windows: list, backtest_id: str):
+    session = SessionLocal()
+    try:
+        status = user_get_backtest_status(session, UUID(backtest_id))
+    finally:
+        session.close()
+    if status == "cancelled":
+        return backtest_id
+    errors = [
+        f"{window['start']}..{window['end']}: {result['error']}"
+        for window, result in zip(windows, segment_results)
+        if result.get("error")
+    ]
+    if errors:
+        print(f"Backtest {backtest_id} failed: {'; '.join(errors)}")
+        _mark_failed(backtest_id)
+        return backtest_id
+    from app.utils.walk_forward import stitch_segments
+
+    try:
+        _finish(backtest_id, stitch_segments(windows, segment_results))
+    except Exception:
+        _mark_failed(backtest_id)
+        raise
+    return backtest_id
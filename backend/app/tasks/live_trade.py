@@ -1,20 +1,334 @@
-import time, random
+import time
+from datetime import datetime
+from typing import Callable, Optional, Tuple
+from zoneinfo import ZoneInfo
 from uuid import UUID
 from celery.contrib.abortable import AbortableTask
 from celery_app import celery_app
-from sqlalchemy.orm import sessionmaker
-from app.db.session import engine
+from app.db.session import WorkerSessionLocal
 from app.services.trading_task_service import (
     add_win_trade,
     get_trading_task_status,
 )
-from app.utils.live_trade import bullish_signal, build_multi_leg_order, find_option
+from app.core.config import settings
+from app.utils.live_trade import build_multi_leg_order
+from app.utils.indicators import (
+    BULLISH_WINDOW,
+    DAY,
+    UNDERLYING,
+    VOLATILITY_INDEX,
+    history_frequency,
+    indicator_bank,
+)
+from app.utils.execution_plan import get_plan
+from app.utils.option_chain import OptionChainFrame
+from app.utils.market_snapshot import PRICE_HISTORY, market_snapshots
+from app.utils import trading_events
+from app.utils.trading_events import publish_event
 from app.api.v1.endpoints.schwab import SchwabAccountAPI, SchwabMarketAPI
 
+# Entry weekdays are exchange-local
+MARKET_TZ = ZoneInfo("America/New_York")
+
 schwab_account = SchwabAccountAPI()
 schwab_market = SchwabMarketAPI()
-# Create a session factory bound to your DB engine
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Workers use the dedicated worker pool
+SessionLocal = WorkerSessionLocal
+
+
+def fetch_price_history(symbol: str, spec: Tuple[str, int] = DAY, days: Optional[int] = None):
+    """
+    Schwab candles at a frequency that tiles ``spec``'s bars. Without ``days``
+    this is the window every tick reads (10 daily sessions, or 2 sessions of
+    intraday candles); with ``days`` it is the history since that many
+    calendar days ago, used to seed an indicator series.
+    """
+    frequency_type, frequency = history_frequency(spec)
+    if days is None and frequency_type == "daily":
+        return market_snapshots.get(
+            PRICE_HISTORY,
+            symbol,
+            lambda: schwab_market.get_pricehistory(
+                symbol, "day", 10, "daily", 1, None, None, None, None
+            ),
+        )
+    if days is None:
+        return market_snapshots.get(
+            f"{PRICE_HISTORY}:minute{frequency}",
+            symbol,
+            lambda: schwab_market.get_pricehistory(
+                symbol, "day", 2, "minute", frequency, None, None, None, None
+            ),
+        )
+    start_date = int((time.time() - days * 86400) * 1000)
+    return market_snapshots.get(
+        f"{PRICE_HISTORY}:{frequency_type}{frequency}:{days}d",
+        symbol,
+        lambda: schwab_market.get_pricehistory(
+            symbol,
+            "year" if frequency_type == "daily" else "day",
+            None,
+            frequency_type,
+            frequency,
+            start_date,
+            None,
+            None,
+            None,
+        ),
+    )
+
+
+def feed_indicators(symbol: str, requirements, recent_daily: Optional[list] = None):
+    """
+    Seed or update ``symbol``'s indicator series for ``requirements`` (bar
+    size -> closed bars). ``recent_daily`` stands in for the per-tick daily
+    fetch when the caller already has it.
+    """
+
+    def fetch(spec, days):
+        if spec == DAY and days is None and recent_daily is not None:
+            return recent_daily
+        return fetch_price_history(symbol, spec, days)["candles"]
+
+    indicator_bank.feed(symbol, requirements, fetch)
+
+
+def fetch_option_chain(symbol: str) -> OptionChainFrame:
+    # Fetch option chain - calls and puts
+    return market_snapshots.option_chain_frame(
+        symbol,
+        lambda: schwab_market.get_chains(
+            symbol,
+            "ALL",
+            20,
+            "True",
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+        ),
+    )
+
+
+def trading_step(
+    trading_task,
+    account_number: str,
+    price_hist_resp: dict,
+    get_chain: Callable[[], OptionChainFrame],
+):
+    """
+    One tick of one bot: signal from the price history, then legs and orders.
+    ``get_chain`` is only called on a bullish signal, so callers sharing data
+    between bots can fetch the chain lazily, once per symbol.
+    """
+    print(
+        f"Running trading task {trading_task.id}, active status: {trading_task.is_active}"
+    )
+    candles = price_hist_resp["candles"]
+    current_price = candles[-1]["close"]
+    plan = get_plan(trading_task.bot)
+    entry_day = plan.entry.allows(datetime.now(MARKET_TZ).date())
+    predicate = plan.entry_filters
+    requirements = predicate.requirements(UNDERLYING)
+    requirements[DAY] = max(requirements.get(DAY, 0), BULLISH_WINDOW)
+    feed_indicators(trading_task.symbol, requirements, candles)
+    is_bullish, ma5 = indicator_bank.bullish_signal(trading_task.symbol)
+    symbols = {UNDERLYING: trading_task.symbol}
+    if VOLATILITY_INDEX in predicate.roles:
+        vix_symbol = settings.VOLATILITY_INDEX_SYMBOL
+        feed_indicators(vix_symbol, predicate.requirements(VOLATILITY_INDEX))
+        symbols[VOLATILITY_INDEX] = vix_symbol
+    filters_passed, failed_filters = predicate(indicator_bank, symbols)
+
+    # Live events for /live-trade/stream/{trading_task_id}
+    publish_event(
+        trading_task.id,
+        trading_events.TICK,
+        {"symbol": trading_task.symbol, "price": current_price},
+    )
+    publish_event(
+        trading_task.id,
+        trading_events.SIGNAL,
+        {
+            "is_bullish": is_bullish,
+            "ma5": ma5,
+            "failed_filters": failed_filters,
+            "entry_day": entry_day,
+        },
+    )
+
+    print(f"Current Price for {trading_task.symbol}: {current_price}")
+    print(f"5-day Moving Average: {ma5}")
+    print(f"Bullish Signal: is_bullish")
+
+    if not is_bullish:
+        print("No bullish signal - skipping order.")
+        return
+    if not filters_passed:
+        print(f"Entry filters not met ({', '.join(failed_filters)}) - skipping order.")
+        return
+    if not entry_day:
+        # Same rule as FlexibleOptionStrategy's entry_weekdays in backtests
+        print("Not an entry day for this bot - skipping order.")
+        return
+
+    # Parse the chain once; every leg below is picked from the same arrays
+    chain = get_chain()
+
+    # Example Multi-leg Strategies:
+    # 1. Single Leg (just buy 1 call ATM)
+    # 2. Vertical Spread (buy 1 call ATM, sell 1 call slightly OTM)
+    # 3. Iron Condor (4 legs: vertical put spread + vertical call spread)
+
+    # === Example 1: Single Leg ===
+    single_leg_call = chain.find_option(
+        current_price, option_type="CALL", strike_offset=0
+    )
+    if single_leg_call:
+        print("Single Leg Call Option chosen:", single_leg_call["symbol"])
+
+    # === Example 2: Vertical Spread (Call) ===
+    vertical_buy = chain.find_option(
+        current_price, option_type="CALL", strike_offset=0
+    )
+    vertical_sell = chain.find_option(
+        current_price, option_type="CALL", strike_offset=1
+    )
+    if vertical_buy and vertical_sell:
+        print("Vertical Spread Legs:")
+        print("Buy Call:", vertical_buy["symbol"])
+        print("Sell Call:", vertical_sell["symbol"])
+
+    # === Example 3: Iron Condor ===
+    # Put spread: Sell put ATM, Buy put lower strike
+    iron_put_sell = chain.find_option(
+        current_price, option_type="PUT", strike_offset=0
+    )
+    iron_put_buy = chain.find_option(
+        current_price, option_type="PUT", strike_offset=-1
+    )
+    # Call spread: Sell call ATM, Buy call higher strike
+    iron_call_sell = chain.find_option(
+        current_price, option_type="CALL", strike_offset=0
+    )
+    iron_call_buy = chain.find_option(
+        current_price, option_type="CALL", strike_offset=1
+    )
+
+    iron_condor_legs = []
+    if iron_put_sell and iron_put_buy and iron_call_sell and iron_call_buy:
+        iron_condor_legs = [
+            {
+                "instruction": "SELL_TO_OPEN",
+                "quantity": 1,
+                "symbol": iron_put_sell["symbol"],
+            },
+            {
+                "instruction": "BUY_TO_OPEN",
+                "quantity": 1,
+                "symbol": iron_put_buy["symbol"],
+            },
+            {
+                "instruction": "SELL_TO_OPEN",
+                "quantity": 1,
+                "symbol": iron_call_sell["symbol"],
+            },
+            {
+                "instruction": "BUY_TO_OPEN",
+                "quantity": 1,
+                "symbol": iron_call_buy["symbol"],
+            },
+        ]
+
+        print("Iron Condor Legs:")
+        for leg in iron_condor_legs:
+            print(f"{leg['instruction']} {leg['symbol']}")
+
+    publish_event(
+        trading_task.id,
+        trading_events.LEGS,
+        {
+            "single_leg": single_leg_call["symbol"] if single_leg_call else None,
+            "vertical": [vertical_buy["symbol"], vertical_sell["symbol"]]
+            if vertical_buy and vertical_sell
+            else None,
+            "iron_condor": [leg["symbol"] for leg in iron_condor_legs] or None,
+        },
+    )
+
+    # === Select which strategy you want ===
+    # Uncomment one of the below strategies to place the order:
+
+    # --- Single Leg Order ---
+    if single_leg_call:
+        order_payload = build_multi_leg_order(
+            [
+                {
+                    "instruction": "BUY_TO_OPEN",
+                    "quantity": 1,
+                    "symbol": single_leg_call["symbol"],
+                }
+            ]
+        )
+        confirmation = schwab_account.post_accounts_accountnumber_orders(
+            account_number, order_payload
+        )
+        print("Order confirmation:", confirmation)
+        publish_event(
+            trading_task.id,
+            trading_events.ORDER,
+            {"strategy": "single_leg", "confirmation": confirmation},
+        )
+
+    # --- Vertical Spread Order ---
+    if vertical_buy and vertical_sell:
+        order_payload = build_multi_leg_order(
+            [
+                {
+                    "instruction": "BUY_TO_OPEN",
+                    "quantity": 1,
+                    "symbol": vertical_buy["symbol"],
+                },
+                {
+                    "instruction": "SELL_TO_OPEN",
+                    "quantity": 1,
+                    "symbol": vertical_sell["symbol"],
+                },
+            ]
+        )
+        confirmation = schwab_account.post_accounts_accountnumber_orders(
+            account_number, order_payload
+        )
+        print("Order confirmation:", confirmation)
+        publish_event(
+            trading_task.id,
+            trading_events.ORDER,
+            {"strategy": "vertical", "confirmation": confirmation},
+        )
+
+    # --- Iron Condor Order ---
+    if iron_condor_legs:
+        order_payload = build_multi_leg_order(iron_condor_legs)
+        confirmation = schwab_account.post_accounts_accountnumber_orders(
+            account_number, order_payload
+        )
+        print("Iron Condor Order confirmation:", confirmation)
+        publish_event(
+            trading_task.id,
+            trading_events.ORDER,
+            {"strategy": "iron_condor", "confirmation": confirmation},
+        )
+    else:
+        print("No valid iron condor legs found.")
 
 
 @celery_app.task(bind=True, base=AbortableTask)
@@ -31,11 +345,13 @@ def trading(self, bot_id: str, trading_task_id: str):
     db = SessionLocal()
     account_info = schwab_account.get_accounts_accountnumbers()
     account_number = account_info[0]["accountNumber"]
+    final_state = "STOPPED"
     try:
         while True:
             # Check if task has been requested to abort
             if self.is_aborted():
                 print(f"Task {self.request.id} aborted!")
+                final_state = "ABORTED"
                 break
 
             trading_task = get_trading_task_status(db, trading_task_id)
@@ -45,175 +361,20 @@ def trading(self, bot_id: str, trading_task_id: str):
                 )
                 break
 
-            # Your task logic here, e.g. logging the task id and active state
-            print(
-                f"Running trading task {trading_task.id}, active status: {trading_task.is_active}"
-            )
-            price_hist_resp = schwab_market.get_pricehistory(
-                trading_task.symbol, "day", 10, "daily", 1, None, None, None, None
-            )
-            price_history = [candle["close"] for candle in price_hist_resp["candles"]]
-            current_price = price_history[-1]
-            is_bullish, ma5 = bullish_signal(price_history)
-
-            # Real-time Price for Demo SSE
-            data = {"price": random.uniform(100, 200)}
-            # Update task state with data (this will be accessible from FastAPI)
-            self.update_state(state="PROGRESS", meta=data)
-
-            print(f"Current Price for {trading_task.symbol}: {current_price}")
-            print(f"5-day Moving Average: {ma5}")
-            print(f"Bullish Signal: is_bullish")
-
-            if not is_bullish:
-                print("No bullish signal - skipping order.")
-                continue
-
-            # Fetch option chain - calls and puts
-            option_chain = schwab_market.get_chains(
-                trading_task.symbol,
-                "ALL",
-                20,
-                "True",
-                None,
-                None,
-                None,
-                None,
-                None,
-                None,
-                None,
-                None,
-                None,
-                None,
-                None,
-                None,
-                None,
-            )
-
-            call_map = option_chain.get("callExpDateMap", {})
-            put_map = option_chain.get("putExpDateMap", {})
-
-            # Example Multi-leg Strategies:
-            # 1. Single Leg (just buy 1 call ATM)
-            # 2. Vertical Spread (buy 1 call ATM, sell 1 call slightly OTM)
-            # 3. Iron Condor (4 legs: vertical put spread + vertical call spread)
-
-            # === Example 1: Single Leg ===
-            single_leg_call = find_option(
-                call_map, current_price, option_type="CALL", strike_offset=0
-            )
-            if single_leg_call:
-                print("Single Leg Call Option chosen:", single_leg_call["symbol"])
-
-            # === Example 2: Vertical Spread (Call) ===
-            vertical_buy = find_option(
-                call_map, current_price, option_type="CALL", strike_offset=0
-            )
-            vertical_sell = find_option(
-                call_map, current_price, option_type="CALL", strike_offset=1
-            )
-            if vertical_buy and vertical_sell:
-                print("Vertical Spread Legs:")
-                print("Buy Call:", vertical_buy["symbol"])
-                print("Sell Call:", vertical_sell["symbol"])
-
-            # === Example 3: Iron Condor ===
-            # Put spread: Sell put ATM, Buy put lower strike
-            iron_put_sell = find_option(
-                put_map, current_price, option_type="PUT", strike_offset=0
-            )
-            iron_put_buy = find_option(
-                put_map, current_price, option_type="PUT", strike_offset=-1
+            price_hist_resp = fetch_price_history(trading_task.symbol)
+            trading_step(
+                trading_task,
+                account_number,
+                price_hist_resp,
+                lambda: fetch_option_chain(trading_task.symbol),
             )
-            # Call spread: Sell call ATM, Buy call higher strike
-            iron_call_sell = find_option(
-                call_map, current_price, option_type="CALL", strike_offset=0
-            )
-            iron_call_buy = find_option(
-                call_map, current_price, option_type="CALL", strike_offset=1
-            )
-
-            iron_condor_legs = []
-            if iron_put_sell and iron_put_buy and iron_call_sell and iron_call_buy:
-                iron_condor_legs = [
-                    {
-                        "instruction": "SELL_TO_OPEN",
-                        "quantity": 1,
-                        "symbol": iron_put_sell["symbol"],
-                    },
-                    {
-                        "instruction": "BUY_TO_OPEN",
-                        "quantity": 1,
-                        "symbol": iron_put_buy["symbol"],
-                    },
-                    {
-                        "instruction": "SELL_TO_OPEN",
-                        "quantity": 1,
-                        "symbol": iron_call_sell["symbol"],
-                    },
-                    {
-                        "instruction": "BUY_TO_OPEN",
-                        "quantity": 1,
-                        "symbol": iron_call_buy["symbol"],
-                    },
-                ]
-
-                print("Iron Condor Legs:")
-                for leg in iron_condor_legs:
-                    print(f"{leg['instruction']} {leg['symbol']}")
-
-            # === Select which strategy you want ===
-            # Uncomment one of the below strategies to place the order:
-
-            # --- Single Leg Order ---
-            if single_leg_call:
-                order_payload = build_multi_leg_order(
-                    [
-                        {
-                            "instruction": "BUY_TO_OPEN",
-                            "quantity": 1,
-                            "symbol": single_leg_call["symbol"],
-                        }
-                    ]
-                )
-                confirmation = schwab_account.post_accounts_accountnumber_orders(
-                    account_number, order_payload
-                )
-                print("Order confirmation:", confirmation)
-
-            # --- Vertical Spread Order ---
-            if vertical_buy and vertical_sell:
-                order_payload = build_multi_leg_order(
-                    [
-                        {
-                            "instruction": "BUY_TO_OPEN",
-                            "quantity": 1,
-                            "symbol": vertical_buy["symbol"],
-                        },
-                        {
-                            "instruction": "SELL_TO_OPEN",
-                            "quantity": 1,
-                            "symbol": vertical_sell["symbol"],
-                        },
-                    ]
-                )
-                confirmation = schwab_account.post_accounts_accountnumber_orders(
-                    account_number, order_payload
-                )
-                print("Order confirmation:", confirmation)
-
-            # --- Iron Condor Order ---
-            if iron_condor_legs:
-                order_payload = build_multi_leg_order(iron_condor_legs)
-                confirmation = schwab_account.post_accounts_accountnumber_orders(
-                    account_number, order_payload
-                )
-                print("Iron Condor Order confirmation:", confirmation)
-            else:
-                print("No valid iron condor legs found.")
 
             time.sleep(10)  # simulate work
 
+        publish_event(trading_task_id, trading_events.STATE, {"state": final_state})
         return bot_id
+    except Exception as e:
+        publish_event(trading_task_id, trading_events.STATE, {"state": "FAILURE", "error": str(e)})
+        raise
     finally:
         db.close()
@@ -0,0 +1,190 @@
+"""
+Multiplexed live-trading scheduler.
+
+One asyncio loop drives every registered bot (see app.utils.bot_registry).
+Each bot keeps its own cadence; bots that are due in the same pass are grouped
+by underlying and read the shared market snapshot (app.utils.market_snapshot),
+so Schwab is called per symbol, not per bot; the option chain is only fetched
+when a signal asks for it. The per-bot work (DB reads, order placement) runs
+on a bounded thread pool. A pass dispatches its ticks and returns without
+waiting for them, so one slow Schwab call or order only delays its own bot; a
+bot whose previous tick is still running skips that cadence rather than
+overlapping itself.
+
+Run one or more shards next to the API:
+
+    python -m app.tasks.scheduler                      # single scheduler
+    python -m app.tasks.scheduler --shard 0 --shards 2 # half of the bots
+"""
+import argparse
+import asyncio
+import logging
+import threading
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+from app.api.v1.endpoints.schwab import AsyncSchwabMarketAPI
+from app.core.config import settings
+from app.services.trading_task_service import get_trading_task_status
+from app.tasks.live_trade import (
+    SessionLocal,
+    fetch_option_chain,
+    schwab_account,
+    trading_step,
+)
+from app.utils.market_snapshot import PRICE_HISTORY, async_market_snapshots
+from app.utils.bot_registry import load_registry, unregister_bot
+from app.utils.trading_events import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# Retry delay after a failed pass: doubles per consecutive failure up to the cap
+ERROR_BACKOFF_START = 1.0
+ERROR_BACKOFF_MAX = 60.0
+
+
+class _Once:
+    """Thread-safe lazy value shared by the bots of one symbol in one pass."""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.lock = threading.Lock()
+        self.done = False
+        self.value = None
+
+    def __call__(self):
+        with self.lock:
+            if not self.done:
+                self.value = self.fn()
+                self.done = True
+        return self.value
+
+
+class TradingScheduler:
+    def __init__(self, shard: int = 0, shards: int = 1, max_workers: Optional[int] = None):
+        self.shard = shard
+        self.shards = shards
+        self.market = AsyncSchwabMarketAPI()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or settings.TRADING_SCHEDULER_WORKERS)
+        self.bots: Dict[str, dict] = {}
+        self.next_due: Dict[str, float] = {}
+        # Bots with a tick dispatched and not finished yet; only touched on the loop thread
+        self.in_flight: Set[str] = set()
+        # Strong references to running tick_symbol tasks (the loop keeps only weak ones)
+        self.tasks: Set[asyncio.Task] = set()
+        self._account_number: Optional[str] = None
+        self._account_lock = threading.Lock()
+
+    def owns(self, trading_task_id: str) -> bool:
+        return zlib.crc32(trading_task_id.encode()) % self.shards == self.shard
+
+    def account_number(self) -> str:
+        with self._account_lock:
+            if self._account_number is None:
+                account_info = schwab_account.get_accounts_accountnumbers()
+                self._account_number = account_info[0]["accountNumber"]
+            return self._account_number
+
+    async def refresh(self):
+        registry = await load_registry(get_async_redis())
+        self.bots = {trading_task_id: bot for trading_task_id, bot in registry.items() if self.owns(trading_task_id)}
+        for trading_task_id in list(self.next_due):
+            if trading_task_id not in self.bots:
+                del self.next_due[trading_task_id]
+
+    def run_bot(self, bot: dict, price_hist_resp: dict, get_chain):
+        db = SessionLocal()
+        try:
+            trading_task = get_trading_task_status(db, bot["trading_task_id"])
+            if not trading_task or not trading_task.is_active:
+                print(f"TradingTask {bot['trading_task_id']} inactive or not found, unregistering.")
+                unregister_bot(bot["trading_task_id"])
+                return
+            trading_step(trading_task, self.account_number(), price_hist_resp, get_chain)
+        except Exception as e:
+            # A failed tick is retried on the bot's next cadence
+            print(f"TradingTask {bot['trading_task_id']} tick failed: {e}")
+        finally:
+            db.close()
+
+    def release(self, trading_task_id: str):
+        self.in_flight.discard(trading_task_id)
+
+    async def tick_symbol(self, symbol: str, bots: List[dict]):
+        """Fetch the symbol's snapshot and hand each bot to the pool; returns without waiting on the bots."""
+        try:
+            price_hist_resp = await async_market_snapshots.get(
+                PRICE_HISTORY,
+                symbol,
+                lambda: self.market.get_pricehistory(
+                    symbol, "day", 10, "daily", 1, None, None, None, None
+                ),
+            )
+        except Exception as e:
+            print(f"Price history for {symbol} failed: {e}")
+            for bot in bots:
+                self.release(bot["trading_task_id"])
+            return
+        get_chain = _Once(lambda: fetch_option_chain(symbol))
+        loop = asyncio.get_running_loop()
+        for bot in bots:
+            future = loop.run_in_executor(self.executor, self.run_bot, bot, price_hist_resp, get_chain)
+            future.add_done_callback(lambda _, trading_task_id=bot["trading_task_id"]: self.release(trading_task_id))
+
+    def dispatch(self, symbol: str, bots: List[dict]):
+        task = asyncio.create_task(self.tick_symbol(symbol, bots))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def run_once(self) -> float:
+        """One scheduling pass; returns seconds until the next bot is due."""
+        await self.refresh()
+        now = time.monotonic()
+        due_by_symbol: Dict[str, List[dict]] = defaultdict(list)
+        for trading_task_id, bot in self.bots.items():
+            if self.next_due.get(trading_task_id, 0.0) <= now:
+                # Schedule from the planned start so a slow tick does not drift the cadence
+                self.next_due[trading_task_id] = now + float(bot.get("interval") or settings.TRADING_TICK_INTERVAL)
+                if trading_task_id in self.in_flight:
+                    print(f"TradingTask {trading_task_id} still running its last tick, skipping this one.")
+                    continue
+                self.in_flight.add(trading_task_id)
+                due_by_symbol[bot["symbol"]].append(bot)
+        for symbol, bots in due_by_symbol.items():
+            self.dispatch(symbol, bots)
+        if not self.next_due:
+            return settings.TRADING_SCHEDULER_REFRESH
+        return max(min(self.next_due.values()) - time.monotonic(), 0.0)
+
+    async def run(self):
+        print(f"Trading scheduler shard {self.shard}/{self.shards} started")
+        failures = 0
+        while True:
+            try:
+                wait = await self.run_once()
+                failures = 0
+            except Exception:
+                # A Redis or Schwab outage must not stop every bot on this shard
+                failures += 1
+                wait = min(ERROR_BACKOFF_START * 2 ** (failures - 1), ERROR_BACKOFF_MAX)
+                logger.exception("Trading scheduler pass failed (%d in a row), retrying in %.0fs", failures, wait)
+                await asyncio.sleep(wait)
+                continue
+            # Wake up at least every refresh period to pick up new registrations
+            await asyncio.sleep(min(wait, settings.TRADING_SCHEDULER_REFRESH))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Live-trading scheduler")
+    parser.add_argument("--shard", type=int, default=0)
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None, help="threads for per-bot work")
+    args = parser.parse_args(argv)
+    asyncio.run(TradingScheduler(args.shard, args.shards, args.workers).run())
+
+
+if __name__ == "__main__":
+    main()
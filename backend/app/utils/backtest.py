@@ -8,15 +8,22 @@ import os
 import glob
 import shutil
 import pandas as pd
+import numpy as np
 import json
 import zipfile
+import tempfile
 from uuid import UUID
 from app.db.repositories.backtest_repository import user_finish_backtest
+from app.utils.market_data_cache import install_polygon_cache
+from app.utils import greeks
+from app.utils.execution_plan import ExecutionPlan, LegPlan, DteType, ProfitTarget
+from app.utils.sweep import summarize_results, sweep_result
+from app.utils.serializer import to_jsonable
+from app.utils.backtest_progress import ProgressReporter
 from sqlalchemy.orm import Session
 from app.dependencies.database import get_db
 from app.core.config import settings
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from app.db.session import engine
 from app.models import base
 from typing import Optional, Dict, Any, List
 
@@ -44,14 +51,11 @@ protection.
 # -----------------------------------------------------------------------------
 #  Helper functions for saving back-test artefacts (unchanged)
 # -----------------------------------------------------------------------------
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from app.db.session import worker_engine
 
-
-DATABASE_URL = settings.DATABASE_URL
-
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+# Backtest workers share the tuned worker pool instead of a private engine
+SessionLocal = sessionmaker(bind=worker_engine, expire_on_commit=False)
 
 from lumibot.strategies.strategy import Strategy
 from lumibot.traders import Trader
@@ -67,86 +71,91 @@ import pandas as pd
 import json
 import zipfile
 
-def remove_log():
-    folder_path = "logs"
+RESULT_DIR = "result_source"
+RESULT_ARTIFACTS = ("tearsheet", "trades", "indicators")
 
-    for filename in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, filename)  # full path
-        if os.path.isfile(file_path):  # check if it is a file (not a directory)
-            os.remove(file_path)  # delete the file
-            print(f"{filename} is removed")
 
-def move_result(id: UUID):
-    # Source directory where the file currently is
-    source_dir = r'logs'
-    # Destination directory where you want to move and rename the file
-    dest_dir = r'result_source'
+def run_artifact_paths(scratch_dir: str, name: str = "run") -> Dict[str, str]:
+    """lumibot output-file kwargs that keep every artefact inside ``scratch_dir``.
+
+    Without these lumibot writes into the shared ``logs/`` folder, where two
+    concurrent runs would overwrite or pick up each other's files.
+    """
+    return {
+        "logfile": os.path.join(scratch_dir, f"{name}_logs.csv"),
+        "stats_file": os.path.join(scratch_dir, f"{name}_stats.csv"),
+        "settings_file": os.path.join(scratch_dir, f"{name}_settings.json"),
+        "plot_file_html": os.path.join(scratch_dir, f"{name}_trades.html"),
+        "trade_file": os.path.join(scratch_dir, f"{name}_trades.csv"),
+        "tearsheet_file": os.path.join(scratch_dir, f"{name}_tearsheet.html"),
+        "indicators_file": os.path.join(scratch_dir, f"{name}_indicators.html"),
+    }
+
+
+def make_scratch_dir(id: Optional[UUID] = None) -> str:
+    os.makedirs(settings.BACKTEST_SCRATCH_DIR, exist_ok=True)
+    if id is None:
+        return tempfile.mkdtemp(dir=settings.BACKTEST_SCRATCH_DIR)
+    scratch_dir = os.path.join(settings.BACKTEST_SCRATCH_DIR, str(id))
+    # A retried task may find the previous attempt's leftovers
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    os.makedirs(scratch_dir)
+    return scratch_dir
+
+
+def promote_artifacts(scratch_dir: str, id: UUID, name: str = "run"):
+    """Move this run's HTML reports into ``result_source/`` as ``<id>_<kind>.html``.
+
+    Each file is first moved next to its destination and then renamed with
+    ``os.replace``, so readers never see a half-written report.
+    """
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    for kind in RESULT_ARTIFACTS:
+        source_path = os.path.join(scratch_dir, f"{name}_{kind}.html")
+        if not os.path.isfile(source_path):
+            continue
+        dest_path = os.path.join(RESULT_DIR, f"{id}_{kind}.html")
+        tmp_path = f"{dest_path}.tmp"
+        shutil.move(source_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+        print(f"Promoted {kind} report to '{dest_path}'")
+
+
+def _select(df: pd.DataFrame, columns: Dict[str, str]) -> pd.DataFrame:
+    """The ``columns`` of ``df`` that exist, renamed source -> target."""
+    return df[[column for column in columns if column in df.columns]].rename(columns=columns)
+
+
+def lumibot_trades(scratch_dir: str, name: str = "run") -> Optional[pd.DataFrame]:
+    """Fills from lumibot's trade CSV in the shape ``user_finish_backtest`` stores."""
+    path = run_artifact_paths(scratch_dir, name)["trade_file"]
+    if not os.path.isfile(path):
+        return None
+    df = pd.read_csv(path)
+    if "status" in df.columns:
+        df = df[df["status"] == "fill"]
+    if "filled_quantity" not in df.columns:
+        df = df.rename(columns={"quantity": "filled_quantity"})
+    return _select(df, {
+        "time": "time",
+        "symbol": "symbol",
+        "asset.right": "right",
+        "asset.expiration": "expiration",
+        "asset.strike": "strike",
+        "side": "side",
+        "filled_quantity": "quantity",
+        "price": "price",
+        "trade_cost": "trade_cost",
+    })
+
+
+def lumibot_equity(scratch_dir: str, name: str = "run") -> Optional[pd.DataFrame]:
+    """Portfolio value and cash per iteration from lumibot's stats CSV."""
+    path = run_artifact_paths(scratch_dir, name)["stats_file"]
+    if not os.path.isfile(path):
+        return None
+    return _select(pd.read_csv(path), {"datetime": "time", "portfolio_value": "portfolio_value", "cash": "cash"})
 
-    try:
-        # Make sure destination directory exists
-        os.makedirs(dest_dir, exist_ok=True)
-
-        # Check if source directory exists
-        if not os.path.exists(source_dir):
-            raise FileNotFoundError(f"Source directory '{source_dir}' does not exist")
-
-        # Loop through files in the source directory
-        files_found = False
-        for filename in os.listdir(source_dir):
-            if filename.endswith('_tearsheet.html'):
-                source_path = os.path.join(source_dir, filename)
-                dest_path = os.path.join(dest_dir, f'{id}_tearsheet.html')
-                
-                # Check if source file exists
-                if not os.path.exists(source_path):
-                    print(f"Warning: File '{source_path}' not found")
-                    continue
-                
-                # Move and rename the file
-                shutil.move(source_path, dest_path)
-                
-                print(f"Moved and renamed file '{filename}' to '{dest_path}'")
-                files_found = True
-                break  # stop after the first match
-        # for filename in os.listdir(source_dir):
-        #     if filename.endswith('_indicators.html'):
-        #         source_path = os.path.join(source_dir, filename)
-        #         dest_path = os.path.join(dest_dir, f'{id}_indicators.html')
-                
-        #         # Check if source file exists
-        #         if not os.path.exists(source_path):
-        #             print(f"Warning: File '{source_path}' not found")
-        #             continue
-                
-        #         # Move and rename the file
-        #         shutil.move(source_path, dest_path)
-                
-        #         print(f"Moved and renamed file '{filename}' to '{dest_path}'")
-        #         files_found = True
-        #         break  # stop after the first match
-        # for filename in os.listdir(source_dir):
-        #     if filename.endswith('_trades.html'):
-        #         source_path = os.path.join(source_dir, filename)
-        #         dest_path = os.path.join(dest_dir, f'{id}_trades.html')
-                
-        #         # Check if source file exists
-        #         if not os.path.exists(source_path):
-        #             print(f"Warning: File '{source_path}' not found")
-        #             continue
-                
-        #         # Move and rename the file
-        #         shutil.move(source_path, dest_path)
-                
-        #         print(f"Moved and renamed file '{filename}' to '{dest_path}'")
-        #         files_found = True
-        #         break  # stop after the first match        
-        if not files_found:
-            print("No file ending with '_tearsheet.html' found.")
-
-    except PermissionError as e:
-        print(f"Permission error: {e}")
-    except Exception as e:
-        print(f"An error occurred: {e}")
 """
 CustomizedSingleLegStrategy ➜ now supports *optional* multi-leg trades **and** an
 early-exit Profit Target
@@ -271,24 +280,27 @@ class FlexibleOptionStrategy(Strategy):
         self.options_helper = OptionsHelper(self)
         # Track entry details so we can compute accurate P&L and targets later
         self.vars.entry_info = []
+        # Resolve the parameters once; iterations only read the typed plan
+        self.execution_plan = ExecutionPlan.from_parameters(self.parameters)
+        self.underlying_asset = Asset(self.execution_plan.symbol, Asset.AssetType.STOCK)
+        # Set by backtest() / run_segment when the run streams progress to Redis
+        self.progress = ProgressReporter.from_context(self.parameters.get("progress"))
+        self.vars.fills = 0
 
     # ---------------------------------------------
     #  Pick an expiration date that matches the leg
     # ---------------------------------------------
-    def _select_expiration(self, chains, leg, today):
-        target_days = leg.get("dte_value", 30)
-        hint_type = leg.get("dte_type", "Target")
-        right = leg.get("option_type", "call").lower()
-        if hint_type == "Exact":
+    def _select_expiration(self, chains, leg: LegPlan, today):
+        target_days = leg.dte_value
+        chain_dict = chains.get("Chains", {}).get(leg.right_key, {})
+        if leg.dte_type is DteType.EXACT:
             desired = today + timedelta(days=target_days)
-            if desired.strftime("%Y-%m-%d") in chains.get("Chains", {}).get(right.upper(), {}):
+            if desired.strftime("%Y-%m-%d") in chain_dict:
                 return desired
             return None
         # Target window logic
-        min_days = leg.get("dte_min", max(1, target_days - 10))
-        max_days = leg.get("dte_max", target_days + 10)
+        min_days, max_days = leg.dte_min, leg.dte_max
         expiries = []
-        chain_dict = chains.get("Chains", {}).get(right.upper(), {})
         for exp_str in chain_dict.keys():
             try:
                 exp_date = datetime.strptime(exp_str, "%Y-%m-%d").date()
@@ -302,36 +314,78 @@ class FlexibleOptionStrategy(Strategy):
         # Pick the expiry closest to our preferred DTE
         return min(expiries, key=lambda d: abs((d - (today + timedelta(days=target_days))).days))
 
+    # -------------------------------------------------------------
+    #  Strike deltas for a whole expiry in one vectorized call
+    # -------------------------------------------------------------
+    def _vectorized_strike_deltas(self, underlying, spot_price, strikes, expiry, right):
+        """Price the ladder, back out every strike's IV in one batched solve and
+        take the deltas from those IVs – the same prices and per-strike vols as
+        OptionsHelper.get_strike_deltas, without a Black-Scholes solve per strike.
+        Strikes without a price get a NaN delta."""
+        strikes_arr = np.asarray(sorted(strikes), dtype=float)
+        option_right = Asset.OptionRight.CALL if right == "call" else Asset.OptionRight.PUT
+        prices = np.full(len(strikes_arr), np.nan)
+        for i, strike in enumerate(strikes_arr):
+            price = self.get_last_price(
+                Asset(
+                    symbol=underlying.symbol,
+                    asset_type=Asset.AssetType.OPTION,
+                    expiration=expiry,
+                    strike=float(strike),
+                    right=option_right,
+                    underlying_asset=underlying,
+                )
+            )
+            if price is not None:
+                prices[i] = price
+        t = max((expiry - self.get_datetime().date()).days, 1) / 365.0
+        rate = getattr(self, "risk_free_rate", None) or 0.0
+        is_call = right == "call"
+        sigmas = greeks.implied_vol(prices, spot_price, strikes_arr, t, rate, is_call)
+        if not np.isfinite(sigmas).any():
+            return None, None
+        return strikes_arr, greeks.greeks(spot_price, strikes_arr, t, rate, sigmas, is_call)["delta"]
+
     # -------------------------------------------------------------
     #  Build a leg by explicit strike or closest delta
     # -------------------------------------------------------------
-    def _build_leg_asset(self, underlying, leg_settings, strikes, expiry):
-        right_key = "CALL" if leg_settings["option_type"].lower() == "call" else "PUT"
+    def _build_leg_asset(self, underlying, leg: LegPlan, strikes, expiry, spot_price=None):
         # If user supplied a strike try to honour it – otherwise fall back to delta
-        if leg_settings.get("strike_price") is not None:
-            strike = leg_settings["strike_price"]
+        if leg.strike_price is not None:
+            strike = leg.strike_price
             if strike not in strikes:
                 strike = min(strikes, key=lambda x: abs(x - strike))
         else:
-            # Derive strike from desired delta
-            strike_deltas = self.options_helper.get_strike_deltas(
-                underlying_asset=underlying,
-                expiry=expiry,
-                strikes=strikes,
-                right=leg_settings["option_type"].lower(),
-            ) or {}
-            strike_deltas = {k: v for k, v in strike_deltas.items() if v is not None}
-            if not strike_deltas:
+            # Derive strike from desired delta (and optional min/max delta band)
+            strikes_arr, deltas = (None, None)
+            if spot_price is not None:
+                strikes_arr, deltas = self._vectorized_strike_deltas(
+                    underlying, spot_price, strikes, expiry, leg.right.value
+                )
+            if deltas is None:
+                # Fallback: lumibot's per-strike path
+                strike_deltas = self.options_helper.get_strike_deltas(
+                    underlying_asset=underlying,
+                    expiry=expiry,
+                    strikes=strikes,
+                    right=leg.right.value,
+                ) or {}
+                strike_deltas = {k: v for k, v in strike_deltas.items() if v is not None}
+                strikes_arr = np.asarray(list(strike_deltas.keys()), dtype=float)
+                deltas = np.asarray(list(strike_deltas.values()), dtype=float)
+            if strikes_arr is None or len(strikes_arr) == 0:
                 return None, None
-            target_abs_delta = abs(leg_settings.get("target_delta", 0.25))
-            strike = min(strike_deltas.keys(), key=lambda k: abs(abs(strike_deltas[k]) - target_abs_delta))
+            idx = greeks.select_by_delta(deltas, leg.target_delta, leg.min_delta, leg.max_delta)
+            if idx is None:
+                return None, None
+            strike = float(strikes_arr[idx])
         # Assemble the Asset object for this option contract
         opt_asset = Asset(
             symbol=underlying.symbol,
             asset_type=Asset.AssetType.OPTION,
             expiration=expiry,
             strike=strike,
-            right=Asset.OptionRight.CALL if right_key == "CALL" else Asset.OptionRight.PUT,
+            right=Asset.OptionRight.CALL if leg.right_key == "CALL" else Asset.OptionRight.PUT,
             underlying_asset=underlying,
         )
         return opt_asset, strike
@@ -363,9 +417,19 @@ class FlexibleOptionStrategy(Strategy):
     # --------------------------------------------------
     #  Main daily logic
     # --------------------------------------------------
+    def on_filled_order(self, position, order, price, quantity, multiplier):
+        self.vars.fills += 1
+
+    def on_strategy_end(self):
+        if self.progress is not None:
+            self.progress.finish(self.portfolio_value, self.vars.fills)
+
     def on_trading_iteration(self):
-        p = self.parameters
-        underlying = Asset(p["symbol"], Asset.AssetType.STOCK)
+        if self.progress is not None:
+            self.progress.update(self.get_datetime(), self.portfolio_value, self.vars.fills)
+        plan = self.execution_plan
+        exit_plan = plan.exit
+        underlying = self.underlying_asset
         today = self.get_datetime().date()
 
         # Plot underlying price for context
@@ -383,14 +447,12 @@ class FlexibleOptionStrategy(Strategy):
             total_profit_dollar, profit_pct = self._calculate_pnl(option_positions)
             trigger_hit = False
 
-            if p["profit_target_type"] == "percent" and profit_pct is not None and profit_pct >= p["profit_target_value"]:
-                trigger_hit = True
-            elif p["profit_target_type"] in {"net_dollar", "fixed_net"} and total_profit_dollar is not None and total_profit_dollar >= p["profit_target_value"]:
-                trigger_hit = True
-            elif p["profit_target_type"] == "fixed_closing":
+            if exit_plan.profit_rule is not None:
+                trigger_hit = exit_plan.profit_rule(total_profit_dollar, profit_pct)
+            elif exit_plan.profit_target is ProfitTarget.FIXED_CLOSING:
                 # Fixed closing: exit once *all* long legs are above target AND/OR all short legs are below target
                 long_legs_ok, short_legs_ok = True, True
-                target_price = p["profit_target_value"]
+                target_price = exit_plan.profit_target_value
                 for pos in option_positions:
                     last_price = self.get_last_price(pos.asset)
                     if last_price is None:
@@ -415,9 +477,22 @@ class FlexibleOptionStrategy(Strategy):
                 self.add_marker("ProfitExit", spot_price, color="green", symbol="star", detail_text="Profit Target Hit")
                 return
 
+            if exit_plan.stop_rule is not None and exit_plan.stop_rule(total_profit_dollar, profit_pct):
+                self.log_message("Stop loss hit – closing all legs.", color="red")
+                close_orders = [
+                    self.create_order(
+                        pos.asset,
+                        abs(pos.quantity),
+                        Order.OrderSide.BUY_TO_CLOSE if pos.quantity < 0 else Order.OrderSide.SELL
+                    ) for pos in option_positions
+                ]
+                self.submit_orders(close_orders)
+                self.add_marker("StopExit", spot_price, color="red", symbol="x", detail_text="Stop Loss Hit")
+                return
+
             # Secondary exit: X days before expiration
             min_dte = min((pos.asset.expiration - today).days for pos in option_positions)
-            if min_dte <= p.get("days_before_exit", 5):
+            if min_dte <= exit_plan.days_before_exit:
                 self.log_message("Near expiration – time exit.", color="red")
                 close_orders = [
                     self.create_order(
@@ -431,8 +506,10 @@ class FlexibleOptionStrategy(Strategy):
             return  # finished monitoring for today
 
         # 2) No open positions – look for a fresh entry
+        if not plan.entry.allows(today):
+            return
         available_cash = self.get_cash()
-        investable_cash = available_cash * p.get("investment_pct", 0.10)
+        investable_cash = available_cash * plan.investment_pct
         if investable_cash < 50:  # not worth opening anything
             self.log_message("Allocated cash too small – skip entry.", color="yellow")
             return
@@ -442,7 +519,7 @@ class FlexibleOptionStrategy(Strategy):
             self.log_message("Option chains unavailable – skip entry.", color="yellow")
             return
 
-        legs = p.get("legs", [])
+        legs = plan.legs
         if not legs:
             self.log_message("No legs defined – nothing to do.", color="yellow")
             return
@@ -455,20 +532,19 @@ class FlexibleOptionStrategy(Strategy):
         expiry_str = expiry.strftime("%Y-%m-%d")
 
         # Budget per ratio-unit (sum of size_ratio is the denominator)
-        total_ratio = sum(max(1, int(l.get("size_ratio", 1))) for l in legs)
+        total_ratio = sum(leg.size_ratio for leg in legs)
         cash_per_ratio_unit = investable_cash / total_ratio if total_ratio else 0
 
         orders_to_send = []
         self.vars.entry_info = []  # reset entry tracker
 
         for leg in legs:
-            ratio = max(1, int(leg.get("size_ratio", 1)))
-            right_key = "CALL" if leg.get("option_type", "call").lower() == "call" else "PUT"
-            strikes_list = chains.get("Chains", {}).get(right_key, {}).get(expiry_str)
+            ratio = leg.size_ratio
+            strikes_list = chains.get("Chains", {}).get(leg.right_key, {}).get(expiry_str)
             if not strikes_list:
-                self.log_message(f"No strikes for {right_key} on {expiry_str} – abort entry.", color="yellow")
+                self.log_message(f"No strikes for {leg.right_key} on {expiry_str} – abort entry.", color="yellow")
                 return
-            opt_asset, _ = self._build_leg_asset(underlying, leg, strikes_list, expiry)
+            opt_asset, _ = self._build_leg_asset(underlying, leg, strikes_list, expiry, spot_price)
             if opt_asset is None:
                 self.log_message("Strike selection failed – abort entry.", color="yellow")
                 return
@@ -485,7 +561,7 @@ class FlexibleOptionStrategy(Strategy):
                 self.log_message("Not enough cash for desired ratio – abort entry.", color="yellow")
                 return
 
-            side = Order.OrderSide.BUY if leg.get("long_short", "long").lower() == "long" else Order.OrderSide.SELL_TO_OPEN
+            side = Order.OrderSide.BUY if leg.is_long else Order.OrderSide.SELL_TO_OPEN
             orders_to_send.append(self.create_order(opt_asset, max_affordable, side))
             signed_qty = max_affordable if side == Order.OrderSide.BUY else -max_affordable
             self.vars.entry_info.append({"asset": opt_asset, "price": opt_price, "quantity": signed_qty})
@@ -504,9 +580,9 @@ class FlexibleOptionStrategy(Strategy):
                 self.add_marker("OpenPosFallback", spot_price, color="blue", symbol="star", detail_text="Opened (fallback)")
 
         # 4) If the user picked a fixed closing target we immediately submit the corresponding exit orders
-        if p["profit_target_type"] == "fixed_closing":
+        if exit_plan.profit_target is ProfitTarget.FIXED_CLOSING:
             closing_orders = []
-            target_price = p["profit_target_value"]
+            target_price = exit_plan.profit_target_value
             for entry in self.vars.entry_info:
                 asset = entry["asset"]
                 qty = abs(entry["quantity"])
@@ -517,9 +593,90 @@ class FlexibleOptionStrategy(Strategy):
             if closing_orders:
                 self.submit_orders(closing_orders)
                 self.log_message("Resting profit-target orders submitted (fixed closing mode).", color="blue")
+# -----------------------------------------------------------------------------
+#  Parameter sweeps (grid bookkeeping lives in app.utils.sweep)
+# -----------------------------------------------------------------------------
+def run_sweep_point(strategy_parameters: Dict[str, Any], start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+    """Run one grid point and return only its summary metrics.
+
+    Tearsheets/plots are skipped – a sweep only needs the numbers, and the
+    full lumibot results dict is far too big to ship back between workers.
+    """
+    install_polygon_cache()
+    trading_fee = TradingFee(flat_fee=0.65)
+    scratch_dir = make_scratch_dir()
+    try:
+        results = FlexibleOptionStrategy.backtest(
+            PolygonDataBacktesting,
+            start_date,
+            end_date,
+            benchmark_asset=Asset("SPY", Asset.AssetType.STOCK),
+            buy_trading_fees=[trading_fee],
+            sell_trading_fees=[trading_fee],
+            quote_asset=Asset("USD", Asset.AssetType.FOREX),
+            budget=100000,
+            parameters=strategy_parameters,
+            show_plot=False,
+            show_tearsheet=False,
+            save_tearsheet=False,
+            show_indicators=False,
+            show_progress_bar=False,
+            **run_artifact_paths(scratch_dir),
+        )
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    return summarize_results(results)
+
+
+def run_segment(strategy_parameters: Dict[str, Any], warmup_start: datetime, end_date: datetime, progress: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run one walk-forward segment (warm-up included) and return its fills and
+    equity curve as JSON-ready lists; ``walk_forward.stitch_segments`` trims the
+    warm-up and chains the segments. ``progress`` is a ``ProgressReporter``
+    context for the segment's events.
+    """
+    install_polygon_cache()
+    trading_fee = TradingFee(flat_fee=0.65)
+    scratch_dir = make_scratch_dir()
+    try:
+        FlexibleOptionStrategy.backtest(
+            PolygonDataBacktesting,
+            warmup_start,
+            end_date,
+            benchmark_asset=Asset("SPY", Asset.AssetType.STOCK),
+            buy_trading_fees=[trading_fee],
+            sell_trading_fees=[trading_fee],
+            quote_asset=Asset("USD", Asset.AssetType.FOREX),
+            budget=100000,
+            parameters=dict(strategy_parameters, progress=progress),
+            show_plot=False,
+            show_tearsheet=False,
+            save_tearsheet=False,
+            show_indicators=False,
+            show_progress_bar=False,
+            **run_artifact_paths(scratch_dir),
+        )
+        return {
+            "trades": to_jsonable(lumibot_trades(scratch_dir)) or [],
+            "equity": to_jsonable(lumibot_equity(scratch_dir)) or [],
+        }
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def finish_sweep(strategy_parameters: Dict[str, Any], grid: Dict[str, List[Any]], rows: List[Dict[str, Any]], id: UUID, rank_by: str = "total_return"):
+    """Rank the collected grid-point rows and store them as one backtest result."""
+    session = SessionLocal()
+    try:
+        user_finish_backtest(session, id, sweep_result(strategy_parameters, grid, rows, rank_by))
+        print(f"Sweep {id} finished – {len(rows)} grid points ranked by {rank_by}.")
+    finally:
+        session.close()
+
+
 # -----------------------------------------------------------------------------
 def backtest(strategy_parameters: json, start_date: datetime, end_date:datetime, id: UUID):
-    remove_log()
+    install_polygon_cache()
+    scratch_dir = make_scratch_dir(id)
     session = SessionLocal()
     # ----------------------------------------------------------
     # 0️⃣  Detect environment & decide if we back-test or go live
@@ -560,12 +717,15 @@ def backtest(strategy_parameters: json, start_date: datetime, end_date:datetime,
                 sell_trading_fees=[trading_fee],
                 quote_asset=Asset("USD", Asset.AssetType.FOREX),
                 budget=100000,
-                parameters=strategy_parameters,
+                parameters=dict(strategy_parameters, progress=ProgressReporter(id, start_date, end_date).context()),
+                **run_artifact_paths(scratch_dir),
             )
+            results = dict(results or {})
+            results["trades"] = lumibot_trades(scratch_dir)
+            results["equity"] = lumibot_equity(scratch_dir)
+            promote_artifacts(scratch_dir, id)
             user_finish_backtest(session, id, results)
-            move_result(id)
-            # save_backtest_output_detailed(session, results, "flex_opt_test")
-            print("Back-test finished – results saved with prefix 'flex_opt_test_*'.")
+            print(f"Back-test finished – reports saved as '{RESULT_DIR}/{id}_*.html'.")
 
         else:
             trader = Trader()
@@ -576,4 +736,5 @@ def backtest(strategy_parameters: json, start_date: datetime, end_date:datetime,
             trader.add_strategy(live_strategy)
             trader.run_all()
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
\ No newline at end of file
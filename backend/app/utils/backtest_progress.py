@@ -0,0 +1,154 @@
+"""
+Per-backtest progress stream in Redis.
+
+Workers append ``progress`` events (simulated date, percent of the window
+done, fills so far, portfolio value, throughput in simulated days per
+second) to ``backtest:{backtest_id}:progress``.  Events are throttled to one
+per BACKTEST_PROGRESS_INTERVAL seconds.  A final ``state`` event carries the
+run's terminal status.  The SSE endpoint reads the stream the same way as
+the trading-task stream in ``app.utils.trading_events``.
+
+Reporting is best effort: a Redis outage is logged and the backtest carries
+on.
+"""
+import logging
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Union
+
+import redis
+
+from app.core.config import settings
+from app.utils.serializer import dumps_str
+from app.utils.trading_events import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Event types; ``state`` is always the last event of a run
+PROGRESS = "progress"
+STATE = "state"
+
+
+def stream_key(backtest_id) -> str:
+    return f"backtest:{backtest_id}:progress"
+
+
+def publish_event(backtest_id, event_type: str, data: Dict[str, Any]) -> Optional[str]:
+    key = stream_key(backtest_id)
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.xadd(
+            key,
+            {"type": event_type, "data": dumps_str(data)},
+            maxlen=settings.BACKTEST_PROGRESS_MAXLEN,
+            approximate=True,
+        )
+        pipe.expire(key, settings.BACKTEST_PROGRESS_TTL)
+        event_id, _ = pipe.execute()
+        return event_id
+    except redis.RedisError as exc:
+        logger.warning("Could not publish %s event for backtest %s: %s", event_type, backtest_id, exc)
+        return None
+
+
+def publish_state(backtest_id, status: str, **data) -> Optional[str]:
+    """Terminal status (finished / failed / cancelled); ends every SSE stream."""
+    return publish_event(backtest_id, STATE, dict(data, status=status))
+
+
+def _day(value: Union[str, date, datetime]) -> date:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.date() if isinstance(value, datetime) else value
+
+
+class ProgressReporter:
+    """Throttled ``progress`` events for one simulation window.
+
+    ``context()`` is the JSON-friendly form that travels inside strategy
+    parameters; ``from_context`` rebuilds the reporter inside the strategy.
+    """
+
+    def __init__(
+        self,
+        backtest_id,
+        start: Union[str, date, datetime],
+        end: Union[str, date, datetime],
+        segment: Optional[int] = None,
+        segments: Optional[int] = None,
+        interval: Optional[float] = None,
+    ):
+        self.backtest_id = str(backtest_id)
+        self.start = _day(start)
+        self.end = _day(end)
+        self.segment = segment
+        self.segments = segments
+        self.interval = settings.BACKTEST_PROGRESS_INTERVAL if interval is None else interval
+        self.total_days = max((self.end - self.start).days, 1)
+        self.started = time.monotonic()
+        self.last_sent: Optional[float] = None
+        self.sim_days = 0
+
+    def context(self) -> Dict[str, Any]:
+        return {
+            "backtest_id": self.backtest_id,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "segment": self.segment,
+            "segments": self.segments,
+        }
+
+    @classmethod
+    def from_context(cls, context: Optional[Dict[str, Any]]) -> Optional["ProgressReporter"]:
+        if not context:
+            return None
+        return cls(**context)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def sim_days_per_sec(self) -> Optional[float]:
+        elapsed = self.elapsed
+        return self.sim_days / elapsed if elapsed > 0 else None
+
+    def update(
+        self,
+        sim_time: Union[str, date, datetime],
+        portfolio_value: Optional[float] = None,
+        trades: Optional[int] = None,
+        force: bool = False,
+    ):
+        """Record the simulation clock; publish at most once per ``interval`` unless ``force``."""
+        sim_day = _day(sim_time)
+        self.sim_days = min(max((sim_day - self.start).days, 0), self.total_days)
+        now = time.monotonic()
+        if not force and self.last_sent is not None and now - self.last_sent < self.interval:
+            return
+        self.last_sent = now
+        data = {
+            "sim_date": sim_day.isoformat(),
+            "percent": round(100.0 * self.sim_days / self.total_days, 1),
+            "trades": trades,
+            "portfolio_value": portfolio_value,
+            "sim_days_per_sec": self.sim_days_per_sec,
+            "elapsed": self.elapsed,
+        }
+        if self.segment is not None:
+            data["segment"] = self.segment
+            data["segments"] = self.segments
+        publish_event(self.backtest_id, PROGRESS, data)
+
+    def finish(self, portfolio_value: Optional[float] = None, trades: Optional[int] = None):
+        """Final 100 % event plus the run's throughput in the worker log."""
+        self.update(self.end, portfolio_value, trades, force=True)
+        rate = self.sim_days_per_sec
+        label = self.backtest_id if self.segment is None else f"{self.backtest_id} segment {self.segment + 1}/{self.segments}"
+        logger.info(
+            "Backtest %s: %d sim days in %.1fs%s",
+            label,
+            self.sim_days,
+            self.elapsed,
+            f" ({rate:.1f} sim-days/s)" if rate else "",
+        )
@@ -0,0 +1,47 @@
+"""
+Redis registry of bots driven by the live-trading scheduler.
+
+Starting a bot is an HSET into ``trading:bots`` and stopping it an HDEL; the
+scheduler (``python -m app.tasks.scheduler``) re-reads the hash every tick, so
+no long-lived task is created per bot.
+"""
+import json
+import time
+from typing import Dict, Optional
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.utils import trading_events
+from app.utils.trading_events import get_redis, publish_event
+
+REGISTRY_KEY = "trading:bots"
+
+
+def register_bot(trading_task, interval: Optional[float] = None):
+    entry = {
+        "trading_task_id": str(trading_task.id),
+        "bot_id": str(trading_task.bot_id),
+        "symbol": trading_task.symbol,
+        "interval": interval or settings.TRADING_TICK_INTERVAL,
+        "registered_at": time.time(),
+    }
+    get_redis().hset(REGISTRY_KEY, entry["trading_task_id"], json.dumps(entry))
+    return entry
+
+
+def unregister_bot(trading_task_id, state: str = "STOPPED", error: Optional[str] = None) -> bool:
+    removed = bool(get_redis().hdel(REGISTRY_KEY, str(trading_task_id)))
+    data = {"state": state}
+    if error:
+        data["error"] = error
+    publish_event(trading_task_id, trading_events.STATE, data)
+    return removed
+
+
+def is_registered(trading_task_id) -> bool:
+    return bool(get_redis().hexists(REGISTRY_KEY, str(trading_task_id)))
+
+
+async def load_registry(client: aioredis.Redis) -> Dict[str, dict]:
+    return {trading_task_id: json.loads(entry) for trading_task_id, entry in (await client.hgetall(REGISTRY_KEY)).items()}
@@ -0,0 +1,512 @@
+"""
+Typed execution plan compiled once from a bot's JSON settings.
+
+``compile_plan`` validates ``Bot.trade_entry/trade_exit/trade_stop/
+trade_condition`` and ``Strategy.legs`` into frozen plan objects with every
+label resolved to an enum, deltas normalised and exit rules bound to
+functions, so the per-iteration code never parses settings again. Plans are
+cached per (bot, updated_at) by ``get_plan``.
+
+The backtest crosses a Celery boundary, so it ships ``plan.to_parameters()``
+(the dict ``convert_params`` always produced) and ``FlexibleOptionStrategy``
+rebuilds the plan with ``ExecutionPlan.from_parameters`` once in
+``initialize``; sweeps keep overriding plain dict keys.
+"""
+import threading
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import partial
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+from app.utils.indicators import EntryPredicate, compile_entry_filters
+
+DEFAULT_INVESTMENT_PCT = 0.10
+DEFAULT_DAYS_BEFORE_EXIT = 5
+DEFAULT_TARGET_DELTA = 0.25
+
+
+class PlanError(ValueError):
+    """The bot or strategy settings cannot be turned into a plan."""
+
+
+class ProfitTarget(str, Enum):
+    FIXED_CLOSING = "fixed_closing"
+    FIXED_NET = "fixed_net"
+    PERCENT = "percent"
+
+
+class StopType(str, Enum):
+    PERCENT_LOSS = "percent_loss"
+    DOLLAR_LOSS = "dollar_loss"
+    UNDERLYING_POINTS = "underlying_points"
+    UNDERLYING_PERCENT = "underlying_percent"
+    DELTA = "delta"
+    RELATIVE_DELTA = "relative_delta"
+
+
+class StrikeTarget(str, Enum):
+    DELTA = "delta"
+    PREMIUM = "premium"
+    PREMIUM_PCT_UNDERLYING = "premium_pct_underlying"
+    MINIMUM_PREMIUM = "minimum_premium"
+    PERCENT_ITM = "percent_itm"
+    PERCENT_OTM = "percent_otm"
+    POINTS_ITM = "points_itm"
+    POINTS_OTM = "points_otm"
+    POINTS_ITM_FROM_OPEN = "points_itm_from_open"
+    POINTS_OTM_FROM_OPEN = "points_otm_from_open"
+    PERCENT_ITM_FROM_OPEN = "percent_itm_from_open"
+    PERCENT_OTM_FROM_OPEN = "percent_otm_from_open"
+    VERTICAL_WIDTH = "vertical_width"
+    VERTICAL_WIDTH_EXACT = "vertical_width_exact"
+    VERTICAL_WIDTH_UNDERLYING_PCT = "vertical_width_underlying_pct"
+    EXACT = "exact"
+
+
+class OptionRight(str, Enum):
+    CALL = "call"
+    PUT = "put"
+
+
+class Side(str, Enum):
+    LONG = "long"
+    SHORT = "short"
+
+
+class DteType(str, Enum):
+    EXACT = "Exact"
+    TARGET = "Target"
+
+
+# Labels used by the bot builder UI
+PROFIT_TARGET_LABELS = {
+    "FIXED CLOSING CREDIT TARGET": ProfitTarget.FIXED_CLOSING,
+    "FIXED NET PROFIT TARGET": ProfitTarget.FIXED_NET,
+    "PERCENT PROFIT TARGET": ProfitTarget.PERCENT,
+}
+STOP_LABELS = {
+    "PERCENT LOSS": StopType.PERCENT_LOSS,
+    "DOLLAR LOSS": StopType.DOLLAR_LOSS,
+    "UNDERLYING POINTS": StopType.UNDERLYING_POINTS,
+    "UNDERLYING PERCENT": StopType.UNDERLYING_PERCENT,
+    "FIXED DELTA": StopType.DELTA,
+    "RELATIVE DELTA": StopType.RELATIVE_DELTA,
+}
+STRIKE_TARGET_LABELS = {
+    "Delta": StrikeTarget.DELTA,
+    "Premium": StrikeTarget.PREMIUM,
+    "Premium as % of Underlying": StrikeTarget.PREMIUM_PCT_UNDERLYING,
+    "Minium Premium": StrikeTarget.MINIMUM_PREMIUM,
+    "Percent ITM": StrikeTarget.PERCENT_ITM,
+    "Percent OTM": StrikeTarget.PERCENT_OTM,
+    "Points ITM": StrikeTarget.POINTS_ITM,
+    "Points OTM": StrikeTarget.POINTS_OTM,
+    "Points ITM from Open": StrikeTarget.POINTS_ITM_FROM_OPEN,
+    "Points OTM from Open": StrikeTarget.POINTS_OTM_FROM_OPEN,
+    "Percent ITM from Open": StrikeTarget.PERCENT_ITM_FROM_OPEN,
+    "Percent OTM from Open": StrikeTarget.PERCENT_OTM_FROM_OPEN,
+    "Vertical Width": StrikeTarget.VERTICAL_WIDTH,
+    "Vertical Width (Exact)": StrikeTarget.VERTICAL_WIDTH_EXACT,
+    "Vertical Width (Underlying %)": StrikeTarget.VERTICAL_WIDTH_UNDERLYING_PCT,
+    "Exact": StrikeTarget.EXACT,
+}
+# Strategy parameter key that carries each strike target's value
+STRIKE_TARGET_KEYS = {
+    StrikeTarget.DELTA: "target_delta",
+    StrikeTarget.PREMIUM: "target_premium",
+    StrikeTarget.PREMIUM_PCT_UNDERLYING: "target_premium_pct",
+    StrikeTarget.MINIMUM_PREMIUM: "target_premium",
+    StrikeTarget.PERCENT_ITM: "target_percent",
+    StrikeTarget.PERCENT_OTM: "target_percent",
+    StrikeTarget.POINTS_ITM: "target_points",
+    StrikeTarget.POINTS_OTM: "target_points",
+    StrikeTarget.POINTS_ITM_FROM_OPEN: "target_points",
+    StrikeTarget.POINTS_OTM_FROM_OPEN: "target_points",
+    StrikeTarget.PERCENT_ITM_FROM_OPEN: "target_percent",
+    StrikeTarget.PERCENT_OTM_FROM_OPEN: "target_percent",
+    StrikeTarget.VERTICAL_WIDTH: "vertical_width",
+    StrikeTarget.VERTICAL_WIDTH_EXACT: "vertical_width",
+    StrikeTarget.VERTICAL_WIDTH_UNDERLYING_PCT: "vertical_width_pct",
+    StrikeTarget.EXACT: "exact_strike",
+}
+
+
+def as_delta(value) -> Optional[float]:
+    """Absolute delta as a fraction; the bot UI stores deltas either as 0.25 or 25."""
+    if value is None:
+        return None
+    value = abs(float(value))
+    return value / 100.0 if value > 1 else value
+
+
+def _number(value, what: str, default=None) -> Optional[float]:
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise PlanError(f"{what} must be a number, got {value!r}")
+
+
+def _fraction(value: Optional[float]) -> Optional[float]:
+    """The bot UI stores percent targets and stops as whole percents (50 = 50 %);
+    the exit rules compare them with the fractional P&L of ``_calculate_pnl``."""
+    return None if value is None else value / 100.0
+
+
+def _item(values, index: int, what: str) -> Optional[float]:
+    if not isinstance(values, (list, tuple)):
+        raise PlanError(f"{what} must be a list, got {values!r}")
+    return _number(values[index], what) if index < len(values) else None
+
+
+# Exit rules: (profit_dollar, profit_pct) -> hit; profit_pct and percent limits are fractions
+def _pct_at_least(target: float, profit_dollar, profit_pct) -> bool:
+    return profit_pct is not None and profit_pct >= target
+
+
+def _dollar_at_least(target: float, profit_dollar, profit_pct) -> bool:
+    return profit_dollar is not None and profit_dollar >= target
+
+
+def _pct_loss(limit: float, profit_dollar, profit_pct) -> bool:
+    return profit_pct is not None and profit_pct <= -limit
+
+
+def _dollar_loss(limit: float, profit_dollar, profit_pct) -> bool:
+    return profit_dollar is not None and profit_dollar <= -limit
+
+
+ExitRule = Callable[[Optional[float], Optional[float]], bool]
+
+
+@dataclass(frozen=True, slots=True)
+class LegPlan:
+    right: OptionRight
+    side: Side
+    size_ratio: int
+    strike_target: Optional[StrikeTarget]
+    target_value: Optional[float]
+    dte_type: DteType
+    dte_value: int
+    dte_min: int
+    dte_max: int
+    # Delta band as absolute fractions; non-delta targets fall back to the default delta
+    target_delta: float = DEFAULT_TARGET_DELTA
+    min_delta: Optional[float] = None
+    max_delta: Optional[float] = None
+    strike_price: Optional[float] = None
+    max_width: Optional[float] = None
+
+    @property
+    def right_key(self) -> str:
+        return "CALL" if self.right is OptionRight.CALL else "PUT"
+
+    @property
+    def is_long(self) -> bool:
+        return self.side is Side.LONG
+
+    def to_parameters(self) -> Dict[str, Any]:
+        leg: Dict[str, Any] = {}
+        if self.strike_target is not None:
+            leg["strike_target_type"] = self.strike_target.value
+            leg[STRIKE_TARGET_KEYS[self.strike_target]] = self.target_value
+        else:
+            leg["target_delta"] = self.target_delta
+        if self.strike_target is StrikeTarget.DELTA:
+            leg["min_delta"] = self.min_delta
+            leg["max_delta"] = self.max_delta
+        if self.max_width is not None:
+            leg["max_width"] = self.max_width
+        if self.strike_price is not None:
+            leg["strike_price"] = self.strike_price
+        leg["option_type"] = self.right.value
+        leg["long_short"] = self.side.value
+        leg["size_ratio"] = self.size_ratio
+        leg["dte_type"] = self.dte_type.value
+        leg["dte_value"] = self.dte_value
+        if self.dte_type is DteType.TARGET:
+            leg["dte_min"] = self.dte_min
+            leg["dte_max"] = self.dte_max
+        return leg
+
+
+@dataclass(frozen=True, slots=True)
+class EntryPlan:
+    # Weekday numbers (Monday=0) on which new positions may be opened
+    weekdays: FrozenSet[int] = frozenset(range(7))
+
+    def allows(self, day) -> bool:
+        return day.weekday() in self.weekdays
+
+
+@dataclass(frozen=True, slots=True)
+class ExitPlan:
+    profit_target: Optional[ProfitTarget] = None
+    profit_target_value: Optional[float] = None
+    stop: Optional[StopType] = None
+    stop_value: Optional[float] = None
+    days_before_exit: int = DEFAULT_DAYS_BEFORE_EXIT
+    # Bound P&L rules; None when the target/stop needs more than the position P&L
+    profit_rule: Optional[ExitRule] = None
+    stop_rule: Optional[ExitRule] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ExecutionPlan:
+    symbol: str
+    legs: Tuple[LegPlan, ...]
+    entry: EntryPlan
+    exit: ExitPlan
+    investment_pct: float = DEFAULT_INVESTMENT_PCT
+    entry_filters: EntryPredicate = field(default_factory=lambda: EntryPredicate([]))
+
+    def to_parameters(self) -> Dict[str, Any]:
+        """JSON-safe strategy parameters (the historical ``convert_params`` output)."""
+        return {
+            "investment_pct": self.investment_pct,
+            "symbol": self.symbol,
+            "profit_target_type": self.exit.profit_target.value if self.exit.profit_target else None,
+            "profit_target_value": self.exit.profit_target_value,
+            "days_before_exit": self.exit.days_before_exit,
+            "stop_type": self.exit.stop.value if self.exit.stop else None,
+            "stop_value": self.exit.stop_value,
+            "entry_weekdays": sorted(self.entry.weekdays),
+            "legs": [leg.to_parameters() for leg in self.legs],
+        }
+
+    @classmethod
+    def from_parameters(cls, params: Dict[str, Any]) -> "ExecutionPlan":
+        """Rebuild a plan from strategy parameters (possibly with sweep overrides)."""
+        weekdays = params.get("entry_weekdays")
+        return cls(
+            symbol=params["symbol"],
+            legs=tuple(_leg_from_parameters(leg) for leg in params.get("legs") or []),
+            entry=EntryPlan(frozenset(weekdays)) if weekdays is not None else EntryPlan(),
+            exit=_exit_plan(
+                ProfitTarget(params["profit_target_type"]) if params.get("profit_target_type") else None,
+                _number(params.get("profit_target_value"), "profit_target_value"),
+                StopType(params["stop_type"]) if params.get("stop_type") else None,
+                _number(params.get("stop_value"), "stop_value"),
+                int(params.get("days_before_exit", DEFAULT_DAYS_BEFORE_EXIT)),
+            ),
+            investment_pct=float(params.get("investment_pct", DEFAULT_INVESTMENT_PCT)),
+        )
+
+
+def _exit_plan(profit_target, profit_target_value, stop, stop_value, days_before_exit) -> ExitPlan:
+    profit_rule = None
+    if profit_target is ProfitTarget.PERCENT:
+        profit_rule = partial(_pct_at_least, profit_target_value)
+    elif profit_target is ProfitTarget.FIXED_NET:
+        profit_rule = partial(_dollar_at_least, profit_target_value)
+    stop_rule = None
+    if stop is StopType.PERCENT_LOSS:
+        stop_rule = partial(_pct_loss, stop_value)
+    elif stop is StopType.DOLLAR_LOSS:
+        stop_rule = partial(_dollar_loss, stop_value)
+    return ExitPlan(
+        profit_target=profit_target,
+        profit_target_value=profit_target_value,
+        stop=stop,
+        stop_value=stop_value,
+        days_before_exit=days_before_exit,
+        profit_rule=profit_rule,
+        stop_rule=stop_rule,
+    )
+
+
+def _dte(dte_type: DteType, value, dte_min, dte_max) -> Tuple[int, int, int]:
+    value = int(_number(value, "days to expiration", 30))
+    if dte_type is DteType.EXACT:
+        return value, value, value
+    dte_min = int(_number(dte_min, "minimum days to expiration", max(1, value - 10)))
+    dte_max = int(_number(dte_max, "maximum days to expiration", value + 10))
+    if dte_min > dte_max:
+        raise PlanError(f"minimum days to expiration {dte_min} exceeds maximum {dte_max}")
+    return value, dte_min, dte_max
+
+
+def _leg_plan(
+    right: OptionRight,
+    side: Side,
+    size_ratio,
+    strike_target: Optional[StrikeTarget],
+    target_value: Optional[float],
+    dte_type: DteType,
+    dte: Tuple[int, int, int],
+    target_delta=None,
+    min_delta=None,
+    max_delta=None,
+    strike_price=None,
+    max_width=None,
+) -> LegPlan:
+    size_ratio = int(_number(size_ratio, "size_ratio", 1))
+    if size_ratio < 1:
+        raise PlanError(f"size_ratio must be at least 1, got {size_ratio}")
+    if strike_target is StrikeTarget.EXACT and strike_price is None:
+        strike_price = target_value
+    target_delta = as_delta(target_delta)
+    return LegPlan(
+        right=right,
+        side=side,
+        size_ratio=size_ratio,
+        strike_target=strike_target,
+        target_value=target_value,
+        dte_type=dte_type,
+        dte_value=dte[0],
+        dte_min=dte[1],
+        dte_max=dte[2],
+        target_delta=DEFAULT_TARGET_DELTA if target_delta is None else target_delta,
+        min_delta=as_delta(min_delta),
+        max_delta=as_delta(max_delta),
+        strike_price=strike_price,
+        max_width=max_width,
+    )
+
+
+def _leg_from_parameters(leg: Dict[str, Any]) -> LegPlan:
+    strike_target = StrikeTarget(leg["strike_target_type"]) if leg.get("strike_target_type") else None
+    value_key = STRIKE_TARGET_KEYS[strike_target] if strike_target else "target_delta"
+    dte_type = DteType.EXACT if leg.get("dte_type") == DteType.EXACT.value else DteType.TARGET
+    return _leg_plan(
+        OptionRight((leg.get("option_type") or "call").lower()),
+        Side((leg.get("long_short") or "long").lower()),
+        leg.get("size_ratio", 1),
+        strike_target,
+        _number(leg.get(value_key), value_key),
+        dte_type,
+        _dte(dte_type, leg.get("dte_value"), leg.get("dte_min"), leg.get("dte_max")),
+        target_delta=leg.get("target_delta"),
+        min_delta=leg.get("min_delta"),
+        max_delta=leg.get("max_delta"),
+        strike_price=_number(leg.get("strike_price"), "strike_price"),
+        max_width=_number(leg.get("max_width"), "max_width"),
+    )
+
+
+def _compile_leg(index: int, leg: Dict[str, Any]) -> LegPlan:
+    what = f"leg {index + 1}"
+    if not isinstance(leg, dict):
+        raise PlanError(f"{what} must be an object")
+    label = leg.get("strike_target_type")
+    if label not in STRIKE_TARGET_LABELS:
+        raise PlanError(f"{what}: unsupported strike target type {label!r}")
+    strike_target = STRIKE_TARGET_LABELS[label]
+    values = leg.get("strike_target_value") or []
+    option_type = str(leg.get("option_type") or "").upper()
+    if option_type not in ("CALL", "PUT"):
+        raise PlanError(f"{what}: option_type must be CALL or PUT, got {leg.get('option_type')!r}")
+    long_or_short = str(leg.get("long_or_short") or "").upper()
+    if long_or_short not in ("LONG", "SHORT"):
+        raise PlanError(f"{what}: long_or_short must be LONG or SHORT, got {leg.get('long_or_short')!r}")
+    dte_type = DteType.EXACT if leg.get("days_to_expiration_type") == DteType.EXACT.value else DteType.TARGET
+    dte_values = leg.get("days_to_expiration_value") or []
+    dte = _dte(
+        dte_type,
+        _item(dte_values, 0, f"{what} days to expiration"),
+        _item(dte_values, 1, f"{what} days to expiration"),
+        _item(dte_values, 2, f"{what} days to expiration"),
+    )
+    if strike_target is StrikeTarget.DELTA:
+        # UI order is [min, target, max]
+        target_value = _item(values, 1, f"{what} strike target")
+        min_delta = _item(values, 0, f"{what} strike target")
+        max_delta = _item(values, 2, f"{what} strike target")
+    else:
+        target_value = _item(values, 0, f"{what} strike target")
+        min_delta = max_delta = None
+    max_width = None
+    if strike_target is StrikeTarget.PREMIUM:
+        max_width = _item(values, 2, f"{what} strike target") or None
+    return _leg_plan(
+        OptionRight.PUT if option_type == "PUT" else OptionRight.CALL,
+        Side.LONG if long_or_short == "LONG" else Side.SHORT,
+        leg.get("size_ratio", 1),
+        strike_target,
+        target_value,
+        dte_type,
+        dte,
+        target_delta=target_value if strike_target is StrikeTarget.DELTA else None,
+        min_delta=min_delta,
+        max_delta=max_delta,
+        max_width=max_width,
+    )
+
+
+def _compile_exit(trade_exit: Dict[str, Any], trade_stop: Dict[str, Any]) -> ExitPlan:
+    label = trade_exit.get("profit_target_type")
+    if label in (None, "DISABLED"):
+        profit_target, profit_target_value = None, None
+    elif label in PROFIT_TARGET_LABELS:
+        profit_target = PROFIT_TARGET_LABELS[label]
+        profit_target_value = _number(trade_exit.get("profit_target_value"), "profit_target_value", 0.0)
+        if profit_target is ProfitTarget.PERCENT:
+            profit_target_value = _fraction(profit_target_value)
+    else:
+        raise PlanError(f"unsupported profit target type {label!r}")
+
+    # The stop settings live on trade_stop; older bots kept them on trade_exit
+    stop_settings = trade_stop if "stop_loss_type" in trade_stop else trade_exit
+    label = stop_settings.get("stop_loss_type")
+    if label in (None, "DISABLED"):
+        stop, stop_value = None, None
+    elif label in STOP_LABELS:
+        stop = STOP_LABELS[label]
+        stop_value = _number(stop_settings.get("stop_value"), "stop_value", 0.0)
+        if stop is StopType.PERCENT_LOSS:
+            stop_value = _fraction(stop_value)
+    else:
+        raise PlanError(f"unsupported stop loss type {label!r}")
+
+    days_before_exit = DEFAULT_DAYS_BEFORE_EXIT
+    if trade_exit.get("exit_at_set_time"):
+        days_before_exit = int(_item(trade_exit["exit_at_set_time"], 0, "exit_at_set_time"))
+    return _exit_plan(profit_target, profit_target_value, stop, stop_value, days_before_exit)
+
+
+def _compile_entry(trade_entry: Dict[str, Any]) -> EntryPlan:
+    days = trade_entry.get("days_of_week_to_enter")
+    if days is None:
+        return EntryPlan()
+    if not isinstance(days, (list, tuple)):
+        raise PlanError(f"days_of_week_to_enter must be a list, got {days!r}")
+    # [any day, Monday, ..., Friday], as filtered by the bot list
+    if not days or days[0]:
+        return EntryPlan()
+    return EntryPlan(frozenset(day for day in range(5) if day + 1 < len(days) and days[day + 1]))
+
+
+def compile_plan(bot, strategy) -> ExecutionPlan:
+    """Validate the bot and strategy settings; raises ``PlanError`` on bad input."""
+    if not getattr(strategy, "symbol", None):
+        raise PlanError("strategy has no symbol")
+    legs = strategy.legs or []
+    if not isinstance(legs, list) or not legs:
+        raise PlanError("strategy has no legs")
+    return ExecutionPlan(
+        symbol=strategy.symbol,
+        legs=tuple(_compile_leg(index, leg) for index, leg in enumerate(legs)),
+        entry=_compile_entry(bot.trade_entry or {}),
+        exit=_compile_exit(bot.trade_exit or {}, bot.trade_stop or {}),
+        entry_filters=compile_entry_filters(bot.trade_condition),
+    )
+
+
+_plans: Dict[tuple, ExecutionPlan] = {}
+_plans_lock = threading.Lock()
+
+
+def get_plan(bot, strategy=None) -> ExecutionPlan:
+    """Compiled plan for ``bot``, rebuilt only when the bot or its strategy is edited."""
+    strategy = strategy if strategy is not None else bot.strategy
+    key = (bot.id, bot.updated_at, strategy.id, strategy.updated_at)
+    with _plans_lock:
+        plan = _plans.get(key)
+    if plan is None:
+        plan = compile_plan(bot, strategy)
+        with _plans_lock:
+            if len(_plans) > 1024:
+                _plans.clear()
+            _plans[key] = plan
+    return plan
@@ -0,0 +1,104 @@
+"""
+Vectorized Black-Scholes pricing, greeks and implied volatility.
+
+Every function takes NumPy arrays (or scalars that broadcast against them), so
+a whole expiry's strike ladder is priced in one call instead of one contract
+at a time.
+"""
+import numpy as np
+from scipy.special import ndtr
+
+MIN_TIME = 1.0 / 365.0
+MIN_VOL = 1e-4
+MAX_VOL = 5.0
+
+
+def _pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2.0 * np.pi)
+
+
+def _d1_d2(spot, strikes, t, rate, sigma, dividend=0.0):
+    t = np.maximum(t, MIN_TIME)
+    sigma = np.maximum(sigma, MIN_VOL)
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(spot / strikes) + (rate - dividend + 0.5 * sigma * sigma) * t) / (sigma * sqrt_t)
+    return d1, d1 - sigma * sqrt_t, t, sqrt_t, sigma
+
+
+def bs_price(spot, strikes, t, rate, sigma, is_call, dividend=0.0):
+    """Black-Scholes price; ``is_call`` is a bool or a bool array."""
+    strikes = np.asarray(strikes, dtype=float)
+    d1, d2, t, _, _ = _d1_d2(spot, strikes, t, rate, sigma, dividend)
+    disc_spot = spot * np.exp(-dividend * t)
+    disc_strike = strikes * np.exp(-rate * t)
+    call = disc_spot * ndtr(d1) - disc_strike * ndtr(d2)
+    put = disc_strike * ndtr(-d2) - disc_spot * ndtr(-d1)
+    return np.where(is_call, call, put)
+
+
+def greeks(spot, strikes, t, rate, sigma, is_call, dividend=0.0):
+    """Delta, gamma, theta (per calendar day) and vega (per 1 vol point)."""
+    strikes = np.asarray(strikes, dtype=float)
+    d1, d2, t, sqrt_t, sigma = _d1_d2(spot, strikes, t, rate, sigma, dividend)
+    div_disc = np.exp(-dividend * t)
+    rate_disc = np.exp(-rate * t)
+    pdf_d1 = _pdf(d1)
+
+    delta = np.where(is_call, div_disc * ndtr(d1), div_disc * (ndtr(d1) - 1.0))
+    gamma = div_disc * pdf_d1 / (spot * sigma * sqrt_t)
+    vega = spot * div_disc * pdf_d1 * sqrt_t / 100.0
+    decay = -spot * div_disc * pdf_d1 * sigma / (2.0 * sqrt_t)
+    call_theta = decay - rate * strikes * rate_disc * ndtr(d2) + dividend * spot * div_disc * ndtr(d1)
+    put_theta = decay + rate * strikes * rate_disc * ndtr(-d2) - dividend * spot * div_disc * ndtr(-d1)
+    theta = np.where(is_call, call_theta, put_theta) / 365.0
+    return {"delta": delta, "gamma": gamma, "theta": theta, "vega": vega}
+
+
+def implied_vol(prices, spot, strikes, t, rate, is_call, dividend=0.0, tol=1e-6, max_iter=50):
+    """Implied vol for an array of option prices.
+
+    Newton steps are kept inside a per-contract bisection bracket, so contracts
+    with tiny vega still converge. Prices outside no-arbitrage bounds give NaN.
+    """
+    prices = np.asarray(prices, dtype=float)
+    strikes = np.broadcast_to(np.asarray(strikes, dtype=float), prices.shape)
+    t = np.maximum(t, MIN_TIME)
+    low = np.full(prices.shape, MIN_VOL)
+    high = np.full(prices.shape, MAX_VOL)
+    sigma = np.full(prices.shape, 0.3)
+
+    intrinsic = np.where(
+        is_call,
+        np.maximum(spot * np.exp(-dividend * t) - strikes * np.exp(-rate * t), 0.0),
+        np.maximum(strikes * np.exp(-rate * t) - spot * np.exp(-dividend * t), 0.0),
+    )
+    valid = np.isfinite(prices) & (prices > intrinsic) & (prices < np.where(is_call, spot, strikes))
+
+    for _ in range(max_iter):
+        price = bs_price(spot, strikes, t, rate, sigma, is_call, dividend)
+        diff = price - prices
+        if np.all(np.abs(diff[valid]) < tol):
+            break
+        high = np.where(diff > 0, sigma, high)
+        low = np.where(diff <= 0, sigma, low)
+        vega = greeks(spot, strikes, t, rate, sigma, is_call, dividend)["vega"] * 100.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = sigma - diff / vega
+        in_bracket = (newton > low) & (newton < high) & np.isfinite(newton)
+        sigma = np.where(in_bracket, newton, 0.5 * (low + high))
+
+    return np.where(valid, sigma, np.nan)
+
+
+def select_by_delta(deltas, target_delta, min_delta=None, max_delta=None):
+    """Index of the |delta| closest to ``target_delta`` inside [min, max], or None."""
+    abs_deltas = np.abs(np.asarray(deltas, dtype=float))
+    mask = np.isfinite(abs_deltas)
+    if min_delta:
+        mask &= abs_deltas >= abs(min_delta)
+    if max_delta:
+        mask &= abs_deltas <= abs(max_delta)
+    if not mask.any():
+        return None
+    distance = np.where(mask, np.abs(abs_deltas - abs(target_delta)), np.inf)
+    return int(np.argmin(distance))
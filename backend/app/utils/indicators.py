@@ -0,0 +1,439 @@
+"""
+Streaming indicators and compiled entry filters for live bots.
+
+Candles are fed into a per-(symbol, bar size) ``Series``; only candles newer
+than the last one seen are processed, and every indicator updates in O(1) when
+a bar closes. The bar still forming is never committed: ``peek`` evaluates an
+indicator as if it closed at the latest price, which is what the entry filters
+compare against.
+
+``compile_entry_filters`` turns a ``Bot.trade_condition`` dict into one
+predicate that is evaluated against an ``IndicatorBank`` every tick. The
+predicate also reports how many closed bars of each bar size its checks need.
+``IndicatorBank.feed`` seeds a series from that much Schwab history (at a
+candle frequency that tiles the bar size) before it is first evaluated, and
+again after a restart or a gap. Otherwise it feeds only the recent candles.
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+MS_PER_UNIT = {
+    "minute": 60_000,
+    "hour": 3_600_000,
+    "day": 86_400_000,
+}
+DAY = ("day", 1)
+HISTORY = 500
+# ``bullish_signal``'s daily SMA
+BULLISH_WINDOW = 5
+# EMAs start from an SMA seed; a few more periods of history bring them close to a long-running one
+EMA_WARMUP = 3
+# Schwab minute candle sizes; intraday bars are bucketed from the largest one that divides them
+SCHWAB_MINUTE_FREQUENCIES = (30, 15, 10, 5, 1)
+SESSION_MINUTES = 390
+# Weekends and market holidays on top of the sessions a lookback needs
+HISTORY_SLACK_DAYS = 5
+# A series not fed for this long may have a gap the per-tick window does not
+# cover (10 daily sessions, 2 intraday sessions); it is seeded again
+STALE_MS = {"day": 7 * 86_400_000, "hour": 86_400_000, "minute": 86_400_000}
+
+
+def bar_spec(period_type: Optional[str], period_length) -> Tuple[str, int]:
+    # "Daily at Close" and unknown/empty period types fall back to daily bars
+    unit = (period_type or "day").strip().lower()
+    if unit not in MS_PER_UNIT:
+        unit = "day"
+    return unit, max(int(period_length or 1), 1)
+
+
+def lookback(kind: str, periods: int) -> int:
+    """Closed bars a moving average of ``periods`` needs before it is trusted."""
+    return min(periods * EMA_WARMUP if kind == "exponential" else periods, HISTORY)
+
+
+def history_frequency(spec: Tuple[str, int]) -> Tuple[str, int]:
+    """Schwab ``(frequencyType, frequency)`` whose candles tile the bars of ``spec``."""
+    unit, length = spec
+    if unit == "day":
+        return "daily", 1
+    minutes = length * (60 if unit == "hour" else 1)
+    return "minute", next(f for f in SCHWAB_MINUTE_FREQUENCIES if minutes % f == 0)
+
+
+def history_days(spec: Tuple[str, int], bars: int) -> int:
+    """Calendar days of regular-session candles holding ``bars`` closed bars of ``spec``."""
+    unit, length = spec
+    if unit == "day":
+        sessions = bars * length
+    else:
+        sessions = math.ceil(bars * length * (60 if unit == "hour" else 1) / SESSION_MINUTES)
+    # One more session for the bar still forming
+    return math.ceil((sessions + 1) * 7 / 5) + HISTORY_SLACK_DAYS
+
+
+def pct_change(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if old in (None, 0) or new is None:
+        return None
+    return (new - old) / old * 100.0
+
+
+# -----------------------------------------------------------------------------
+#  Moving averages: ``update`` commits a closed bar, ``peek`` previews one more
+# -----------------------------------------------------------------------------
+class SMA:
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+
+    def update(self, value: float):
+        self.window.append(value)
+        self.total += value
+        if len(self.window) > self.period:
+            self.total -= self.window.popleft()
+
+    def peek(self, value: float) -> Optional[float]:
+        if len(self.window) + 1 < self.period:
+            return None
+        if len(self.window) == self.period:
+            return (self.total - self.window[0] + value) / self.period
+        return (self.total + value) / self.period
+
+
+class EMA:
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value: Optional[float] = None
+        self._seed = SMA(period)
+        self._count = 0
+
+    def update(self, value: float):
+        if self.value is None:
+            self._seed.update(value)
+            self._count += 1
+            if self._count == self.period:
+                self.value = self._seed.total / self.period
+            return
+        self.value += self.alpha * (value - self.value)
+
+    def peek(self, value: float) -> Optional[float]:
+        if self.value is None:
+            # Seeded with the SMA of the first ``period`` bars
+            return self._seed.peek(value)
+        return self.value + self.alpha * (value - self.value)
+
+
+class WMA:
+    """Linearly weighted; keeps the plain and weighted sums so each bar is O(1)."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+        self.weighted = 0.0
+        self.denominator = period * (period + 1) / 2.0
+
+    def update(self, value: float):
+        if len(self.window) == self.period:
+            self.weighted += self.period * value - self.total
+            self.total += value - self.window.popleft()
+        else:
+            self.weighted += (len(self.window) + 1) * value
+            self.total += value
+        self.window.append(value)
+
+    def peek(self, value: float) -> Optional[float]:
+        if len(self.window) + 1 < self.period:
+            return None
+        if len(self.window) == self.period:
+            return (self.weighted + self.period * value - self.total) / self.denominator
+        return (self.weighted + self.period * value) / self.denominator
+
+
+MOVING_AVERAGES = {"simple": SMA, "exponential": EMA, "weighted": WMA}
+
+
+class Crossover:
+    """Remembers the sign of ``fast - slow``; +1 on a cross above, -1 below."""
+
+    def __init__(self):
+        self.previous: Optional[float] = None
+
+    def update(self, fast: Optional[float], slow: Optional[float]) -> int:
+        if fast is None or slow is None:
+            return 0
+        diff = fast - slow
+        previous, self.previous = self.previous, diff
+        if previous is None:
+            return 0
+        if previous <= 0 < diff:
+            return 1
+        if previous >= 0 > diff:
+            return -1
+        return 0
+
+
+# -----------------------------------------------------------------------------
+#  Bar series and the per-process bank
+# -----------------------------------------------------------------------------
+class Series:
+    def __init__(self, unit: str, length: int):
+        self.bucket_ms = MS_PER_UNIT[unit] * length
+        self.closes = deque(maxlen=HISTORY)
+        self.indicators: Dict[Tuple[str, int], object] = {}
+        self.bucket: Optional[int] = None
+        self.open: Optional[float] = None
+        self.last: Optional[float] = None
+        self.last_ts: Optional[int] = None
+
+    @property
+    def previous_close(self) -> Optional[float]:
+        return self.closes[-1] if self.closes else None
+
+    def _commit(self, close: float):
+        self.closes.append(close)
+        for indicator in self.indicators.values():
+            indicator.update(close)
+
+    def add(self, ts: int, open_: float, close: float):
+        if self.last_ts is not None and ts < self.last_ts:
+            return
+        bucket = ts // self.bucket_ms
+        if self.bucket is not None and bucket > self.bucket:
+            self._commit(self.last)
+            self.open = open_
+        elif self.bucket is None:
+            self.open = open_
+        self.bucket = bucket
+        self.last = close
+        self.last_ts = ts
+
+    def indicator(self, kind: str, period: int):
+        key = (kind, period)
+        if key not in self.indicators:
+            indicator = MOVING_AVERAGES[kind](period)
+            for close in self.closes:
+                indicator.update(close)
+            self.indicators[key] = indicator
+        return self.indicators[key]
+
+    def moving_average(self, kind: str, period: int) -> Optional[float]:
+        if self.last is None or period <= 0:
+            return None
+        return self.indicator(kind, period).peek(self.last)
+
+
+class IndicatorBank:
+    """Per-process indicator state keyed by (symbol, bar size); thread safe."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._series: Dict[Tuple[str, str, int], Series] = {}
+        self._seeded: Dict[Tuple[str, str, int], int] = {}
+        self._crossovers: Dict[tuple, Crossover] = {}
+
+    def series(self, symbol: str, spec: Tuple[str, int] = DAY) -> Series:
+        key = (symbol.upper(), spec[0], spec[1])
+        if key not in self._series:
+            self._series[key] = Series(*spec)
+        return self._series[key]
+
+    def needs_seed(self, symbol: str, spec: Tuple[str, int], bars: int) -> bool:
+        """Never seeded, seeded with fewer than ``bars`` bars, or fed too long ago."""
+        with self._lock:
+            key = (symbol.upper(), spec[0], spec[1])
+            series = self._series.get(key)
+            if series is None or series.last_ts is None or self._seeded.get(key, 0) < bars:
+                return True
+            return time.time() * 1000 - series.last_ts > STALE_MS[spec[0]]
+
+    def seed(self, symbol: str, spec: Tuple[str, int], candles: List[dict], bars: int):
+        """Rebuild the ``spec`` series of ``symbol`` from a full history of candles."""
+        series = Series(*spec)
+        for candle in sorted(candles, key=lambda candle: int(candle["datetime"])):
+            series.add(int(candle["datetime"]), candle["open"], candle["close"])
+        with self._lock:
+            key = (symbol.upper(), spec[0], spec[1])
+            self._series[key] = series
+            self._seeded[key] = bars
+            for crossover_key in [k for k in self._crossovers if k[0] == key[0] and k[-1] == spec]:
+                del self._crossovers[crossover_key]
+
+    def feed(
+        self,
+        symbol: str,
+        requirements: Dict[Tuple[str, int], int],
+        fetch: Callable[[Tuple[str, int], Optional[int]], List[dict]],
+    ):
+        """Bring the series of ``symbol`` in ``requirements`` (bar size -> bars) up to date.
+
+        ``fetch(spec, days)`` returns Schwab candles at ``history_frequency(spec)``:
+        the last ``days`` calendar days, or the per-tick recent window when
+        ``days`` is None. It is called outside the lock.
+        """
+        for spec, bars in requirements.items():
+            if self.needs_seed(symbol, spec, bars):
+                self.seed(symbol, spec, fetch(spec, history_days(spec, bars)), bars)
+            else:
+                self.update(symbol, fetch(spec, None), (spec,))
+
+    def update(self, symbol: str, candles: List[dict], specs: Iterable[Tuple[str, int]] = (DAY,)):
+        """Feed Schwab pricehistory candles; already-seen candles are skipped."""
+        with self._lock:
+            for spec in set(specs):
+                series = self.series(symbol, spec)
+                fresh = []
+                # Walk back from the newest candle; the re-sent forming candle is kept
+                for candle in reversed(candles):
+                    if series.last_ts is not None and int(candle["datetime"]) < series.last_ts:
+                        break
+                    fresh.append(candle)
+                for candle in reversed(fresh):
+                    series.add(int(candle["datetime"]), candle["open"], candle["close"])
+
+    def moving_average(self, symbol: str, kind: str, period: int, spec: Tuple[str, int] = DAY) -> Optional[float]:
+        with self._lock:
+            return self.series(symbol, spec).moving_average(kind, period)
+
+    def crossover(self, symbol: str, kind: str, fast: int, slow: int, spec: Tuple[str, int] = DAY) -> Tuple[Optional[float], Optional[float], int]:
+        with self._lock:
+            series = self.series(symbol, spec)
+            fast_value = series.moving_average(kind, fast)
+            slow_value = series.moving_average(kind, slow)
+            key = (symbol.upper(), kind, fast, slow, spec)
+            signal = self._crossovers.setdefault(key, Crossover()).update(fast_value, slow_value)
+            return fast_value, slow_value, signal
+
+    def day_stats(self, symbol: str) -> Dict[str, Optional[float]]:
+        with self._lock:
+            series = self.series(symbol, DAY)
+            return {"open": series.open, "last": series.last, "previous_close": series.previous_close}
+
+    def bullish_signal(self, symbol: str, window: int = BULLISH_WINDOW) -> Tuple[bool, Optional[float]]:
+        """Streaming twin of ``live_trade.bullish_signal``: last price above its daily SMA."""
+        with self._lock:
+            series = self.series(symbol, DAY)
+            ma = series.moving_average("simple", window)
+            return (ma is not None and series.last > ma), ma
+
+
+indicator_bank = IndicatorBank()
+
+
+# -----------------------------------------------------------------------------
+#  Compiled entry filters
+# -----------------------------------------------------------------------------
+UNDERLYING = "underlying"
+VOLATILITY_INDEX = "volatility_index"
+
+
+class EntryPredicate:
+    """``predicate(bank, {"underlying": "SPY", "volatility_index": "$VIX"}) -> (ok, failed)``.
+
+    Each check is ``(name, role, bar size, closed bars needed, check)``.
+    """
+
+    def __init__(self, checks: List[Tuple[str, str, Tuple[str, int], int, Callable]]):
+        self.checks = checks
+
+    @property
+    def roles(self):
+        return {role for _, role, _, _, _ in self.checks}
+
+    def requirements(self, role: str) -> Dict[Tuple[str, int], int]:
+        """Closed bars of history each bar size needs for the ``role`` checks."""
+        needs: Dict[Tuple[str, int], int] = {}
+        for _, check_role, spec, bars, _ in self.checks:
+            if check_role == role:
+                needs[spec] = max(needs.get(spec, 0), bars)
+        return needs
+
+    def __call__(self, bank: IndicatorBank, symbols: Dict[str, str]) -> Tuple[bool, List[str]]:
+        failed = [name for name, role, _, _, check in self.checks if not check(bank, symbols[role])]
+        return not failed, failed
+
+
+def _bounds(config: dict) -> Callable[[Optional[float]], bool]:
+    greater = config.get("greater_than") or {}
+    lower = config.get("lower_than") or {}
+    low = float(greater.get("value") or 0.0) if greater.get("on") else None
+    high = float(lower.get("value") or 0.0) if lower.get("on") else None
+
+    def within(value: Optional[float]) -> bool:
+        if value is None:
+            return False
+        return (low is None or value > low) and (high is None or value < high)
+
+    return within
+
+
+def _is_active_bounds(config: dict) -> bool:
+    return bool(config.get("enabled")) and any(
+        (config.get(side) or {}).get("on") for side in ("greater_than", "lower_than")
+    )
+
+
+def _ma_kind(config: dict) -> str:
+    kind = (config.get("moving_average_type") or "simple").strip().lower()
+    return kind if kind in MOVING_AVERAGES else "simple"
+
+
+def _compile_group(role: str, prefix: str, filters: dict, checks: list):
+    def day_check(field: str, metric: Callable[[dict], Optional[float]]):
+        config = filters.get(field) or {}
+        if not _is_active_bounds(config):
+            return
+        within = _bounds(config)
+        # The previous close is the one closed bar these need
+        checks.append((field, role, DAY, 1, lambda bank, symbol: within(metric(bank.day_stats(symbol)))))
+
+    day_check(f"open_when_{prefix}_intraday_change", lambda s: pct_change(s["open"], s["last"]))
+    day_check(f"open_when_{prefix}_oneday_change", lambda s: pct_change(s["previous_close"], s["last"]))
+    day_check(f"open_when_{prefix}_overnight_gap", lambda s: pct_change(s["previous_close"], s["open"]))
+    between = "open_when_underlying_market_value_between" if role == UNDERLYING else "open_when_volatility_index_between"
+    day_check(between, lambda s: s["last"])
+
+    ma_range = filters.get(f"open_when_{prefix}_moving_average_range") or {}
+    price_bounds = ma_range.get("open_trade_when_underlying_market_price_is") or {}
+    periods = int(ma_range.get("periods") or 0)
+    if ma_range.get("enabled") and periods > 0 and any((price_bounds.get(s) or {}).get("on") for s in ("greater_than", "lower_than")):
+        within = _bounds(price_bounds)
+        kind, spec = _ma_kind(ma_range), bar_spec(ma_range.get("period_type"), ma_range.get("period_length"))
+
+        def ma_range_check(bank, symbol, kind=kind, periods=periods, spec=spec, within=within):
+            # Distance of the latest price from its moving average, in percent
+            ma = bank.moving_average(symbol, kind, periods, spec)
+            return within(pct_change(ma, bank.series(symbol, spec).last))
+
+        checks.append((f"open_when_{prefix}_moving_average_range", role, spec, lookback(kind, periods), ma_range_check))
+
+    crossover = filters.get(f"open_when_{prefix}_moving_average_crossover") or {}
+    fast = int(crossover.get("periods_in_moving_average1") or 0)
+    slow = int(crossover.get("periods_in_moving_average2") or 0)
+    if crossover.get("enabled") and fast > 0 and slow > 0:
+        kind, spec = _ma_kind(crossover), bar_spec(crossover.get("period_type"), crossover.get("period_length"))
+        want_above = (crossover.get("open_trade_when") or "").strip().lower() in ("above", "greater than")
+
+        def crossover_check(bank, symbol, kind=kind, fast=fast, slow=slow, spec=spec, want_above=want_above):
+            fast_value, slow_value, _ = bank.crossover(symbol, kind, fast, slow, spec)
+            if fast_value is None or slow_value is None:
+                return False
+            return fast_value > slow_value if want_above else fast_value < slow_value
+
+        checks.append(
+            (f"open_when_{prefix}_moving_average_crossover", role, spec, lookback(kind, max(fast, slow)), crossover_check)
+        )
+
+
+def compile_entry_filters(trade_condition: Optional[dict]) -> EntryPredicate:
+    """Resolve every enabled, fully configured filter once; the rest are skipped."""
+    trade_condition = trade_condition or {}
+    checks: list = []
+    if trade_condition.get("entry_filters"):
+        _compile_group(UNDERLYING, "underlying", trade_condition.get("underlying_entry_filters") or {}, checks)
+        _compile_group(VOLATILITY_INDEX, "volatility_index", trade_condition.get("volatility_index_entry_filters") or {}, checks)
+    return EntryPredicate(checks)
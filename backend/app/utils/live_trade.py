@@ -1,5 +1,5 @@
 import statistics
-import datetime
+from app.utils.option_chain import OptionChainFrame
 
 def moving_average(prices, window=5):
     return statistics.mean(prices[-window:])
@@ -15,39 +15,12 @@ def find_option(contract_map, underlying_price, option_type, strike_offset=0, ma
     - ATM strike + offset (offset in strikes)
     - Expiry within max_days
 
+    Parses the map on every call – when picking several legs from one chain,
+    build an OptionChainFrame once and call its find_option instead.
     """
-    leg_option = None
-    today = datetime.date.today()
-
-    # Schwab API option chain keys are like '2024-08-16:5' — date:expiration type, first split date
-    # contract_map structure: {expiry: {strike: [contracts]}}
-    
-    for expiry_key, strikes in contract_map.items():
-        expiry_str = expiry_key.split(':')[0]
-        try:
-            expiry_date = datetime.datetime.strptime(expiry_str, "%Y-%m-%d").date()
-        except ValueError:
-            continue
-        days_to_exp = (expiry_date - today).days
-        if days_to_exp > max_days or days_to_exp < 0:
-            continue
-        
-        # Sort strikes numeric
-        sorted_strikes = sorted([float(k) for k in strikes.keys()])
-        
-        # Find index of underlying_price nearest strike
-        idx = min(range(len(sorted_strikes)), key=lambda i: abs(sorted_strikes[i] - underlying_price))
-        target_idx = idx + strike_offset
-        if target_idx < 0 or target_idx >= len(sorted_strikes):
-            continue
-        target_strike = sorted_strikes[target_idx]
-        
-        contracts = strikes.get(str(target_strike), [])
-        for contract in contracts:
-            if contract['putCall'].lower() == option_type.lower():
-                if leg_option is None or contract['mark'] < leg_option['mark']:
-                    leg_option = contract
-    return leg_option
+    return OptionChainFrame.from_exp_date_map(contract_map).find_option(
+        underlying_price, option_type, strike_offset, max_days
+    )
 
 
 # ============ Build Multi-Leg Order ============
@@ -0,0 +1,284 @@
+"""
+Persistent on-disk cache for Polygon market data used by backtests.
+
+Every download is stored once as a Parquet file whose name is the SHA-256 of
+(kind, symbol/contract, timespan, start, end), so repeated backtests over the
+same window read local columnar files instead of calling Polygon again.
+The cache is shared by every backtest worker on the host and is bounded by
+MARKET_DATA_CACHE_MAX_BYTES: the least recently used files are evicted first.
+
+Prefetch a window before running a batch of backtests:
+
+    python -m app.utils.market_data_cache prefetch SPY 2024-01-01 2024-06-30 --timespan day --chains
+"""
+import argparse
+import functools
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.core.config import settings
+
+
+def _iso(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return value.isoformat()
+    return str(value)
+
+
+def asset_key(asset) -> str:
+    """Stable identifier for a lumibot Asset (stock or single option contract)."""
+    if str(getattr(asset, "asset_type", "")).lower().endswith("option"):
+        return f"{asset.symbol}:{_iso(asset.expiration)}:{asset.strike}:{str(asset.right).upper()}"
+    return str(getattr(asset, "symbol", asset))
+
+
+class MarketDataCache:
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        # Running size estimate so a put only walks the tree when we may be over budget
+        self._approx_bytes: Optional[int] = None
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, kind: str, symbol: str, timespan: str, start, end) -> str:
+        raw = json.dumps([kind, symbol, timespan, _iso(start), _iso(end)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.parquet")
+
+    def get(self, kind: str, symbol: str, timespan: str, start, end) -> Optional[pd.DataFrame]:
+        path = self.path(self.key(kind, symbol, timespan, start, end))
+        try:
+            table = pq.read_table(path)
+        except (FileNotFoundError, OSError):
+            return None
+        # Touch so the LRU eviction sees this entry as recently used
+        os.utime(path, None)
+        return table.to_pandas()
+
+    def put(self, kind: str, symbol: str, timespan: str, start, end, df: pd.DataFrame):
+        path = self.path(self.key(kind, symbol, timespan, start, end))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(pa.Table.from_pandas(df), tmp_path, compression="zstd")
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if self._approx_bytes is None:
+            self._approx_bytes = self.stats()["bytes"]
+        else:
+            self._approx_bytes += os.path.getsize(path)
+        if self._approx_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.endswith(".parquet"):
+                    continue
+                full_path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(full_path)
+                except FileNotFoundError:
+                    continue
+                yield full_path, stat.st_size, stat.st_mtime
+
+    def stats(self) -> Dict[str, Any]:
+        entries = list(self._entries())
+        return {
+            "root": self.root,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    def evict(self) -> int:
+        """Delete least recently used files until the cache fits ``max_bytes``."""
+        entries = list(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        if total <= self.max_bytes:
+            self._approx_bytes = total
+            return removed
+        for full_path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(full_path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._approx_bytes = total
+        return removed
+
+
+@functools.lru_cache(maxsize=1)
+def get_market_data_cache() -> MarketDataCache:
+    return MarketDataCache(settings.MARKET_DATA_CACHE_DIR, settings.MARKET_DATA_CACHE_MAX_BYTES)
+
+
+# -----------------------------------------------------------------------------
+#  lumibot integration
+# -----------------------------------------------------------------------------
+def _chains_to_frame(chains: Dict[str, Any]) -> pd.DataFrame:
+    rows = []
+    for right, expiries in (chains.get("Chains") or {}).items():
+        for expiry, strikes in expiries.items():
+            for strike in strikes:
+                rows.append((right, expiry, float(strike)))
+    df = pd.DataFrame(rows, columns=["right", "expiry", "strike"])
+    df["multiplier"] = chains.get("Multiplier", 100)
+    df["exchange"] = chains.get("Exchange")
+    return df
+
+
+def _frame_to_chains(df: pd.DataFrame) -> Dict[str, Any]:
+    chains: Dict[str, Dict[str, list]] = {"CALL": {}, "PUT": {}}
+    for (right, expiry), group in df.groupby(["right", "expiry"], sort=True):
+        chains.setdefault(right, {})[expiry] = sorted(group["strike"].tolist())
+    return {
+        "Multiplier": int(df["multiplier"].iloc[0]) if len(df) else 100,
+        "Exchange": df["exchange"].iloc[0] if len(df) else None,
+        "Chains": chains,
+    }
+
+
+def _cached_price_data(original, cache: MarketDataCache):
+    signature = inspect.signature(original)
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+        if arguments.get("force_cache_update"):
+            return original(*args, **kwargs)
+        asset = arguments["asset"]
+        timespan = arguments.get("timespan", "minute")
+        start, end = arguments["start"], arguments["end"]
+        df = cache.get("bars", asset_key(asset), timespan, start, end)
+        if df is not None:
+            return df
+        df = original(*args, **kwargs)
+        if df is not None and not df.empty:
+            cache.put("bars", asset_key(asset), timespan, start, end, df)
+        return df
+
+    wrapper._market_data_cache = True
+    return wrapper
+
+
+def _cached_chains(original, cache: MarketDataCache):
+    signature = inspect.signature(original)
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+        asset = arguments["asset"]
+        current_date = arguments.get("current_date")
+        df = cache.get("chains", asset_key(asset), "day", current_date, current_date)
+        if df is not None:
+            return _frame_to_chains(df)
+        chains = original(*args, **kwargs)
+        if chains and chains.get("Chains"):
+            cache.put("chains", asset_key(asset), "day", current_date, current_date, _chains_to_frame(chains))
+        return chains
+
+    wrapper._market_data_cache = True
+    return wrapper
+
+
+def install_polygon_cache(cache: Optional[MarketDataCache] = None):
+    """Route lumibot's Polygon downloads (bars, quotes, chains) through the cache.
+
+    lumibot offers no hook for its data layer, so the two download helpers on
+    ``lumibot.tools.polygon_helper`` are wrapped in place. Safe to call more
+    than once per process.
+    """
+    from lumibot.tools import polygon_helper
+
+    cache = cache or get_market_data_cache()
+    if not getattr(polygon_helper.get_price_data_from_polygon, "_market_data_cache", False):
+        polygon_helper.get_price_data_from_polygon = _cached_price_data(
+            polygon_helper.get_price_data_from_polygon, cache
+        )
+    if hasattr(polygon_helper, "get_chains_cached") and not getattr(
+        polygon_helper.get_chains_cached, "_market_data_cache", False
+    ):
+        polygon_helper.get_chains_cached = _cached_chains(polygon_helper.get_chains_cached, cache)
+
+
+# -----------------------------------------------------------------------------
+#  Prefetch command
+# -----------------------------------------------------------------------------
+def prefetch(symbol: str, start: date, end: date, timespan: str = "day", chains: bool = False):
+    from lumibot.entities import Asset
+    from lumibot.tools import polygon_helper
+
+    install_polygon_cache()
+    api_key = settings.POLYGON_API_KEY
+    underlying = Asset(symbol, Asset.AssetType.STOCK)
+    start_dt = datetime.combine(start, datetime.min.time())
+    end_dt = datetime.combine(end, datetime.min.time())
+    bars = polygon_helper.get_price_data_from_polygon(api_key, underlying, start_dt, end_dt, timespan)
+    print(f"{symbol} {timespan} bars: {0 if bars is None else len(bars)} rows")
+
+    if chains:
+        polygon_client = polygon_helper.PolygonClient.create(api_key=api_key)
+        day = start
+        while day <= end:
+            if day.weekday() < 5:
+                polygon_helper.get_chains_cached(
+                    api_key=api_key,
+                    asset=underlying,
+                    current_date=day,
+                    polygon_client=polygon_client,
+                )
+            day += timedelta(days=1)
+        print(f"{symbol} chains cached for {start} → {end}")
+    print(get_market_data_cache().stats())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Polygon market data cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    prefetch_parser = subparsers.add_parser("prefetch", help="download a window into the cache")
+    prefetch_parser.add_argument("symbol")
+    prefetch_parser.add_argument("start", type=date.fromisoformat)
+    prefetch_parser.add_argument("end", type=date.fromisoformat)
+    prefetch_parser.add_argument("--timespan", default="day")
+    prefetch_parser.add_argument("--chains", action="store_true", help="also cache daily option chains")
+
+    subparsers.add_parser("stats", help="show cache size")
+    subparsers.add_parser("evict", help="trim the cache to MARKET_DATA_CACHE_MAX_BYTES")
+
+    args = parser.parse_args(argv)
+    if args.command == "prefetch":
+        prefetch(args.symbol, args.start, args.end, args.timespan, args.chains)
+    elif args.command == "stats":
+        print(get_market_data_cache().stats())
+    elif args.command == "evict":
+        print(f"Removed {get_market_data_cache().evict()} files")
+
+
+if __name__ == "__main__":
+    main()
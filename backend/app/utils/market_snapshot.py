@@ -0,0 +1,147 @@
+"""
+Short-lived, cluster-wide snapshots of per-symbol market data.
+
+Every bot and SSE stream on an underlying reads the same price history, option
+chain and quotes, so Schwab is called once per symbol per MARKET_SNAPSHOT_TTL
+regardless of how many consumers there are. Lookups go process memory, then
+Redis; on a miss one caller takes a ``SET NX`` lock and fetches while the
+others wait for the value to land in Redis.
+
+Returned values are shared between callers: copy before mutating.
+"""
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.option_chain import OptionChainFrame
+from app.utils.trading_events import get_async_redis, get_redis
+
+PRICE_HISTORY = "pricehistory"
+CHAINS = "chains"
+QUOTES = "quotes"
+
+_POLL_SECONDS = 0.05
+
+
+def snapshot_key(kind: str, symbol: str) -> str:
+    return f"snapshot:{kind}:{symbol.upper()}"
+
+
+class _MemoryCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._frames: Dict[str, Tuple[dict, OptionChainFrame]] = {}
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                self._frames.pop(key, None)
+                return None
+            return entry[1]
+
+    def put(self, key: str, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def frame(self, key: str, chain: dict) -> OptionChainFrame:
+        """Parse a cached chain once per snapshot, not once per bot."""
+        with self._lock:
+            cached = self._frames.get(key)
+            if cached is not None and cached[0] is chain:
+                return cached[1]
+        frame = OptionChainFrame.from_schwab(chain)
+        with self._lock:
+            self._frames[key] = (chain, frame)
+        return frame
+
+
+class _SnapshotBase:
+    def __init__(self, ttl: Optional[float] = None, lock_timeout: Optional[float] = None):
+        self.ttl = ttl or settings.MARKET_SNAPSHOT_TTL
+        self.lock_timeout = lock_timeout or settings.MARKET_SNAPSHOT_LOCK_TIMEOUT
+        self.memory = _MemoryCache()
+
+    def _remember(self, key: str, raw: str):
+        value = json.loads(raw)
+        self.memory.put(key, value, self.ttl)
+        return value
+
+
+class MarketSnapshotService(_SnapshotBase):
+    """Blocking variant for Celery tasks and scheduler worker threads."""
+
+    def get(self, kind: str, symbol: str, fetch: Callable[[], Any]):
+        key = snapshot_key(kind, symbol)
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        client = get_redis()
+        raw = client.get(key)
+        if raw is not None:
+            return self._remember(key, raw)
+        lock_key = f"{key}:lock"
+        if client.set(lock_key, "1", nx=True, px=int(self.lock_timeout * 1000)):
+            try:
+                value = fetch()
+                client.set(key, json.dumps(value), px=int(self.ttl * 1000))
+                self.memory.put(key, value, self.ttl)
+                return value
+            finally:
+                client.delete(lock_key)
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(_POLL_SECONDS)
+            raw = client.get(key)
+            if raw is not None:
+                return self._remember(key, raw)
+        # The lock holder failed or is too slow; fetch ourselves rather than stall the tick
+        value = fetch()
+        self.memory.put(key, value, self.ttl)
+        return value
+
+    def option_chain_frame(self, symbol: str, fetch: Callable[[], Any]) -> OptionChainFrame:
+        return self.memory.frame(snapshot_key(CHAINS, symbol), self.get(CHAINS, symbol, fetch))
+
+
+class AsyncMarketSnapshotService(_SnapshotBase):
+    """Event-loop variant for the scheduler and SSE streams."""
+
+    async def get(self, kind: str, symbol: str, fetch: Callable[[], Awaitable[Any]]):
+        key = snapshot_key(kind, symbol)
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        client = get_async_redis()
+        raw = await client.get(key)
+        if raw is not None:
+            return self._remember(key, raw)
+        lock_key = f"{key}:lock"
+        if await client.set(lock_key, "1", nx=True, px=int(self.lock_timeout * 1000)):
+            try:
+                value = await fetch()
+                await client.set(key, json.dumps(value), px=int(self.ttl * 1000))
+                self.memory.put(key, value, self.ttl)
+                return value
+            finally:
+                await client.delete(lock_key)
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_POLL_SECONDS)
+            raw = await client.get(key)
+            if raw is not None:
+                return self._remember(key, raw)
+        value = await fetch()
+        self.memory.put(key, value, self.ttl)
+        return value
+
+
+market_snapshots = MarketSnapshotService()
+async_market_snapshots = AsyncMarketSnapshotService()
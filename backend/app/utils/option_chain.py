@@ -0,0 +1,165 @@
+"""
+Columnar view of a Schwab option chain.
+
+``SchwabMarketAPI.get_chains`` returns ``callExpDateMap`` / ``putExpDateMap``
+as {"2024-08-16:5": {"450.0": [contract, ...]}}. Walking that per leg means
+re-parsing dates and re-sorting strikes for every lookup, so the chain is
+flattened once per tick into NumPy arrays sorted by (side, expiry, strike).
+Every leg picker then works on the same arrays.
+"""
+import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+SIDES = ("CALL", "PUT")
+_EXP_DATE_MAPS = {"CALL": "callExpDateMap", "PUT": "putExpDateMap"}
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class OptionChainFrame:
+    """One row per contract; ``contracts[i]`` is the raw Schwab dict for row ``i``."""
+
+    def __init__(self, rows: List[Dict[str, Any]], today: Optional[datetime.date] = None):
+        today = today or datetime.date.today()
+        rows = sorted(rows, key=lambda row: (row["side"], row["expiry"], row["strike"]))
+        self.today = today
+        self.contracts = [row["contract"] for row in rows]
+        self.side = np.array([SIDES.index(row["side"]) for row in rows], dtype=np.int8)
+        self.expiry = np.array([row["expiry"] for row in rows], dtype="datetime64[D]")
+        self.dte = (self.expiry - np.datetime64(today, "D")).astype(np.int64)
+        self.strike = np.array([row["strike"] for row in rows], dtype=float)
+        self.symbol = np.array([row["contract"].get("symbol") for row in rows], dtype=object)
+        self.bid = np.array([_number(row["contract"].get("bid")) for row in rows], dtype=float)
+        self.ask = np.array([_number(row["contract"].get("ask")) for row in rows], dtype=float)
+        self.mark = np.array([_number(row["contract"].get("mark")) for row in rows], dtype=float)
+        self.delta = np.array([_number(row["contract"].get("delta")) for row in rows], dtype=float)
+        self.open_interest = np.array(
+            [_number(row["contract"].get("openInterest")) for row in rows], dtype=float
+        )
+        self._groups = self._build_groups()
+
+    # -------------------------------------------------------------
+    #  Construction
+    # -------------------------------------------------------------
+    @classmethod
+    def from_schwab(cls, chain: Optional[Dict[str, Any]], today: Optional[datetime.date] = None):
+        """Build from a full ``get_chains`` response."""
+        rows: List[Dict[str, Any]] = []
+        for side, key in _EXP_DATE_MAPS.items():
+            rows.extend(cls._rows(side, (chain or {}).get(key) or {}))
+        return cls(rows, today)
+
+    @classmethod
+    def from_exp_date_map(cls, contract_map: Dict[str, Any], today: Optional[datetime.date] = None):
+        """Build from a single ``callExpDateMap`` or ``putExpDateMap``."""
+        rows = []
+        for side in SIDES:
+            rows.extend(
+                row for row in cls._rows(side, contract_map) if row["contract"].get("putCall", "").upper() == side
+            )
+        return cls(rows, today)
+
+    @staticmethod
+    def _rows(side: str, contract_map: Dict[str, Any]):
+        for expiry_key, strikes in contract_map.items():
+            # Keys look like '2024-08-16:5' — date:days to expiration
+            try:
+                expiry = datetime.datetime.strptime(expiry_key.split(":")[0], "%Y-%m-%d").date()
+            except ValueError:
+                continue
+            for strike_key, contracts in strikes.items():
+                strike = float(strike_key)
+                for contract in contracts:
+                    yield {"side": side, "expiry": expiry, "strike": strike, "contract": contract}
+
+    def _build_groups(self):
+        """Row ranges for each (side, expiry) with its unique strike ladder."""
+        groups = []
+        if not len(self.strike):
+            return groups
+        boundaries = np.flatnonzero((np.diff(self.side) != 0) | (np.diff(self.expiry) != np.timedelta64(0, "D"))) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(self.strike)]))
+        for start, end in zip(starts, ends):
+            strikes, first = np.unique(self.strike[start:end], return_index=True)
+            groups.append(
+                {
+                    "side": int(self.side[start]),
+                    "dte": int(self.dte[start]),
+                    "start": int(start),
+                    "end": int(end),
+                    "strikes": strikes,
+                    "first": first + start,
+                }
+            )
+        return groups
+
+    def __len__(self):
+        return len(self.strike)
+
+    # -------------------------------------------------------------
+    #  Lookups
+    # -------------------------------------------------------------
+    @staticmethod
+    def nearest_index(strikes: np.ndarray, price: float) -> int:
+        """Index of the strike nearest ``price``; ties go to the lower strike."""
+        idx = int(np.searchsorted(strikes, price))
+        if idx == 0:
+            return 0
+        if idx == len(strikes):
+            return idx - 1
+        return idx - 1 if price - strikes[idx - 1] <= strikes[idx] - price else idx
+
+    def mask(
+        self,
+        option_type: Optional[str] = None,
+        min_dte: Optional[int] = None,
+        max_dte: Optional[int] = None,
+        min_abs_delta: Optional[float] = None,
+        max_abs_delta: Optional[float] = None,
+        min_open_interest: Optional[float] = None,
+    ) -> np.ndarray:
+        """Boolean row filter; unset bounds are ignored."""
+        mask = np.ones(len(self.strike), dtype=bool)
+        if option_type is not None:
+            mask &= self.side == SIDES.index(option_type.upper())
+        if min_dte is not None:
+            mask &= self.dte >= min_dte
+        if max_dte is not None:
+            mask &= self.dte <= max_dte
+        if min_abs_delta is not None:
+            mask &= np.abs(self.delta) >= min_abs_delta
+        if max_abs_delta is not None:
+            mask &= np.abs(self.delta) <= max_abs_delta
+        if min_open_interest is not None:
+            mask &= self.open_interest >= min_open_interest
+        return mask
+
+    def find_option(self, underlying_price, option_type, strike_offset=0, max_days=30):
+        """
+        Same selection as ``app.utils.live_trade.find_option``:
+        ATM strike + offset (in strikes) for each expiry within max_days, then the
+        cheapest mark across those expiries.
+        """
+        side = SIDES.index(option_type.upper())
+        best = None
+        for group in self._groups:
+            if group["side"] != side or group["dte"] > max_days or group["dte"] < 0:
+                continue
+            strikes = group["strikes"]
+            target_idx = self.nearest_index(strikes, underlying_price) + strike_offset
+            if target_idx < 0 or target_idx >= len(strikes):
+                continue
+            row = int(group["first"][target_idx])
+            end = row + int(np.searchsorted(self.strike[row:group["end"]], strikes[target_idx], side="right"))
+            for i in range(row, end):
+                if best is None or self.mark[i] < self.mark[best]:
+                    best = i
+        return None if best is None else self.contracts[best]
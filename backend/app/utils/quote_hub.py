@@ -0,0 +1,70 @@
+"""
+Per-process fan-out of polled market data to SSE subscribers.
+
+One poller task runs per symbol that has at least one subscriber; every poll
+result is JSON-encoded once and pushed to all subscriber queues. A subscriber
+whose queue is full is dropped (it gets ``None`` and its stream ends, so the
+browser's EventSource reconnects) rather than slowing everyone else down. The
+poller stops when the last subscriber leaves.
+"""
+import asyncio
+import contextlib
+import json
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+
+class QuoteHub:
+    def __init__(self, fetch: Callable[[str], Awaitable[dict]], interval: float = 1.0, queue_size: int = 10):
+        self.fetch = fetch
+        self.interval = interval
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, symbol: str):
+        """Yield a queue of encoded payloads (``None`` means the stream was dropped)."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(symbol, set()).add(queue)
+        if symbol not in self._pollers or self._pollers[symbol].done():
+            self._pollers[symbol] = asyncio.create_task(self._poll(symbol))
+        try:
+            yield queue
+        finally:
+            self._unsubscribe(symbol, queue)
+
+    def _unsubscribe(self, symbol: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(symbol)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            self._subscribers.pop(symbol, None)
+            poller = self._pollers.pop(symbol, None)
+            if poller is not None:
+                poller.cancel()
+
+    def _publish(self, symbol: str, message: Optional[str]):
+        for queue in list(self._subscribers.get(symbol, ())):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow consumer: make room for the sentinel and cut it loose
+                self._subscribers[symbol].discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def _poll(self, symbol: str):
+        while self._subscribers.get(symbol):
+            try:
+                payload = await self.fetch(symbol)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Quote poll for {symbol} failed: {e}")
+            else:
+                self._publish(symbol, json.dumps(payload))
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, int]:
+        return {symbol: len(subscribers) for symbol, subscribers in self._subscribers.items()}
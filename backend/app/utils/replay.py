@@ -0,0 +1,510 @@
+"""
+Vectorized replay backtester over cached daily option-chain snapshots.
+
+``FlexibleOptionStrategy.backtest`` drives lumibot's event loop and asks for
+chains, quotes and last prices one contract at a time, so a two-year daily
+run takes minutes. This engine replays a pre-loaded ``ChainHistory`` (one row
+per contract per trading day, sorted by day, right, expiry, strike) and
+applies the same ``ExecutionPlan`` as the lumibot strategy: entry weekdays,
+first-leg expiry selection, explicit-strike or delta strike picking, the
+profit/stop rules and the days-before-exit time exit. Every lookup is a
+NumPy slice or ``searchsorted`` on the day's rows, so a sweep can screen
+thousands of configurations against one loaded history.
+
+lumibot stays the high-fidelity path: here fills happen at the daily close,
+with the same flat per-order fee and no spread or slippage model.
+
+Build the history for a window once; it lands in the market data cache:
+
+    python -m app.utils.replay build SPY 2023-01-02 2024-12-31
+"""
+import argparse
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.utils import greeks
+from app.utils.execution_plan import DteType, ExecutionPlan, LegPlan, ProfitTarget
+from app.utils.market_data_cache import MarketDataCache, get_market_data_cache
+from app.utils.option_chain import SIDES
+
+# Same account and fee model as FlexibleOptionStrategy.backtest
+DEFAULT_BUDGET = 100000.0
+DEFAULT_FLAT_FEE = 0.65
+CONTRACT_MULTIPLIER = 100
+TRADING_DAYS_PER_YEAR = 252
+
+_CHAINS_KIND = "replay_chains"
+_SPOT_KIND = "replay_spot"
+
+
+def _days(values) -> np.ndarray:
+    return np.asarray(values, dtype="datetime64[D]")
+
+
+def _to_date(value: np.datetime64) -> date:
+    return value.astype("datetime64[D]").astype(date)
+
+
+class ChainHistory:
+    """Daily closes of every cached contract plus the underlying's daily closes."""
+
+    def __init__(self, symbol: str, days, spot, day, right, expiry, strike, close):
+        self.symbol = symbol.upper()
+        day_order = np.argsort(_days(days), kind="stable")
+        self.days = _days(days)[day_order]
+        self.spot = np.asarray(spot, dtype=float)[day_order]
+        day, right, expiry = _days(day), np.asarray(right, dtype=np.int8), _days(expiry)
+        strike = np.asarray(strike, dtype=float)
+        order = np.lexsort((strike, expiry, right, day))
+        self.day = day[order]
+        self.right = right[order]
+        self.expiry = expiry[order]
+        self.strike = strike[order]
+        self.close = np.asarray(close, dtype=float)[order]
+        # Row range of each trading day in the contract arrays
+        self.day_start = np.searchsorted(self.day, self.days, side="left")
+        self.day_end = np.searchsorted(self.day, self.days, side="right")
+
+    def __len__(self):
+        return len(self.strike)
+
+    @property
+    def max_dte(self) -> int:
+        """Furthest expiry the history covers, in days from the snapshot day."""
+        if not len(self.strike):
+            return 0
+        return int((self.expiry - self.day).astype(np.int64).max())
+
+    def snapshot(self, index: int) -> "ChainSnapshot":
+        rows = slice(int(self.day_start[index]), int(self.day_end[index]))
+        return ChainSnapshot(
+            self.days[index],
+            float(self.spot[index]),
+            self.right[rows],
+            self.expiry[rows],
+            self.strike[rows],
+            self.close[rows],
+        )
+
+    # -------------------------------------------------------------
+    #  Persistence (market data cache)
+    # -------------------------------------------------------------
+    @classmethod
+    def from_frames(cls, symbol: str, chains: pd.DataFrame, spot: pd.DataFrame) -> "ChainHistory":
+        """``chains``: date, right ("CALL"/"PUT"), expiry, strike, close; ``spot``: date, close."""
+        right = np.fromiter((SIDES.index(str(value).upper()) for value in chains["right"]), dtype=np.int8, count=len(chains))
+        return cls(
+            symbol,
+            spot["date"].to_numpy(dtype="datetime64[D]"),
+            spot["close"].to_numpy(dtype=float),
+            chains["date"].to_numpy(dtype="datetime64[D]"),
+            right,
+            chains["expiry"].to_numpy(dtype="datetime64[D]"),
+            chains["strike"].to_numpy(dtype=float),
+            chains["close"].to_numpy(dtype=float),
+        )
+
+    def to_frames(self):
+        chains = pd.DataFrame(
+            {
+                "date": self.day,
+                "right": np.asarray(SIDES, dtype=object)[self.right],
+                "expiry": self.expiry,
+                "strike": self.strike,
+                "close": self.close,
+            }
+        )
+        return chains, pd.DataFrame({"date": self.days, "close": self.spot})
+
+    @classmethod
+    def load(cls, symbol: str, start: date, end: date, cache: Optional[MarketDataCache] = None) -> Optional["ChainHistory"]:
+        cache = cache or get_market_data_cache()
+        chains = cache.get(_CHAINS_KIND, symbol.upper(), "day", start, end)
+        spot = cache.get(_SPOT_KIND, symbol.upper(), "day", start, end)
+        if chains is None or spot is None:
+            return None
+        return cls.from_frames(symbol, chains, spot)
+
+    def save(self, start: date, end: date, cache: Optional[MarketDataCache] = None):
+        cache = cache or get_market_data_cache()
+        chains, spot = self.to_frames()
+        cache.put(_CHAINS_KIND, self.symbol, "day", start, end, chains)
+        cache.put(_SPOT_KIND, self.symbol, "day", start, end, spot)
+
+
+@dataclass(frozen=True, slots=True)
+class ChainSnapshot:
+    """One trading day of a ``ChainHistory``; the arrays are views, not copies."""
+
+    day: np.datetime64
+    spot: float
+    right: np.ndarray
+    expiry: np.ndarray
+    strike: np.ndarray
+    close: np.ndarray
+
+    def _rows(self, side: int, expiry: Optional[np.datetime64] = None):
+        lo = int(np.searchsorted(self.right, side, side="left"))
+        hi = int(np.searchsorted(self.right, side, side="right"))
+        if expiry is None:
+            return lo, hi
+        expiries = self.expiry[lo:hi]
+        return lo + int(np.searchsorted(expiries, expiry, side="left")), lo + int(np.searchsorted(expiries, expiry, side="right"))
+
+    def expiries(self, side: int) -> np.ndarray:
+        lo, hi = self._rows(side)
+        return np.unique(self.expiry[lo:hi])
+
+    def ladder(self, side: int, expiry: np.datetime64):
+        """(strikes, closes) for one expiry, sorted by strike."""
+        lo, hi = self._rows(side, expiry)
+        return self.strike[lo:hi], self.close[lo:hi]
+
+    def price(self, side: int, expiry: np.datetime64, strike: float) -> Optional[float]:
+        strikes, closes = self.ladder(side, expiry)
+        idx = int(np.searchsorted(strikes, strike))
+        if idx < len(strikes) and strikes[idx] == strike and np.isfinite(closes[idx]):
+            return float(closes[idx])
+        return None
+
+
+# -----------------------------------------------------------------------------
+#  Replay
+# -----------------------------------------------------------------------------
+@dataclass(slots=True)
+class _Position:
+    side: int
+    expiry: np.datetime64
+    strike: float
+    quantity: int  # signed: > 0 long, < 0 short
+    entry_price: float
+    last_price: float
+
+
+def _select_expiry(snapshot: ChainSnapshot, leg: LegPlan) -> Optional[np.datetime64]:
+    """``FlexibleOptionStrategy._select_expiration`` over the day's expiries."""
+    expiries = snapshot.expiries(SIDES.index(leg.right_key))
+    if not len(expiries):
+        return None
+    dte = (expiries - snapshot.day).astype(np.int64)
+    if leg.dte_type is DteType.EXACT:
+        hits = expiries[dte == leg.dte_value]
+        return hits[0] if len(hits) else None
+    in_window = (dte >= leg.dte_min) & (dte <= leg.dte_max)
+    if not in_window.any():
+        return None
+    return expiries[in_window][np.argmin(np.abs(dte[in_window] - leg.dte_value))]
+
+
+def _select_strike(snapshot: ChainSnapshot, leg: LegPlan, expiry: np.datetime64, rate: float) -> Optional[float]:
+    """``FlexibleOptionStrategy._build_leg_asset``: explicit strike, else closest delta."""
+    side = SIDES.index(leg.right_key)
+    strikes, closes = snapshot.ladder(side, expiry)
+    if not len(strikes):
+        return None
+    if leg.strike_price is not None:
+        return float(strikes[np.argmin(np.abs(strikes - leg.strike_price))])
+    # Each strike's delta at its own IV, backed out of its close in one batched
+    # solve; strikes without a usable close get NaN and are never selected
+    t = max(int((expiry - snapshot.day).astype(np.int64)), 1) / 365.0
+    is_call = leg.right_key == "CALL"
+    sigmas = greeks.implied_vol(closes, snapshot.spot, strikes, t, rate, is_call)
+    if not np.isfinite(sigmas).any():
+        return None
+    deltas = greeks.greeks(snapshot.spot, strikes, t, rate, sigmas, is_call)["delta"]
+    idx = greeks.select_by_delta(deltas, leg.target_delta, leg.min_delta, leg.max_delta)
+    return None if idx is None else float(strikes[idx])
+
+
+def _pnl(positions: List[_Position]):
+    """Dollar and percent profit of the open legs, as ``_calculate_pnl`` computes them."""
+    entry_value = sum(abs(p.quantity) * p.entry_price * CONTRACT_MULTIPLIER for p in positions)
+    profit = sum(p.quantity * (p.last_price - p.entry_price) * CONTRACT_MULTIPLIER for p in positions)
+    return profit, (profit / entry_value if entry_value else None)
+
+
+def _fixed_closing_hit(positions: List[_Position], target_price: float) -> bool:
+    longs_ok = all(p.last_price >= target_price for p in positions if p.quantity > 0)
+    shorts_ok = all(p.last_price <= target_price for p in positions if p.quantity < 0)
+    return longs_ok and shorts_ok
+
+
+class ReplayBacktest:
+    def __init__(
+        self,
+        strategy_parameters: Dict[str, Any],
+        history: ChainHistory,
+        budget: float = DEFAULT_BUDGET,
+        flat_fee: float = DEFAULT_FLAT_FEE,
+        rate: float = 0.0,
+    ):
+        self.plan = ExecutionPlan.from_parameters(strategy_parameters)
+        if self.plan.symbol.upper() != history.symbol:
+            raise ValueError(f"history is for {history.symbol}, the plan trades {self.plan.symbol}")
+        needed_dte = max((leg.dte_max for leg in self.plan.legs), default=0)
+        if needed_dte > history.max_dte:
+            raise ValueError(f"history covers expiries up to {history.max_dte} days out, the plan needs {needed_dte}")
+        self.history = history
+        self.budget = budget
+        self.flat_fee = flat_fee
+        self.rate = rate
+        self.cash = budget
+        self.positions: List[_Position] = []
+        self.trades: List[Dict[str, Any]] = []
+
+    def _fill(self, snapshot: ChainSnapshot, position: _Position, price: float, opening: bool, reason: str):
+        # Opening a long or closing a short buys; everything else sells
+        buying = (position.quantity > 0) == opening
+        quantity = abs(position.quantity)
+        self.cash += (-1 if buying else 1) * quantity * price * CONTRACT_MULTIPLIER - self.flat_fee
+        if opening:
+            side = "buy" if buying else "sell_to_open"
+        else:
+            side = "buy_to_close" if buying else "sell"
+        self.trades.append(
+            {
+                "time": _to_date(snapshot.day).isoformat(),
+                "symbol": self.history.symbol,
+                "right": SIDES[position.side],
+                "expiration": _to_date(position.expiry).isoformat(),
+                "strike": position.strike,
+                "side": side,
+                "quantity": quantity,
+                "price": price,
+                "trade_cost": self.flat_fee,
+                "reason": reason,
+            }
+        )
+
+    def _close_all(self, snapshot: ChainSnapshot, reason: str):
+        for position in self.positions:
+            self._fill(snapshot, position, position.last_price, False, reason)
+        self.positions = []
+
+    def _manage(self, snapshot: ChainSnapshot):
+        for position in self.positions:
+            price = snapshot.price(position.side, position.expiry, position.strike)
+            if price is not None:
+                position.last_price = price
+        exit_plan = self.plan.exit
+        profit, profit_pct = _pnl(self.positions)
+        if exit_plan.profit_rule is not None:
+            hit = exit_plan.profit_rule(profit, profit_pct)
+        elif exit_plan.profit_target is ProfitTarget.FIXED_CLOSING:
+            hit = _fixed_closing_hit(self.positions, exit_plan.profit_target_value)
+        else:
+            hit = False
+        if hit:
+            self._close_all(snapshot, "profit_target")
+        elif exit_plan.stop_rule is not None and exit_plan.stop_rule(profit, profit_pct):
+            self._close_all(snapshot, "stop")
+        elif min(int((p.expiry - snapshot.day).astype(np.int64)) for p in self.positions) <= exit_plan.days_before_exit:
+            self._close_all(snapshot, "time_exit")
+
+    def _enter(self, snapshot: ChainSnapshot):
+        plan = self.plan
+        if not plan.legs or not plan.entry.allows(_to_date(snapshot.day)):
+            return
+        investable_cash = self.cash * plan.investment_pct
+        if investable_cash < 50:
+            return
+        expiry = _select_expiry(snapshot, plan.legs[0])
+        if expiry is None:
+            return
+        cash_per_ratio_unit = investable_cash / sum(leg.size_ratio for leg in plan.legs)
+        legs = []
+        for leg in plan.legs:
+            strike = _select_strike(snapshot, leg, expiry, self.rate)
+            if strike is None:
+                return
+            side = SIDES.index(leg.right_key)
+            price = snapshot.price(side, expiry, strike)
+            if price is None or price <= 0:
+                return
+            quantity = int((cash_per_ratio_unit * leg.size_ratio) // (price * CONTRACT_MULTIPLIER))
+            if quantity <= 0:
+                return
+            legs.append(_Position(side, expiry, strike, quantity if leg.is_long else -quantity, price, price))
+        for position in legs:
+            self._fill(snapshot, position, position.entry_price, True, "entry")
+        self.positions = legs
+
+    def run(self, start_date: date, end_date: date) -> Dict[str, Any]:
+        history = self.history
+        first = int(np.searchsorted(history.days, np.datetime64(start_date, "D"), side="left"))
+        last = int(np.searchsorted(history.days, np.datetime64(end_date, "D"), side="right"))
+        dates, equity, cash = [], [], []
+        for index in range(first, last):
+            snapshot = history.snapshot(index)
+            if not np.isfinite(snapshot.spot):
+                continue
+            if self.positions:
+                self._manage(snapshot)
+            else:
+                self._enter(snapshot)
+            value = self.cash + sum(p.quantity * p.last_price * CONTRACT_MULTIPLIER for p in self.positions)
+            dates.append(snapshot.day)
+            equity.append(value)
+            cash.append(self.cash)
+        results = performance_metrics(_days(dates), np.asarray(equity, dtype=float))
+        results["engine"] = "replay"
+        results["trades"] = self.trades
+        results["equity"] = [
+            {"time": _to_date(day).isoformat(), "portfolio_value": value, "cash": balance}
+            for day, value, balance in zip(dates, equity, cash)
+        ]
+        return results
+
+
+def performance_metrics(dates: np.ndarray, equity: np.ndarray) -> Dict[str, Any]:
+    """The summary keys lumibot reports, computed from a daily equity curve."""
+    if len(equity) < 2 or equity[0] <= 0:
+        return {"total_return": 0.0, "cagr": 0.0, "volatility": 0.0, "sharpe": 0.0, "max_drawdown": {"drawdown": 0.0, "date": None}, "romad": 0.0}
+    returns = np.diff(equity) / equity[:-1]
+    total_return = float(equity[-1] / equity[0] - 1.0)
+    years = max(int((dates[-1] - dates[0]).astype(np.int64)), 1) / 365.25
+    growth = equity[-1] / equity[0]
+    cagr = float(growth ** (1.0 / years) - 1.0) if growth > 0 else -1.0
+    std = float(np.std(returns, ddof=1)) if len(returns) > 1 else 0.0
+    volatility = std * math.sqrt(TRADING_DAYS_PER_YEAR)
+    sharpe = float(np.mean(returns)) / std * math.sqrt(TRADING_DAYS_PER_YEAR) if std > 0 else 0.0
+    drawdowns = 1.0 - equity / np.maximum.accumulate(equity)
+    worst = int(np.argmax(drawdowns))
+    max_drawdown = float(drawdowns[worst])
+    return {
+        "total_return": total_return,
+        "cagr": cagr,
+        "volatility": volatility,
+        "sharpe": sharpe,
+        "max_drawdown": {"drawdown": max_drawdown, "date": _to_date(dates[worst]).isoformat()},
+        "romad": cagr / max_drawdown if max_drawdown > 0 else 0.0,
+    }
+
+
+def replay_backtest(strategy_parameters: Dict[str, Any], history: ChainHistory, start_date: date, end_date: date, **kwargs) -> Dict[str, Any]:
+    return ReplayBacktest(strategy_parameters, history, **kwargs).run(start_date, end_date)
+
+
+# -----------------------------------------------------------------------------
+#  Building the history from Polygon (through the market data cache)
+# -----------------------------------------------------------------------------
+def _bar_days(df: pd.DataFrame) -> np.ndarray:
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("America/New_York").tz_localize(None)
+    return index.normalize().to_numpy(dtype="datetime64[D]")
+
+
+def build_chain_history(
+    symbol: str,
+    start: date,
+    end: date,
+    max_dte: Optional[int] = None,
+    strike_band: Optional[float] = None,
+) -> ChainHistory:
+    """Download (or read from the cache) daily bars for every listed contract
+    within ``max_dte`` days and ``strike_band`` of spot, one request per contract."""
+    from lumibot.entities import Asset
+    from lumibot.tools import polygon_helper
+    from app.utils.market_data_cache import install_polygon_cache
+
+    install_polygon_cache()
+    max_dte = settings.REPLAY_MAX_DTE if max_dte is None else max_dte
+    strike_band = settings.REPLAY_STRIKE_BAND if strike_band is None else strike_band
+    api_key = settings.POLYGON_API_KEY
+    underlying = Asset(symbol, Asset.AssetType.STOCK)
+    start_dt = datetime.combine(start, datetime.min.time())
+    end_dt = datetime.combine(end + timedelta(days=1), datetime.min.time())
+
+    bars = polygon_helper.get_price_data_from_polygon(api_key, underlying, start_dt, end_dt, "day")
+    if bars is None or bars.empty:
+        raise ValueError(f"No {symbol} daily bars between {start} and {end}")
+    spot_days, spot_close = _bar_days(bars), bars["close"].to_numpy(dtype=float)
+
+    # First snapshot day on which each contract is worth tracking
+    first_seen: Dict[tuple, np.datetime64] = {}
+    polygon_client = polygon_helper.PolygonClient.create(api_key=api_key)
+    for day, spot in zip(spot_days, spot_close):
+        chains = polygon_helper.get_chains_cached(
+            api_key=api_key, asset=underlying, current_date=_to_date(day), polygon_client=polygon_client
+        )
+        for right, expiries in ((chains or {}).get("Chains") or {}).items():
+            for expiry_str, strikes in expiries.items():
+                expiry = np.datetime64(expiry_str, "D")
+                if not 0 <= int((expiry - day).astype(np.int64)) <= max_dte:
+                    continue
+                ladder = np.asarray(strikes, dtype=float)
+                for strike in ladder[np.abs(ladder / spot - 1.0) <= strike_band]:
+                    first_seen.setdefault((right.upper(), expiry, float(strike)), day)
+
+    frames = []
+    for (right, expiry, strike), first_day in first_seen.items():
+        contract = Asset(
+            symbol=symbol,
+            asset_type=Asset.AssetType.OPTION,
+            expiration=_to_date(expiry),
+            strike=strike,
+            right=Asset.OptionRight.CALL if right == "CALL" else Asset.OptionRight.PUT,
+            underlying_asset=underlying,
+        )
+        last_day = min(expiry, np.datetime64(end, "D"))
+        contract_bars = polygon_helper.get_price_data_from_polygon(
+            api_key,
+            contract,
+            datetime.combine(_to_date(first_day), datetime.min.time()),
+            datetime.combine(_to_date(last_day) + timedelta(days=1), datetime.min.time()),
+            "day",
+        )
+        if contract_bars is None or contract_bars.empty:
+            continue
+        days = _bar_days(contract_bars)
+        keep = (days >= first_day) & (days <= last_day)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "date": days[keep],
+                    "right": right,
+                    "expiry": expiry,
+                    "strike": strike,
+                    "close": contract_bars["close"].to_numpy(dtype=float)[keep],
+                }
+            )
+        )
+    chains = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["date", "right", "expiry", "strike", "close"])
+    return ChainHistory.from_frames(symbol, chains, pd.DataFrame({"date": spot_days, "close": spot_close}))
+
+
+def get_chain_history(symbol: str, start: date, end: date) -> ChainHistory:
+    """Cached history for the window, building and storing it on a miss."""
+    history = ChainHistory.load(symbol, start, end)
+    if history is None:
+        history = build_chain_history(symbol, start, end)
+        history.save(start, end)
+    return history
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay backtester chain history")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="download a window's chain history into the cache")
+    build_parser.add_argument("symbol")
+    build_parser.add_argument("start", type=date.fromisoformat)
+    build_parser.add_argument("end", type=date.fromisoformat)
+    build_parser.add_argument("--max-dte", type=int, default=None)
+    build_parser.add_argument("--strike-band", type=float, default=None, help="fraction of spot, e.g. 0.2")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        history = build_chain_history(args.symbol, args.start, args.end, args.max_dte, args.strike_band)
+        history.save(args.start, args.end)
+        print(f"{history.symbol}: {len(history.days)} days, {len(history)} contract rows, expiries up to {history.max_dte} DTE")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Transport shared by the Schwab REST clients.
+
+One connection-pooled ``requests.Session`` per process (keep-alive, no TLS
+handshake per call), jittered exponential backoff that honours Retry-After,
+and per-endpoint latency metrics exposed at ``GET /schwab/metrics``.
+The async clients get the same from one ``httpx.AsyncClient`` per event loop,
+with a semaphore capping concurrent upstream calls.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Orders must not be placed twice: POST/PUT are only retried when Schwab
+# cannot have acted on them (rate-limited, or the connection never opened)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "DELETE"})
+
+
+def should_retry(method: str, status_code: Optional[int] = None, connect_failed: bool = False) -> bool:
+    if connect_failed or status_code == 429:
+        return True
+    return method.upper() in IDEMPOTENT_METHODS and (status_code is None or status_code in RETRY_STATUSES)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff; a server-supplied Retry-After wins."""
+    cap = settings.SCHWAB_HTTP_BACKOFF_MAX
+    if retry_after is not None:
+        return min(retry_after, cap)
+    return random.uniform(0, min(cap, settings.SCHWAB_HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+
+def request_timeout():
+    return (settings.SCHWAB_HTTP_CONNECT_TIMEOUT, settings.SCHWAB_HTTP_READ_TIMEOUT)
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Process-wide pooled session; built lazily so forked workers get their own."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=settings.SCHWAB_HTTP_POOL_SIZE,
+                    pool_maxsize=settings.SCHWAB_HTTP_POOL_SIZE,
+                    max_retries=0,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+_async_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_async_semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Pooled AsyncClient for the running loop (clients cannot cross event loops)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.SCHWAB_HTTP_READ_TIMEOUT, connect=settings.SCHWAB_HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.SCHWAB_HTTP_POOL_SIZE,
+                max_keepalive_connections=settings.SCHWAB_HTTP_POOL_SIZE,
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def get_async_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _async_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.SCHWAB_HTTP_MAX_CONCURRENCY)
+        _async_semaphores[loop] = semaphore
+    return semaphore
+
+
+async def close_async_http_client():
+    loop = asyncio.get_running_loop()
+    _async_semaphores.pop(loop, None)
+    client = _async_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def encode_params(params: Optional[dict]) -> Optional[dict]:
+    """Render query values the way requests does (str()), which httpx would reject or lower-case."""
+    if params is None:
+        return None
+    encoded = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        plain = isinstance(value, (str, int, float)) and not isinstance(value, bool)
+        encoded[key] = value if plain else str(value)
+    return encoded
+
+
+# -----------------------------------------------------------------------------
+#  Latency metrics
+# -----------------------------------------------------------------------------
+class EndpointLatency:
+    def __init__(self, window: int = 500):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = deque(maxlen=window)
+
+    def record(self, elapsed_ms: float, ok: bool, retries: int):
+        self.count += 1
+        self.errors += 0 if ok else 1
+        self.retries += retries
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.samples.append(elapsed_ms)
+
+    def snapshot(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+
+        def pct(p):
+            return round(ordered[min(int(p * len(ordered)), len(ordered) - 1)], 2) if ordered else None
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": pct(0.5),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class LatencyMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointLatency] = {}
+
+    def record(self, endpoint: str, elapsed_ms: float, ok: bool, retries: int = 0):
+        with self._lock:
+            self._endpoints.setdefault(endpoint, EndpointLatency()).record(elapsed_ms, ok, retries)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {endpoint: stats.snapshot() for endpoint, stats in sorted(self._endpoints.items())}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+schwab_metrics = LatencyMetrics()
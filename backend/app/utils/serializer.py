@@ -0,0 +1,128 @@
+"""
+JSON encoding for backtest results and other numeric payloads.
+
+Built on orjson, which encodes datetimes, numpy scalars and plain numeric
+numpy arrays natively.  Anything it does not know goes through
+``_default``, which converts pandas objects a column at a time: datetime
+columns become ISO strings in one ``np.datetime_as_string`` call and numeric
+columns go through ``tolist()``.  This avoids a Python-level isinstance walk
+over every cell.
+
+NaN and infinity encode as ``null`` (PostgreSQL's JSON type rejects the bare
+``NaN`` token that ``json.dumps`` writes).  pandas is never imported here.  A
+value can only be a pandas object if the caller already imported pandas, so
+the API process can use this module without loading it.
+"""
+import datetime
+import decimal
+import sys
+from typing import Any, List
+
+import numpy as np
+import orjson
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _datetime_strings(values: np.ndarray, tz: bool) -> List[Any]:
+    """ISO strings for a datetime64 array (UTC with ``Z`` when ``tz``); NaT -> None."""
+    values = values.astype("datetime64[us]")
+    mask = np.isnat(values)
+    ticks = values.view("int64")
+    unit = "s" if not (ticks[~mask] % 1_000_000).any() else "us"
+    strings = np.datetime_as_string(values, unit=unit, timezone="UTC" if tz else "naive").astype(object)
+    if mask.any():
+        strings[mask] = None
+    return strings.tolist()
+
+
+def _array(values: np.ndarray) -> List[Any]:
+    if values.dtype.kind == "M":
+        return _datetime_strings(values, tz=False)
+    if values.dtype.kind == "m":
+        seconds = values / np.timedelta64(1, "s")
+        return [None if np.isnan(s) else s for s in seconds.tolist()]
+    # Numeric arrays come back as Python scalars (NaN is left for orjson to
+    # write as null); object arrays are walked by orjson with ``_default``
+    return values.tolist()
+
+
+def _column(series) -> List[Any]:
+    """One pandas Series / Index as a list of JSON-native values."""
+    dtype = series.dtype
+    if getattr(dtype, "tz", None) is not None:
+        # DatetimeTZDtype stores UTC ticks; asi8 exposes them without per-cell Timestamps
+        values = series.array
+        return _datetime_strings(values.asi8.view(f"datetime64[{values.unit}]"), tz=True)
+    if dtype.kind in "Mm":
+        return _array(np.asarray(series))
+    if dtype.kind in "biuf":
+        return np.asarray(series).tolist()
+    # Extension and object dtypes: let orjson handle the scalars it knows
+    return series.astype(object).tolist()
+
+
+def _has_default_index(obj) -> bool:
+    pd = sys.modules["pandas"]
+    index = obj.index
+    return isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1 and index.name is None
+
+
+def _frame(df) -> List[dict]:
+    """DataFrame -> row dicts; a meaningful index (e.g. timestamps) becomes a column."""
+    if not _has_default_index(df):
+        df = df.reset_index()
+    names = [str(name) for name in df.columns]
+    columns = [_column(df.iloc[:, i]) for i in range(df.shape[1])]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def _series(series):
+    """Series -> list, or ``{index: value}`` when the index carries information."""
+    values = _column(series)
+    if _has_default_index(series):
+        return values
+    return dict(zip((str(key) for key in _column(series.index)), values))
+
+
+def _default(obj):
+    pd = sys.modules.get("pandas")
+    if pd is not None:
+        if isinstance(obj, pd.DataFrame):
+            return _frame(obj)
+        if isinstance(obj, pd.Series):
+            return _series(obj)
+        if isinstance(obj, pd.Index):
+            return _column(obj)
+        if obj is pd.NaT:
+            return None
+        if isinstance(obj, pd.Timestamp):
+            return obj.isoformat()
+        if isinstance(obj, pd.Timedelta):
+            return obj.total_seconds()
+    if isinstance(obj, np.ndarray):
+        return _array(obj) if obj.dtype.kind in "Mm" else obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """UTF-8 JSON for ``obj``."""
+    return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+
+def dumps_str(obj: Any) -> str:
+    """``dumps`` as ``str``, for SQLAlchemy's ``json_serializer``."""
+    return orjson.dumps(obj, default=_default, option=_OPTIONS).decode()
+
+
+def to_jsonable(obj: Any) -> Any:
+    """``obj`` as plain dicts/lists/str/float/int/bool/None, ready for a JSON column."""
+    return orjson.loads(orjson.dumps(obj, default=_default, option=_OPTIONS))
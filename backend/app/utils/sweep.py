@@ -0,0 +1,90 @@
+"""
+Parameter-sweep bookkeeping: grid expansion, per-point summaries and ranking.
+
+Kept free of the lumibot stack so the API can validate sweep requests and the
+Celery task module can fan out grid points without importing it.
+"""
+import copy
+import itertools
+import math
+from typing import Any, Dict, List, Optional
+
+# Grid keys that can be swept and whether they live on every leg or on the
+# top-level parameter dict.
+SWEEP_LEG_KEYS = {"target_delta", "dte_value"}
+SWEEP_TOP_LEVEL_KEYS = {"profit_target_value", "days_before_exit"}
+SWEEP_KEYS = SWEEP_LEG_KEYS | SWEEP_TOP_LEVEL_KEYS
+SWEEP_METRICS = ("total_return", "cagr", "sharpe", "romad", "volatility", "max_drawdown")
+SWEEP_RISK_METRICS = {"volatility", "max_drawdown"}
+
+
+def grid_size(grid: Dict[str, List[Any]]) -> int:
+    """Number of points ``expand_grid`` yields for ``grid``, without building them."""
+    return math.prod(len(values) for values in grid.values() if values)
+
+
+def expand_grid(strategy_parameters: Dict[str, Any], grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Return one ``{"overrides": ..., "parameters": ...}`` entry per grid point."""
+    keys = [k for k in grid.keys() if grid[k]]
+    points = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        overrides = dict(zip(keys, values))
+        params = copy.deepcopy(strategy_parameters)
+        for key, value in overrides.items():
+            if key in SWEEP_LEG_KEYS:
+                for leg in params.get("legs", []):
+                    leg[key] = value
+            else:
+                params[key] = value
+        points.append({"overrides": overrides, "parameters": params})
+    return points
+
+
+def summarize_results(results: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    summary = {}
+    if not results:
+        return summary
+    for key in SWEEP_METRICS:
+        value = results.get(key)
+        if isinstance(value, dict):  # lumibot reports max_drawdown as {"drawdown": .., "date": ..}
+            value = value.get("drawdown")
+        try:
+            summary[key] = float(value) if value is not None else None
+        except (TypeError, ValueError):
+            summary[key] = None
+    return summary
+
+
+def sweep_row(point: Dict[str, Any], run) -> Dict[str, Any]:
+    row = {"overrides": point["overrides"], "metrics": {}, "error": None}
+    try:
+        row["metrics"] = run()
+    except Exception as exc:
+        row["error"] = str(exc)
+    return row
+
+
+def rank_sweep(rows: List[Dict[str, Any]], rank_by: str = "total_return") -> List[Dict[str, Any]]:
+    """Sort best-first on ``rank_by``; failed or metric-less rows go last."""
+    def sort_key(row):
+        value = row.get("metrics", {}).get(rank_by)
+        if value is None:
+            return (1, 0.0)
+        # Lower is better for risk metrics, higher for everything else
+        return (0, value if rank_by in SWEEP_RISK_METRICS else -value)
+
+    ranked = sorted(rows, key=sort_key)
+    for rank, row in enumerate(ranked, start=1):
+        row["rank"] = rank
+    return ranked
+
+
+def sweep_result(strategy_parameters: Dict[str, Any], grid: Dict[str, List[Any]], rows: List[Dict[str, Any]], rank_by: str = "total_return") -> Dict[str, Any]:
+    """The stored result of a finished sweep."""
+    return {
+        "type": "sweep",
+        "rank_by": rank_by,
+        "base_parameters": strategy_parameters,
+        "grid": grid,
+        "results": rank_sweep(rows, rank_by),
+    }
@@ -0,0 +1,82 @@
+"""
+Per-trading-task event stream in Redis.
+
+The trading task appends structured events (tick, signal, legs, order, state)
+to ``trading:{trading_task_id}:events`` with XADD, capped at
+TRADING_EVENTS_MAXLEN entries and expired TRADING_EVENTS_TTL seconds after the
+last write. SSE clients read with a blocking XREAD, so events are pushed as
+soon as they are written, and a reconnecting client resumes from its
+Last-Event-ID instead of missing what happened in between.
+"""
+import functools
+import json
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+# Event types; ``state`` is always the last event of a run
+TICK = "tick"
+SIGNAL = "signal"
+LEGS = "legs"
+ORDER = "order"
+STATE = "state"
+
+
+def stream_key(trading_task_id) -> str:
+    return f"trading:{trading_task_id}:events"
+
+
+@functools.lru_cache(maxsize=1)
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+_async_redis: Optional[aioredis.Redis] = None
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Shared asyncio client; each blocking XREAD holds one pooled connection."""
+    global _async_redis
+    if _async_redis is None:
+        _async_redis = aioredis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_redis
+
+
+def publish_event(trading_task_id, event_type: str, data: Dict[str, Any]) -> str:
+    key = stream_key(trading_task_id)
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.xadd(
+        key,
+        {"type": event_type, "data": json.dumps(data, default=str)},
+        maxlen=settings.TRADING_EVENTS_MAXLEN,
+        approximate=True,
+    )
+    pipe.expire(key, settings.TRADING_EVENTS_TTL)
+    event_id, _ = pipe.execute()
+    return event_id
+
+
+async def read_events(
+    client: aioredis.Redis, trading_task_id, last_id: str = "0-0", block_ms: int = 15000
+) -> AsyncIterator[Optional[Tuple[str, str, str]]]:
+    """Yield ``(event_id, type, data)`` after ``last_id``; ``None`` when a block times out."""
+    async for event in read_stream(client, stream_key(trading_task_id), last_id, block_ms):
+        yield event
+
+
+async def read_stream(
+    client: aioredis.Redis, key: str, last_id: str = "0-0", block_ms: int = 15000
+) -> AsyncIterator[Optional[Tuple[str, str, str]]]:
+    """``read_events`` for any ``{"type", "data"}`` stream, e.g. backtest progress."""
+    while True:
+        response = await client.xread({key: last_id}, count=100, block=block_ms)
+        if not response:
+            yield None
+            continue
+        for _, entries in response:
+            for event_id, fields in entries:
+                last_id = event_id
+                yield event_id, fields.get("type", ""), fields.get("data", "{}")
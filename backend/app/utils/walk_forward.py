@@ -0,0 +1,144 @@
+"""
+Segmented (walk-forward) backtests: split one window across workers and stitch.
+
+A lumibot run is a single sequential event loop, so a five-year backtest
+keeps one core busy for the whole run.  A segmented run does this instead:
+
+- Cut the window into consecutive segments, each simulated by its own task.
+- Start every segment after the first ``warmup_days`` early, so by its first
+  day it holds the same kind of positions a continuous run would.  A warm-up
+  longer than the longest leg DTE makes that the normal case.
+- Drop the warm-up fills.
+- Chain the equity curves multiplicatively.  Every segment starts from the
+  same budget and sizes entries as ``investment_pct`` of its cash, so its
+  curve is rescaled by (stitched value at the boundary) / (its own value at
+  the boundary).  Cash is scaled by the same factor.  A position open across
+  a boundary is marked to market by one segment up to the boundary and by the
+  next one after it.
+
+The result approximates a continuous run; it is not exact.  Contract counts
+are whole numbers computed from each segment's own capital.  Rescaling
+therefore differs from a continuous run by the rounding, and a segment whose
+capital is too small to buy one contract may trade where the continuous run
+would not.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.utils.execution_plan import ExecutionPlan
+
+# lumibot reports fills and portfolio values in exchange time
+MARKET_TZ = ZoneInfo("America/New_York")
+# Slack on top of the longest leg DTE for entries that wait on the entry weekdays
+WARMUP_BUFFER_DAYS = 7
+
+
+def default_warmup_days(strategy_parameters: Dict[str, Any]) -> int:
+    """Long enough for every position open at a boundary to have been opened inside the warm-up."""
+    plan = ExecutionPlan.from_parameters(strategy_parameters)
+    return max((leg.dte_max for leg in plan.legs), default=0) + WARMUP_BUFFER_DAYS
+
+
+def split_window(start: datetime, end: datetime, segments: int, warmup_days: int) -> List[Dict[str, str]]:
+    """``segments`` consecutive ``{"warmup_start", "start", "end"}`` windows (ISO) covering start..end.
+
+    Warm-ups never reach before ``start``: the continuous run they stand in for
+    had no history before it either.
+    """
+    total = max((end - start).days, 1)
+    segments = max(1, min(segments, total))
+    bounds = [start + timedelta(days=round(total * i / segments)) for i in range(segments)] + [end]
+    return [
+        {
+            "warmup_start": max(start, bounds[i] - timedelta(days=warmup_days)).isoformat(),
+            "start": bounds[i].isoformat(),
+            "end": bounds[i + 1].isoformat(),
+        }
+        for i in range(segments)
+    ]
+
+
+def _wall_time(value) -> Optional[datetime]:
+    """Naive exchange-local time of an ISO string or datetime (aware values are converted)."""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is not None:
+        value = value.astimezone(MARKET_TZ).replace(tzinfo=None)
+    return value
+
+
+def _stitch_equity(windows: List[Dict[str, str]], segment_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    stitched = []
+    for i, (window, result) in enumerate(zip(windows, segment_results)):
+        start, end = datetime.fromisoformat(window["start"]), datetime.fromisoformat(window["end"])
+        points = sorted(
+            ((_wall_time(point["time"]), point) for point in result.get("equity") or [] if point.get("portfolio_value") is not None),
+            key=lambda item: item[0],
+        )
+        if not points:
+            continue
+        scale = 1.0
+        if i > 0 and stitched:
+            # The segment's own value at the boundary, from the end of its warm-up
+            before = [point for time, point in points if time <= start] or [points[0][1]]
+            base_value = before[-1]["portfolio_value"]
+            if base_value:
+                scale = stitched[-1]["portfolio_value"] / base_value
+        last = i == len(windows) - 1
+        for time, point in points:
+            if (i > 0 and time <= start) or (time > end and not last):
+                continue
+            cash = point.get("cash")
+            stitched.append(
+                {
+                    "time": time,
+                    "portfolio_value": scale * point["portfolio_value"],
+                    "cash": scale * cash if cash is not None else None,
+                }
+            )
+    return stitched
+
+
+def _stitch_trades(windows: List[Dict[str, str]], segment_results: List[Dict[str, Any]]):
+    """Fills each segment owns (``start <= time < end``) and the count per segment."""
+    trades, counts = [], []
+    for i, (window, result) in enumerate(zip(windows, segment_results)):
+        owned = len(trades)
+        start, end = datetime.fromisoformat(window["start"]), datetime.fromisoformat(window["end"])
+        last = i == len(windows) - 1
+        for trade in result.get("trades") or []:
+            time = _wall_time(trade.get("time"))
+            if time is None or time < start or (time >= end and not last):
+                continue
+            trades.append(dict(trade, time=time))
+        counts.append(len(trades) - owned)
+    trades.sort(key=lambda trade: trade["time"])
+    return trades, counts
+
+
+def daily_closes(equity: List[Dict[str, Any]]):
+    """``(dates, values)`` of the last portfolio value per day, as ``performance_metrics`` expects."""
+    closes = {}
+    for point in equity:
+        closes[point["time"].date()] = point["portfolio_value"]
+    days = sorted(closes)
+    return np.array(days, dtype="datetime64[D]"), np.array([closes[day] for day in days], dtype=float)
+
+
+def stitch_segments(windows: List[Dict[str, str]], segment_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One backtest result (summary metrics, trades, equity) from per-segment runs, in window order."""
+    # NumPy/pandas stack of the replay engine; only the finishing task needs it
+    from app.utils.replay import performance_metrics
+
+    equity = _stitch_equity(windows, segment_results)
+    trades, counts = _stitch_trades(windows, segment_results)
+    result = performance_metrics(*daily_closes(equity))
+    result["segments"] = [dict(window, trades=count) for window, count in zip(windows, counts)]
+    result["trades"] = trades
+    result["equity"] = equity
+    return result
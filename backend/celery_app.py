@@ -8,7 +8,7 @@ celery_app = Celery(
     "option_trading_platform",
     broker=redis_url,
     backend=redis_url,
-    include=["app.tasks.live_trade"],  # IMPORTANT: Include your tasks module here!
+    include=["app.tasks.live_trade", "app.tasks.backtest"],  # IMPORTANT: Include your tasks module here!
 )
 
 celery_app.conf.update(
@@ -17,6 +17,17 @@ celery_app.conf.update(
     accept_content=["json"],
     timezone="UTC",
     enable_utc=True,
+    # Backtests get their own queue so a bounded pool of workers serves them:
+    #   celery -A celery_app worker -Q backtest -c <max concurrent backtests>
+    task_routes={"app.tasks.backtest.*": {"queue": settings.BACKTEST_QUEUE}},
+    # One job per worker process at a time, so queue order is respected
+    worker_prefetch_multiplier=1,
+    # Redis priorities: 0 is served first
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
 )
 
 # Optional: celery_app.conf.update(...) for additional configs
@@ -1,7 +1,6 @@
 from fastapi import FastAPI
 from app.api.v1.routers import api_router
-from app.db.session import engine
-from app.models import base
+from app.utils.schwab_http import close_async_http_client
 import app.models
 from fastapi.middleware.cors import CORSMiddleware
 import os
@@ -9,7 +8,7 @@ from dotenv import load_dotenv
 
 load_dotenv(dotenv_path=".env", encoding="utf-8-sig")
 
-base.Base.metadata.create_all(bind=engine)
+# Schema creation is a deploy step (python -m app.db.init_db), not a boot step
 
 app = FastAPI(title="My FastAPI App")
 
@@ -28,3 +27,8 @@ app.add_middleware(
 )
 
 app.include_router(api_router, prefix="/api/v1")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_async_http_client()
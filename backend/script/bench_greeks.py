@@ -0,0 +1,165 @@
+"""
+Compare FlexibleOptionStrategy._vectorized_strike_deltas against lumibot's
+OptionsHelper.get_strike_deltas on the same skewed option chain.  Also
+measures the strike-selection error of a flat ATM IV (one quote per entry,
+IV assumed constant across the ladder) against the chain's per-strike IVs.
+
+Both paths run against a stub strategy quoting a synthetic chain.  Its prices
+come from a per-strike IV skew, rounded to the cent, and strikes worth less
+than a cent have no quote.  get_greeks mirrors lumibot's
+DataSource.calculate_greeks, with one Black-Scholes IV solve per strike, so
+the timings show the strike-selection cost a backtest pays per entry without
+the data-source lookups.
+
+    python script/bench_greeks.py --strikes 200 --repeat 20
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+from lumibot.components.options_helper import OptionsHelper
+from lumibot.entities import Asset
+from lumibot.tools import black_scholes
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import greeks  # noqa: E402
+from app.utils.backtest import FlexibleOptionStrategy  # noqa: E402
+
+TARGET_DELTAS = (0.05, 0.10, 0.16, 0.20, 0.25, 0.30, 0.40)
+
+
+class ChainStub:
+    """The slice of the Strategy API both strike-delta paths call."""
+
+    def __init__(self, spot, strikes, ivs, now, rate):
+        self.spot = spot
+        self.now = now
+        self.risk_free_rate = rate
+        self.ivs = dict(zip(strikes.tolist(), ivs.tolist()))
+        self.prices = {}
+
+    def quote_chain(self, expiry: date, is_call: bool):
+        t = (expiry - self.now.date()).days / 365.0
+        strikes = np.array(list(self.ivs))
+        prices = greeks.bs_price(self.spot, strikes, t, self.risk_free_rate, np.array(list(self.ivs.values())), is_call)
+        prices = np.round(prices, 2)
+        self.prices = {k: p for k, p in zip(strikes.tolist(), prices.tolist()) if p >= 0.01}
+
+    def log_message(self, message, color=None):
+        pass
+
+    def get_datetime(self):
+        return self.now
+
+    def get_last_price(self, asset):
+        if asset.asset_type == Asset.AssetType.OPTION:
+            return self.prices.get(float(asset.strike))
+        return self.spot
+
+    def get_quote(self, asset):
+        price = self.get_last_price(asset)
+        return SimpleNamespace(mid_price=price) if price is not None else None
+
+    def get_greeks(self, asset, underlying_price=None):
+        # DataSource.calculate_greeks, minus the clock / timezone plumbing
+        price = self.get_last_price(asset)
+        days = (asset.expiration - self.now.date()).days
+        args = [underlying_price, float(asset.strike), self.risk_free_rate * 100, days]
+        if asset.right.upper() == "CALL":
+            iv = black_scholes.BS(args, callPrice=price)
+            return {"delta": black_scholes.BS(args, volatility=iv.impliedVolatility).callDelta}
+        iv = black_scholes.BS(args, putPrice=price)
+        return {"delta": black_scholes.BS(args, volatility=iv.impliedVolatility).putDelta}
+
+
+def make_chain(strikes: int, spot: float, skew: float):
+    """Strike ladder +-20 % around spot with a put skew: IV rises as strikes fall."""
+    ladder = np.round(np.linspace(spot * 0.8, spot * 1.2, strikes), 2)
+    ivs = np.clip(0.18 - skew * np.log(ladder / spot), 0.08, 0.9)
+    return ladder, ivs
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def flat_atm_deltas(stub, ladder, expiry, is_call):
+    """Deltas from the ATM contract's IV applied to every strike."""
+    t = (expiry - stub.now.date()).days / 365.0
+    atm = float(ladder[np.argmin(np.abs(ladder - stub.spot))])
+    sigma = greeks.implied_vol(np.array([stub.prices[atm]]), stub.spot, atm, t, stub.risk_free_rate, is_call)[0]
+    return greeks.greeks(stub.spot, ladder, t, stub.risk_free_rate, sigma, is_call)["delta"]
+
+
+def selection_error(label, strikes, deltas, true_deltas):
+    """Strike picked from ``deltas`` vs the one the chain's own IVs pick, per target delta."""
+    misses = 0
+    for target in TARGET_DELTAS:
+        chosen = greeks.select_by_delta(deltas, target)
+        exact = greeks.select_by_delta(true_deltas, target)
+        if chosen == exact:
+            continue
+        misses += 1
+        print(
+            f"  {label} target {target:.2f}: strike {strikes[chosen]:.2f} (true |delta| {abs(true_deltas[chosen]):.3f})"
+            f" vs {strikes[exact]:.2f} (true |delta| {abs(true_deltas[exact]):.3f})"
+        )
+    print(f"  {label}: {misses}/{len(TARGET_DELTAS)} targets pick a different strike")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--strikes", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--dte", type=int, default=30)
+    parser.add_argument("--skew", type=float, default=0.6, help="IV change per unit of -log(K/S)")
+    args = parser.parse_args()
+
+    spot, rate = 450.0, 0.04
+    now = datetime(2024, 3, 1, 16, 0)
+    expiry = (now + timedelta(days=args.dte)).date()
+    t = args.dte / 365.0
+    ladder, ivs = make_chain(args.strikes, spot, args.skew)
+    stub = ChainStub(spot, ladder, ivs, now, rate)
+    helper = OptionsHelper(stub)
+    underlying = Asset("SPY")
+
+    for right in ("put", "call"):
+        is_call = right == "call"
+        stub.quote_chain(expiry, is_call)
+        true_deltas = greeks.greeks(spot, ladder, t, rate, ivs, is_call)["delta"]
+
+        lumibot_s, strike_deltas = timed(
+            lambda: helper.get_strike_deltas(underlying_asset=underlying, expiry=expiry, strikes=ladder.tolist(), right=right),
+            args.repeat,
+        )
+        vector_s, (strikes_arr, vector_deltas) = timed(
+            lambda: FlexibleOptionStrategy._vectorized_strike_deltas(stub, underlying, spot, ladder.tolist(), expiry, right),
+            args.repeat,
+        )
+        lumibot_deltas = np.array([strike_deltas.get(k, np.nan) for k in ladder.tolist()], dtype=float)
+        flat_deltas = flat_atm_deltas(stub, ladder, expiry, is_call)
+        assert np.array_equal(strikes_arr, ladder)
+        quoted = np.isfinite(lumibot_deltas) & np.isfinite(vector_deltas)
+
+        print(f"{right}s: strikes={args.strikes} dte={args.dte} skew={args.skew}")
+        print(f"  get_strike_deltas        : {lumibot_s * 1e3:9.2f} ms / chain")
+        print(f"  _vectorized_strike_deltas: {vector_s * 1e3:9.2f} ms / chain ({lumibot_s / vector_s:.0f}x)")
+        print(f"  max |delta diff| vectorized vs lumibot: {np.max(np.abs(vector_deltas - lumibot_deltas)[quoted]):.2e}")
+        selection_error("get_strike_deltas", ladder, lumibot_deltas, true_deltas)
+        selection_error("_vectorized_strike_deltas", ladder, vector_deltas, true_deltas)
+        selection_error("flat ATM IV", ladder, flat_deltas, true_deltas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Import-time budget for the API and Celery entry points.
+
+Imports each target in a fresh interpreter under ``python -X importtime``,
+reports the median cumulative import time and the slowest modules, and exits
+non-zero when a target is over budget or drags in a module that should only
+load inside backtest workers.
+
+    python script/bench_importtime.py
+    python script/bench_importtime.py --budget main=800 --repeat 7 --top 20
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Milliseconds of cumulative import time, measured with warm .pyc caches
+DEFAULT_BUDGETS = {"main": 1500, "celery_app": 1200}
+# Modules that must stay behind the lazy imports in app.tasks.backtest
+DEFAULT_FORBIDDEN = ("lumibot", "pandas")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """``(module, self_us, cumulative_us, depth)`` per ``-X importtime`` line."""
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def measure(target: str) -> List[Tuple[str, int, int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def check(target: str, budget_ms: float, repeat: int, top: int, forbidden) -> bool:
+    measure(target)  # warm the .pyc cache so the first run does not count compilation
+    runs = [measure(target) for _ in range(repeat)]
+    totals = [next(cum for module, _, cum, depth in rows if module == target and depth == 0) for rows in runs]
+    median_ms = statistics.median(totals) / 1000.0
+
+    ok = median_ms <= budget_ms
+    print(f"{target}: {median_ms:8.1f} ms (budget {budget_ms:.0f} ms) {'OK' if ok else 'OVER BUDGET'}")
+
+    rows = runs[-1]
+    loaded = {module for module, _, _, _ in rows}
+    leaked = sorted(name for name in forbidden if name in loaded)
+    if leaked:
+        ok = False
+        print(f"  imports {', '.join(leaked)}; keep them behind the lazy imports in app.tasks.backtest")
+
+    # Top-level packages only, so a slow package is reported once, not per submodule
+    by_package: Dict[str, int] = {}
+    for module, self_us, _, _ in rows:
+        package = module.split(".", 1)[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {self_us / 1000.0:8.1f} ms  {package}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="MODULE=MS",
+        help="override or add a target budget (repeatable)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--forbid", default=",".join(DEFAULT_FORBIDDEN), help="comma separated module names")
+    args = parser.parse_args()
+
+    budgets = dict(DEFAULT_BUDGETS)
+    for entry in args.budget:
+        module, _, ms = entry.partition("=")
+        budgets[module] = float(ms)
+    forbidden = [name for name in args.forbid.split(",") if name]
+
+    results = [check(target, budget, args.repeat, args.top, forbidden) for target, budget in budgets.items()]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Compare the orjson result serializer against the old recursive
+``make_json_serializable`` walk on a lumibot-shaped results payload:
+summary metrics plus a minute equity curve and the fills of the run.
+
+    python script/bench_serializer.py --days 250 --repeat 5
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import serializer  # noqa: E402
+
+
+def make_json_serializable(obj):
+    """The per-value walk backtest_repository used before app.utils.serializer."""
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, dict):
+        return {k: make_json_serializable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [make_json_serializable(v) for v in obj]
+    return obj
+
+
+def make_payload(days: int, seed: int = 0):
+    """(records payload, DataFrame payload) describing the same run."""
+    rng = np.random.default_rng(seed)
+    sessions = pd.bdate_range("2024-01-02", periods=days)
+    minutes = pd.DatetimeIndex(
+        np.concatenate([pd.date_range(f"{d.date()} 09:30", periods=390, freq="min").values for d in sessions])
+    ).tz_localize("America/New_York")
+    value = 100000.0 * np.cumprod(1.0 + rng.normal(0.0, 2e-4, len(minutes)))
+    cash = value * rng.uniform(0.2, 0.8, len(minutes))
+    stats = pd.DataFrame({"portfolio_value": value, "cash": cash}, index=minutes.rename("datetime"))
+
+    fills = rng.choice(len(minutes), size=days * 8, replace=False)
+    fills.sort()
+    trades = pd.DataFrame(
+        {
+            "time": minutes[fills],
+            "symbol": "SPY",
+            "side": rng.choice(["sell_to_open", "buy_to_close"], len(fills)),
+            "filled_quantity": rng.integers(1, 10, len(fills)).astype(float),
+            "price": rng.uniform(0.5, 5.0, len(fills)),
+            "trade_cost": 0.65,
+            "asset.right": rng.choice(["CALL", "PUT"], len(fills)),
+            "asset.strike": rng.integers(400, 500, len(fills)).astype(float),
+            "asset.expiration": pd.to_datetime(sessions[np.minimum(fills // 390 + 5, days - 1)]).date,
+        }
+    )
+
+    metrics = {
+        "cagr": np.float64(0.12),
+        "volatility": np.float64(0.18),
+        "sharpe": np.float64(0.9),
+        "max_drawdown": {"drawdown": np.float64(0.07), "date": minutes[len(minutes) // 2]},
+        "romad": np.float64(1.7),
+        "total_return": np.float64(0.25),
+    }
+    # Row dicts hold pandas Timestamps and numpy scalars, as lumibot hands them out
+    records = dict(
+        metrics,
+        equity=[
+            {"time": t, "portfolio_value": np.float64(v), "cash": np.float64(c)}
+            for t, v, c in zip(minutes, value, cash)
+        ],
+        trades=[{k: (np.float64(v) if isinstance(v, float) else v) for k, v in row.items()} for row in trades.to_dict("records")],
+    )
+    frames = dict(metrics, equity=stats, trades=trades)
+    return records, frames
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=250, help="trading days of minute bars")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    records, frames = make_payload(args.days)
+    print(f"equity points={len(records['equity'])} trades={len(records['trades'])}")
+
+    legacy_s, legacy = timed(lambda: json.dumps(make_json_serializable(records)), args.repeat)
+    records_s, fast = timed(lambda: serializer.dumps(records), args.repeat)
+    frames_s, bulk = timed(lambda: serializer.dumps(frames), args.repeat)
+
+    legacy, fast, bulk = json.loads(legacy), json.loads(fast), json.loads(bulk)
+    assert legacy["equity"] == fast["equity"]
+    assert [p["portfolio_value"] for p in legacy["equity"]] == [p["portfolio_value"] for p in bulk["equity"]]
+    assert len(bulk["trades"]) == len(legacy["trades"])
+
+    print(f"make_json_serializable + json : {legacy_s * 1e3:9.1f} ms")
+    print(f"serializer, row dicts         : {records_s * 1e3:9.1f} ms ({legacy_s / records_s:.1f}x)")
+    print(f"serializer, DataFrames        : {frames_s * 1e3:9.1f} ms ({legacy_s / frames_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -146,7 +146,10 @@ CREATE TABLE backtests (
     end_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
     strategy_id UUID NOT NULL REFERENCES strategies(id),
     bot_id UUID NOT NULL REFERENCES bots(id),
-    result JSON DEFAULT '{}'
+    result JSON DEFAULT '{}',
+    status VARCHAR NOT NULL DEFAULT 'queued',
+    priority INTEGER NOT NULL DEFAULT 0,
+    celery_id VARCHAR
 );
 
 CREATE TABLE trading_tasks (
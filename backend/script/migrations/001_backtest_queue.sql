@@ -0,0 +1,9 @@
+-- Backtest job queue: status, priority and the Celery task id per run
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS status VARCHAR NOT NULL DEFAULT 'queued';
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS priority INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS celery_id VARCHAR;
+
+UPDATE backtests SET status = 'finished' WHERE is_active = FALSE;
+
+CREATE INDEX IF NOT EXISTS ix_backtests_status_priority_created_at
+    ON backtests (status, priority, created_at);
@@ -0,0 +1,79 @@
+-- Per-day and per-hour P&L rollups of trading_logs, maintained on insert
+CREATE TABLE IF NOT EXISTS trading_log_rollups (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES users(id),
+    scope VARCHAR NOT NULL,
+    scope_id UUID NOT NULL,
+    granularity VARCHAR NOT NULL,
+    bucket TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    trades INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    profit FLOAT NOT NULL DEFAULT 0,
+    total_profit FLOAT NOT NULL DEFAULT 0,
+    total_loss FLOAT NOT NULL DEFAULT 0,
+    CONSTRAINT uq_trading_log_rollups_bucket UNIQUE (scope, scope_id, granularity, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS ix_trading_log_rollups_user_scope_bucket
+    ON trading_log_rollups (user_id, scope, granularity, bucket);
+
+-- Backfill from existing logs
+DELETE FROM trading_log_rollups;
+INSERT INTO trading_log_rollups
+    (user_id, scope, scope_id, granularity, bucket, trades, wins, losses, profit, total_profit, total_loss)
+SELECT user_id, 'user', user_id, 'day', date_trunc('day', time),
+       count(*), count(*) FILTER (WHERE profit >= 0), count(*) FILTER (WHERE profit < 0),
+       coalesce(sum(profit), 0), coalesce(sum(profit) FILTER (WHERE profit >= 0), 0),
+       coalesce(sum(profit) FILTER (WHERE profit < 0), 0)
+FROM trading_logs WHERE user_id IS NOT NULL AND time IS NOT NULL
+GROUP BY user_id, user_id, date_trunc('day', time)
+UNION ALL
+SELECT user_id, 'user', user_id, 'hour', date_trunc('hour', time),
+       count(*), count(*) FILTER (WHERE profit >= 0), count(*) FILTER (WHERE profit < 0),
+       coalesce(sum(profit), 0), coalesce(sum(profit) FILTER (WHERE profit >= 0), 0),
+       coalesce(sum(profit) FILTER (WHERE profit < 0), 0)
+FROM trading_logs WHERE user_id IS NOT NULL AND time IS NOT NULL
+GROUP BY user_id, user_id, date_trunc('hour', time)
+UNION ALL
+SELECT user_id, 'bot', bot_id, 'day', date_trunc('day', time),
+       count(*), count(*) FILTER (WHERE profit >= 0), count(*) FILTER (WHERE profit < 0),
+       coalesce(sum(profit), 0), coalesce(sum(profit) FILTER (WHERE profit >= 0), 0),
+       coalesce(sum(profit) FILTER (WHERE profit < 0), 0)
+FROM trading_logs WHERE bot_id IS NOT NULL AND time IS NOT NULL
+GROUP BY user_id, bot_id, date_trunc('day', time)
+UNION ALL
+SELECT user_id, 'bot', bot_id, 'hour', date_trunc('hour', time),
+       count(*), count(*) FILTER (WHERE profit >= 0), count(*) FILTER (WHERE profit < 0),
+       coalesce(sum(profit), 0), coalesce(sum(profit) FILTER (WHERE profit >= 0), 0),
+       coalesce(sum(profit) FILTER (WHERE profit < 0), 0)
+FROM trading_logs WHERE bot_id IS NOT NULL AND time IS NOT NULL
+GROUP BY user_id, bot_id, date_trunc('hour', time)
+UNION ALL
+SELECT user_id, 'strategy', strategy_id, 'day', date_trunc('day', time),
+       count(*), count(*) FILTER (WHERE profit >= 0), count(*) FILTER (WHERE profit < 0),
+       coalesce(sum(profit), 0), coalesce(sum(profit) FILTER (WHERE profit >= 0), 0),
+       coalesce(sum(profit) FILTER (WHERE profit < 0), 0)
+FROM trading_logs WHERE strategy_id IS NOT NULL AND time IS NOT NULL
+GROUP BY user_id, strategy_id, date_trunc('day', time)
+UNION ALL
+SELECT user_id, 'strategy', strategy_id, 'hour', date_trunc('hour', time),
+       count(*), count(*) FILTER (WHERE profit >= 0), count(*) FILTER (WHERE profit < 0),
+       coalesce(sum(profit), 0), coalesce(sum(profit) FILTER (WHERE profit >= 0), 0),
+       coalesce(sum(profit) FILTER (WHERE profit < 0), 0)
+FROM trading_logs WHERE strategy_id IS NOT NULL AND time IS NOT NULL
+GROUP BY user_id, strategy_id, date_trunc('hour', time)
+UNION ALL
+SELECT user_id, 'account', trading_account_id, 'day', date_trunc('day', time),
+       count(*), count(*) FILTER (WHERE profit >= 0), count(*) FILTER (WHERE profit < 0),
+       coalesce(sum(profit), 0), coalesce(sum(profit) FILTER (WHERE profit >= 0), 0),
+       coalesce(sum(profit) FILTER (WHERE profit < 0), 0)
+FROM trading_logs WHERE trading_account_id IS NOT NULL AND time IS NOT NULL
+GROUP BY user_id, trading_account_id, date_trunc('day', time)
+UNION ALL
+SELECT user_id, 'account', trading_account_id, 'hour', date_trunc('hour', time),
+       count(*), count(*) FILTER (WHERE profit >= 0), count(*) FILTER (WHERE profit < 0),
+       coalesce(sum(profit), 0), coalesce(sum(profit) FILTER (WHERE profit >= 0), 0),
+       coalesce(sum(profit) FILTER (WHERE profit < 0), 0)
+FROM trading_logs WHERE trading_account_id IS NOT NULL AND time IS NOT NULL
+GROUP BY user_id, trading_account_id, date_trunc('hour', time);
@@ -0,0 +1,14 @@
+-- Composite indexes for the trading_logs filters and the (time, id) keyset order.
+-- CONCURRENTLY keeps the table writable; run outside a transaction (plain psql -f).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trading_logs_user_id_time
+    ON trading_logs (user_id, time, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trading_logs_bot_id_time
+    ON trading_logs (bot_id, time, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trading_logs_strategy_id_time
+    ON trading_logs (strategy_id, time, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trading_logs_trading_account_id_time
+    ON trading_logs (trading_account_id, time, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trading_logs_trading_task_id_time
+    ON trading_logs (trading_task_id, time, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trading_logs_user_id_symbol_time
+    ON trading_logs (user_id, symbol, time, id);
@@ -0,0 +1,48 @@
+-- Backtest results: summary metrics as columns, trades and equity curve as rows
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS engine VARCHAR;
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS total_return DOUBLE PRECISION;
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS cagr DOUBLE PRECISION;
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS volatility DOUBLE PRECISION;
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS sharpe DOUBLE PRECISION;
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS max_drawdown DOUBLE PRECISION;
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS max_drawdown_date TIMESTAMP;
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS romad DOUBLE PRECISION;
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS trade_count INTEGER;
+
+CREATE TABLE IF NOT EXISTS backtest_trades (
+    backtest_id UUID NOT NULL REFERENCES backtests (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    time TIMESTAMP NOT NULL,
+    symbol VARCHAR NOT NULL,
+    "right" VARCHAR,
+    expiration DATE,
+    strike DOUBLE PRECISION,
+    side VARCHAR NOT NULL,
+    quantity DOUBLE PRECISION NOT NULL,
+    price DOUBLE PRECISION,
+    trade_cost DOUBLE PRECISION,
+    reason VARCHAR,
+    PRIMARY KEY (backtest_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS backtest_equity (
+    backtest_id UUID NOT NULL REFERENCES backtests (id) ON DELETE CASCADE,
+    time TIMESTAMP NOT NULL,
+    portfolio_value DOUBLE PRECISION NOT NULL,
+    cash DOUBLE PRECISION,
+    PRIMARY KEY (backtest_id, time)
+);
+
+-- Backfill the columns from results stored before this migration; the JSON keeps
+-- its keys so the API's merged "result" stays the same for old runs
+UPDATE backtests SET
+    total_return = (result->>'total_return')::DOUBLE PRECISION,
+    cagr = (result->>'cagr')::DOUBLE PRECISION,
+    volatility = (result->>'volatility')::DOUBLE PRECISION,
+    sharpe = (result->>'sharpe')::DOUBLE PRECISION,
+    romad = (result->>'romad')::DOUBLE PRECISION,
+    max_drawdown = (result->'max_drawdown'->>'drawdown')::DOUBLE PRECISION,
+    max_drawdown_date = (result->'max_drawdown'->>'date')::TIMESTAMP
+WHERE result IS NOT NULL
+  AND json_typeof(result->'max_drawdown') = 'object'
+  AND total_return IS NULL;
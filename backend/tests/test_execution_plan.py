@@ -0,0 +1,190 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.execution_plan import (
+    DEFAULT_DAYS_BEFORE_EXIT,
+    DteType,
+    ExecutionPlan,
+    OptionRight,
+    PlanError,
+    ProfitTarget,
+    Side,
+    StopType,
+    StrikeTarget,
+    compile_plan,
+)
+
+
+def make_bot(**overrides):
+    settings = {
+        "trade_entry": {"days_of_week_to_enter": [False, True, False, True, False, False]},
+        "trade_exit": {
+            "profit_target_type": "PERCENT PROFIT TARGET",
+            "profit_target_value": 50,
+            "exit_at_set_time": [3],
+        },
+        "trade_stop": {"stop_loss_type": "DOLLAR LOSS", "stop_value": 200},
+        "trade_condition": None,
+    }
+    settings.update(overrides)
+    return SimpleNamespace(**settings)
+
+
+def delta_leg(**overrides):
+    leg = {
+        "strike_target_type": "Delta",
+        # UI order is [min, target, max], in percent
+        "strike_target_value": [10, 16, 25],
+        "option_type": "PUT",
+        "long_or_short": "SHORT",
+        "days_to_expiration_type": "Target",
+        "days_to_expiration_value": [30, 21, 45],
+    }
+    leg.update(overrides)
+    return leg
+
+
+def make_strategy(*legs, symbol="SPY"):
+    return SimpleNamespace(symbol=symbol, legs=list(legs) or [delta_leg()])
+
+
+def test_compile_plan_resolves_labels():
+    plan = compile_plan(make_bot(), make_strategy())
+
+    assert plan.symbol == "SPY"
+    (leg,) = plan.legs
+    assert (leg.right, leg.side, leg.strike_target) == (OptionRight.PUT, Side.SHORT, StrikeTarget.DELTA)
+    assert (leg.target_delta, leg.min_delta, leg.max_delta) == (0.16, 0.10, 0.25)
+    assert (leg.dte_type, leg.dte_value, leg.dte_min, leg.dte_max) == (DteType.TARGET, 30, 21, 45)
+    # Whole percents from the UI become fractions, like the strategy's P&L
+    assert (plan.exit.profit_target, plan.exit.profit_target_value) == (ProfitTarget.PERCENT, 0.5)
+    assert (plan.exit.stop, plan.exit.stop_value) == (StopType.DOLLAR_LOSS, 200.0)
+    assert plan.exit.days_before_exit == 3
+
+
+def test_exit_rules_are_bound():
+    plan = compile_plan(make_bot(), make_strategy())
+
+    # profit_pct is a fraction of the entry value, as _calculate_pnl returns it
+    assert plan.exit.profit_rule(None, 0.55)
+    assert not plan.exit.profit_rule(None, 0.45)
+    assert plan.exit.stop_rule(-250.0, None)
+    assert not plan.exit.stop_rule(-150.0, None)
+
+
+def test_entry_weekdays():
+    plan = compile_plan(make_bot(), make_strategy())
+
+    # [any day, Monday, ..., Friday]: Monday and Wednesday
+    assert plan.entry.weekdays == frozenset({0, 2})
+    assert plan.entry.allows(date(2024, 3, 4))  # Monday
+    assert not plan.entry.allows(date(2024, 3, 5))  # Tuesday
+
+
+def test_any_day_and_missing_settings_allow_every_day():
+    any_day = compile_plan(make_bot(trade_entry={"days_of_week_to_enter": [True, False]}), make_strategy())
+    defaults = compile_plan(make_bot(trade_entry=None, trade_exit=None, trade_stop=None), make_strategy())
+
+    assert any_day.entry.weekdays == frozenset(range(7))
+    assert defaults.entry.weekdays == frozenset(range(7))
+    assert defaults.exit.profit_target is None and defaults.exit.stop is None
+    assert defaults.exit.days_before_exit == DEFAULT_DAYS_BEFORE_EXIT
+
+
+def test_stop_settings_fall_back_to_trade_exit():
+    bot = make_bot(
+        trade_exit={"profit_target_type": "DISABLED", "stop_loss_type": "PERCENT LOSS", "stop_value": 80},
+        trade_stop={},
+    )
+    plan = compile_plan(bot, make_strategy())
+
+    assert plan.exit.profit_target is None
+    assert (plan.exit.stop, plan.exit.stop_value) == (StopType.PERCENT_LOSS, 0.8)
+    assert plan.exit.stop_rule(None, -0.85)
+    assert not plan.exit.stop_rule(None, -0.75)
+
+
+def test_to_parameters():
+    params = compile_plan(make_bot(), make_strategy()).to_parameters()
+
+    assert params == {
+        "investment_pct": 0.10,
+        "symbol": "SPY",
+        "profit_target_type": "percent",
+        "profit_target_value": 0.5,
+        "days_before_exit": 3,
+        "stop_type": "dollar_loss",
+        "stop_value": 200.0,
+        "entry_weekdays": [0, 2],
+        "legs": [
+            {
+                "strike_target_type": "delta",
+                # The UI value; from_parameters normalises it like compile_plan does
+                "target_delta": 16.0,
+                "min_delta": 0.10,
+                "max_delta": 0.25,
+                "option_type": "put",
+                "long_short": "short",
+                "size_ratio": 1,
+                "dte_type": "Target",
+                "dte_value": 30,
+                "dte_min": 21,
+                "dte_max": 45,
+            }
+        ],
+    }
+
+
+def test_parameters_round_trip():
+    strategy = make_strategy(
+        delta_leg(),
+        delta_leg(
+            strike_target_type="Premium",
+            strike_target_value=[1.5, 0, 10],
+            option_type="CALL",
+            long_or_short="LONG",
+            size_ratio=2,
+            days_to_expiration_type="Exact",
+            days_to_expiration_value=[7],
+        ),
+        delta_leg(strike_target_type="Exact", strike_target_value=[450], days_to_expiration_value=[30]),
+    )
+    plan = compile_plan(make_bot(), strategy)
+    rebuilt = ExecutionPlan.from_parameters(plan.to_parameters())
+
+    assert rebuilt.legs == plan.legs
+    assert rebuilt.entry == plan.entry
+    assert rebuilt.to_parameters() == plan.to_parameters()
+    assert rebuilt.legs[1].max_width == 10.0
+    assert rebuilt.legs[2].strike_price == 450.0
+
+
+def test_sweep_overrides_survive_from_parameters():
+    params = compile_plan(make_bot(), make_strategy()).to_parameters()
+    params["legs"][0]["target_delta"] = 0.30
+    params["stop_value"] = 300
+
+    plan = ExecutionPlan.from_parameters(params)
+
+    assert plan.legs[0].target_delta == 0.30
+    assert plan.exit.stop_rule(-310.0, None) and not plan.exit.stop_rule(-290.0, None)
+
+
+@pytest.mark.parametrize(
+    "strategy, bot, message",
+    [
+        (SimpleNamespace(symbol=None, legs=[delta_leg()]), make_bot(), "no symbol"),
+        (SimpleNamespace(symbol="SPY", legs=[]), make_bot(), "no legs"),
+        (make_strategy(delta_leg(option_type="STRADDLE")), make_bot(), "option_type"),
+        (make_strategy(delta_leg(strike_target_type="Moneyness")), make_bot(), "strike target type"),
+        (make_strategy(delta_leg(days_to_expiration_value=[30, 45, 21])), make_bot(), "exceeds maximum"),
+        (make_strategy(delta_leg(size_ratio=0)), make_bot(), "size_ratio"),
+        (make_strategy(), make_bot(trade_exit={"profit_target_type": "MOON"}), "profit target"),
+        (make_strategy(), make_bot(trade_entry={"days_of_week_to_enter": "Monday"}), "days_of_week_to_enter"),
+    ],
+)
+def test_invalid_settings_raise_plan_error(strategy, bot, message):
+    with pytest.raises(PlanError, match=message):
+        compile_plan(bot, strategy)
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.utils.execution_plan import compile_plan
+from app.utils.option_chain import SIDES
+from app.utils.replay import ChainHistory, ReplayBacktest
+
+DAYS = np.array(["2024-03-04", "2024-03-05", "2024-03-06"], dtype="datetime64[D]")
+EXPIRY = np.datetime64("2024-04-03")  # 30 days out from the first day
+STRIKES = (95.0, 100.0, 105.0)
+# Close of the 100 put each day: -25 % then -55 % from the entry at 2.00
+PUT_100_CLOSES = (2.0, 1.5, 0.9)
+
+
+def make_history():
+    day, right, expiry, strike, close = [], [], [], [], []
+    for index, today in enumerate(DAYS):
+        for k in STRIKES:
+            day.append(today)
+            right.append(SIDES.index("PUT"))
+            expiry.append(EXPIRY)
+            strike.append(k)
+            close.append(PUT_100_CLOSES[index] if k == 100.0 else 1.0)
+    return ChainHistory("SPY", DAYS, [100.0, 99.0, 97.0], day, right, expiry, strike, close)
+
+
+def long_put_parameters(stop_percent):
+    """A bot as the UI stores it: one long 100 put, 30 DTE, a percent stop in whole percents."""
+    bot = SimpleNamespace(
+        trade_entry=None,
+        trade_exit={"profit_target_type": "DISABLED", "exit_at_set_time": [0]},
+        trade_stop={"stop_loss_type": "PERCENT LOSS", "stop_value": stop_percent},
+        trade_condition=None,
+    )
+    strategy = SimpleNamespace(
+        symbol="SPY",
+        legs=[
+            {
+                "strike_target_type": "Exact",
+                "strike_target_value": [100],
+                "option_type": "PUT",
+                "long_or_short": "LONG",
+                "days_to_expiration_type": "Exact",
+                "days_to_expiration_value": [30],
+            }
+        ],
+    )
+    return compile_plan(bot, strategy).to_parameters()
+
+
+def run(stop_percent):
+    backtest = ReplayBacktest(long_put_parameters(stop_percent), make_history())
+    return backtest.run(DAYS[0].astype(object), DAYS[-1].astype(object))
+
+
+def test_percent_stop_triggers():
+    result = run(50)
+
+    entry, stop = result["trades"]
+    assert (entry["reason"], entry["time"], entry["price"]) == ("entry", "2024-03-04", 2.0)
+    # -25 % on the 5th holds; -55 % on the 6th is past the 50 % stop
+    assert (stop["reason"], stop["time"], stop["price"]) == ("stop", "2024-03-06", 0.9)
+    assert stop["side"] == "sell"
+
+
+def test_percent_stop_holds_above_the_limit():
+    result = run(60)
+
+    assert [trade["reason"] for trade in result["trades"]] == ["entry"]
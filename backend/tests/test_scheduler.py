@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from app.tasks import scheduler
+from app.tasks.scheduler import TradingScheduler
+
+BOT = {"trading_task_id": "task-1", "symbol": "SPY", "interval": 60}
+
+
+class StopScheduler(Exception):
+    pass
+
+
+def test_scheduler_survives_a_failed_refresh(monkeypatch):
+    calls = {"load_registry": 0}
+
+    async def flaky_load_registry(redis):
+        calls["load_registry"] += 1
+        if calls["load_registry"] == 1:
+            raise ConnectionError("redis is down")
+        return {BOT["trading_task_id"]: BOT}
+
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            raise StopScheduler
+
+    dispatched = []
+    monkeypatch.setattr(scheduler, "AsyncSchwabMarketAPI", lambda: None)
+    monkeypatch.setattr(scheduler, "get_async_redis", lambda: None)
+    monkeypatch.setattr(scheduler, "load_registry", flaky_load_registry)
+    monkeypatch.setattr(scheduler.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(TradingScheduler, "dispatch", lambda self, symbol, bots: dispatched.append((symbol, bots)))
+
+    with pytest.raises(StopScheduler):
+        asyncio.run(TradingScheduler(max_workers=1).run())
+
+    # The failed pass backs off, the next one refreshes and dispatches the bot
+    assert calls["load_registry"] == 2
+    assert sleeps[0] == scheduler.ERROR_BACKOFF_START
+    assert dispatched == [("SPY", [BOT])]